@@ -3,11 +3,17 @@
 Analyze old documentation and create consolidation plan
 """
 
+import argparse
 import os
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 import yaml
 
+from mosaic_docs.classifier import load_classifier
+from mosaic_docs.corpus import DocCorpus
+from mosaic_docs.minhash import find_near_duplicates
+from mosaic_docs.numbering import NumberAllocator
+
 def analyze_docs(old_docs_path: str):
     """Analyze documentation in _old folder"""
     
@@ -70,73 +76,54 @@ def analyze_docs(old_docs_path: str):
         }
     }
     
+    # Path keywords first, then content keywords; rules live in mosaic_docs/classifiers.yaml
+    classifier = load_classifier('consolidation')
+    
     # Walk through old docs
-    old_path = Path(old_docs_path)
-    for md_file in old_path.rglob("*.md"):
-        if '_moved' in str(md_file):
-            continue
-            
-        rel_path = md_file.relative_to(old_path)
-        content = md_file.read_text()
-        
-        # Categorize based on path and content
-        categorized = False
+    for doc in DocCorpus(old_docs_path, ignore_dirs={'_moved'}):
+        category = classifier.classify(doc.rel_path, lambda: doc.text)
+        categories[category]['files'].append(doc.rel_path)
+    
+    return categories
+
+def find_merge_groups(categories: dict, clusters: list, allocator: NumberAllocator):
+    """Turn near-duplicate clusters into merge groups for consolidate-docs.py --merge-groups
+    
+    Page numbers come from the allocator, so a merged page never takes a name
+    already used in its target directory or by another group.
+    """
+    
+    category_of = {file: name for name, data in categories.items() for file in data['files']}
+    groups = []
+    
+    for i, cluster in enumerate(clusters, 1):
+        # The group goes where most of its members would have gone
+        category = Counter(category_of.get(file, 'development') for file in cluster.members).most_common(1)[0][0]
+        target = categories[category]['target']
         
-        # Path-based categorization
-        if 'deployment' in str(rel_path) or 'nginx' in str(rel_path) or 'portainer' in str(rel_path):
-            categories['deployment']['files'].append(str(rel_path))
-            categorized = True
-        elif 'ci-cd' in str(rel_path) or 'cicd' in str(rel_path) or 'pipeline' in str(rel_path).lower():
-            categories['cicd']['files'].append(str(rel_path))
-            categorized = True
-        elif 'operations' in str(rel_path) or 'backup' in str(rel_path) or 'incident' in str(rel_path):
-            categories['operations']['files'].append(str(rel_path))
-            categorized = True
-        elif 'architecture' in str(rel_path) or 'design' in str(rel_path):
-            categories['architecture']['files'].append(str(rel_path))
-            categorized = True
-        elif 'api' in str(rel_path):
-            categories['api']['files'].append(str(rel_path))
-            categorized = True
-        elif 'development' in str(rel_path) or 'git' in str(rel_path) or 'workflow' in str(rel_path):
-            categories['development']['files'].append(str(rel_path))
-            categorized = True
-        elif 'services' in str(rel_path) or 'gitea' in str(rel_path) or 'postgres' in str(rel_path):
-            categories['services']['files'].append(str(rel_path))
-            categorized = True
-        elif 'E055' in str(rel_path) or 'E057' in str(rel_path) or 'epic' in str(rel_path).lower():
-            categories['epics']['files'].append(str(rel_path))
-            categorized = True
-        elif 'migration' in str(rel_path) or 'tony-sdk' in str(rel_path):
-            categories['migration']['files'].append(str(rel_path))
-            categorized = True
-        elif 'mcp' in str(rel_path).lower():
-            categories['mcp']['files'].append(str(rel_path))
-            categorized = True
-        elif 'troubleshoot' in str(rel_path) or 'common-issues' in str(rel_path):
-            categories['troubleshooting']['files'].append(str(rel_path))
-            categorized = True
+        # Named after the member with the shortest name, usually the original
+        base = min(cluster.members, key=lambda file: (len(Path(file).stem), file))
+        stem = Path(base).stem.lower().replace('_', '-')
+        page_name = Path(allocator.assign(target, f"{stem}.md")).stem
         
-        # Content-based categorization for uncategorized files
-        if not categorized:
-            content_lower = content.lower()
-            if 'deploy' in content_lower or 'install' in content_lower:
-                categories['deployment']['files'].append(str(rel_path))
-            elif 'pipeline' in content_lower or 'ci/cd' in content_lower:
-                categories['cicd']['files'].append(str(rel_path))
-            elif 'backup' in content_lower or 'restore' in content_lower:
-                categories['operations']['files'].append(str(rel_path))
-            elif 'architecture' in content_lower or 'design' in content_lower:
-                categories['architecture']['files'].append(str(rel_path))
-            elif 'api' in content_lower or 'endpoint' in content_lower:
-                categories['api']['files'].append(str(rel_path))
-            else:
-                # Default to development
-                categories['development']['files'].append(str(rel_path))
+        groups.append({
+            'name': f"near-duplicates-{i:02d}",
+            'category': category,
+            'target': target,
+            'files': cluster.members,
+            'max_similarity': round(cluster.max_similarity, 3),
+            'mean_similarity': round(cluster.mean_similarity, 3),
+            'strategy': {
+                'type': 'merge',
+                'page_name': page_name,
+                'page_title': Path(base).stem.replace('-', ' ').replace('_', ' ').title(),
+                'tags': [category, 'consolidated']
+            }
+        })
     
-    return categories
+    return groups
 
-def generate_consolidation_plan(categories: dict):
+def generate_consolidation_plan(categories: dict, merge_groups: list = None):
     """Generate consolidation plan"""
     
     plan = ["# Documentation Consolidation Plan\n"]
@@ -185,24 +172,58 @@ def generate_consolidation_plan(categories: dict):
         
         plan.append("")
     
+    if merge_groups:
+        plan.append("## Near-Duplicate Merge Groups\n")
+        plan.append(f"{len(merge_groups)} groups of near-duplicate documents "
+                    f"({sum(len(group['files']) for group in merge_groups)} files). "
+                    "Each group should be merged into one page rather than consolidated file by file.\n")
+        
+        for group in merge_groups:
+            strategy = group['strategy']
+            plan.append(f"### {group['name']} ({len(group['files'])} files, "
+                        f"similarity {group['mean_similarity']:.0%} mean, {group['max_similarity']:.0%} max)")
+            plan.append(f"**Merge into**: `{group['target']}/{strategy['page_name']}.md`\n")
+            for file in group['files']:
+                plan.append(f"- `{file}`")
+            plan.append("")
+    
     return "\n".join(plan)
 
 if __name__ == "__main__":
-    import sys
-    
-    old_docs_path = sys.argv[1] if len(sys.argv) > 1 else "docs/_old"
+    parser = argparse.ArgumentParser(description='Analyze old documentation and create a consolidation plan')
+    parser.add_argument('old_docs_path', nargs='?', default='docs/_old', help='Old documentation directory')
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help='Similarity (0-1) above which documents are near-duplicates (default: 0.8)')
+    parser.add_argument('--merge-groups', default='consolidation-merge-groups.yaml',
+                        help='Where to write near-duplicate merge groups for consolidate-docs.py')
+    parser.add_argument('--no-duplicates', action='store_true', help='Skip near-duplicate detection')
+    args = parser.parse_args()
     
     # Analyze
-    categories = analyze_docs(old_docs_path)
+    categories = analyze_docs(args.old_docs_path)
+    
+    # Near-duplicates become merge groups
+    merge_groups = []
+    if not args.no_duplicates:
+        clusters = find_near_duplicates(DocCorpus(args.old_docs_path, ignore_dirs={'_moved'}), args.threshold)
+        # Targets are relative to the docs root _old sits in; only those directories are scanned
+        allocator = NumberAllocator(DocCorpus(Path(args.old_docs_path).parent, paths=()))
+        merge_groups = find_merge_groups(categories, clusters, allocator)
     
     # Generate plan
-    plan = generate_consolidation_plan(categories)
+    plan = generate_consolidation_plan(categories, merge_groups)
     
     # Save plan
     with open("consolidation-plan.md", "w") as f:
         f.write(plan)
     
     print("Consolidation plan saved to consolidation-plan.md")
+    
+    if merge_groups:
+        with open(args.merge_groups, "w") as f:
+            yaml.safe_dump({'threshold': args.threshold, 'groups': merge_groups}, f, sort_keys=False)
+        print(f"{len(merge_groups)} near-duplicate merge groups saved to {args.merge_groups}")
+    
     print(f"\nSummary:")
     for cat_name, cat_data in categories.items():
         if cat_data['files']:
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark the documentation tools on synthetic corpora
+Generates a corpus per size, times each tool on it in a fresh process
+(first run with an empty cache, then warm runs), and stores the results as
+JSON so later runs can be compared against a baseline for regressions.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mosaic_docs.synthetic import CorpusSpec, generate_corpus
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+STRUCTURE_FILE = 'docs/bookstack/bookstack-structure-optimized.yaml'
+
+# Tools that write to the tree get a fresh copy of the corpus for every run
+TARGETS = {
+    'validate': {'mutates': False, 'help': 'BookStackStructureValidator.validate'},
+    'suggest-migrations': {'mutates': False, 'help': 'DocMigrator.suggest_migrations'},
+    'systematic-migration': {'mutates': True, 'help': 'DocumentMigrator.run'},
+    'fix-doc-issues': {'mutates': True, 'help': 'fix-doc-issues.py main()'},
+    'migration-status': {'mutates': False, 'help': 'migration-status.py get_status()'},
+}
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+
+class Colors:
+    RED = '\033[91m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    RESET = '\033[0m'
+
+def load_script(name: str):
+    """Import one of the hyphenated scripts in this directory as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_target(target: str, jobs: int) -> float:
+    """Run one tool in the current directory (a corpus root); returns elapsed seconds"""
+    if target == 'validate':
+        validator = load_script('validate-bookstack-structure').BookStackStructureValidator(
+            STRUCTURE_FILE, 'docs', jobs=jobs)
+        start = time.perf_counter()
+        validator.validate()
+    elif target == 'suggest-migrations':
+        module = load_script('migrate-doc-structure')
+        start = time.perf_counter()
+        module.DocMigrator('docs', STRUCTURE_FILE).suggest_migrations()
+    elif target == 'systematic-migration':
+        module = load_script('systematic-migration')
+        start = time.perf_counter()
+        module.DocumentMigrator().run()
+    elif target == 'fix-doc-issues':
+        module = load_script('fix-doc-issues')
+        start = time.perf_counter()
+        module.main()
+    elif target == 'migration-status':
+        module = load_script('migration-status')
+        start = time.perf_counter()
+        module.get_status()
+    else:
+        raise KeyError(target)
+    return time.perf_counter() - start
+
+def child_main(target: str, jobs: int) -> None:
+    """--run-target mode: time one tool with its output discarded, print a JSON result"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        elapsed = run_target(target, jobs)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    print(json.dumps({'seconds': elapsed, 'max_rss_kb': usage.ru_maxrss}))
+
+def time_in_subprocess(target: str, root: Path, cache: Path, jobs: int, timeout: Optional[float]) -> Dict[str, Any]:
+    env = dict(os.environ, MOSAIC_DOCS_CACHE=str(cache), PYTHONPATH=str(SCRIPTS_DIR))
+    try:
+        result = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), '--run-target', target, '--jobs', str(jobs)],
+            cwd=root, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'error': f"timed out after {timeout:g}s"}
+    if result.returncode != 0:
+        return {'error': (result.stderr.strip().splitlines() or ['failed'])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def benchmark_size(size: int, targets: List[str], workdir: Path, repeat: int, jobs: int,
+                   timeout: Optional[float], spec_overrides: Dict[str, Any]) -> Dict[str, Any]:
+    spec = CorpusSpec.for_pages(size, **spec_overrides)
+    template = workdir / f"corpus-{size}"
+    print(f"\n📚 {size} pages: generating corpus...", flush=True)
+    start = time.perf_counter()
+    stats = generate_corpus(template, spec)
+    print(f"   {stats['files']} files, {stats['bytes'] / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    for target in targets:
+        cache = workdir / f"cache-{size}-{target}"
+        runs = []
+        for i in range(repeat):
+            root = template
+            if TARGETS[target]['mutates']:
+                root = workdir / f"run-{size}-{target}"
+                shutil.rmtree(root, ignore_errors=True)
+                shutil.copytree(template, root, symlinks=True)
+            run = time_in_subprocess(target, root, cache, jobs, timeout)
+            if TARGETS[target]['mutates']:
+                shutil.rmtree(root, ignore_errors=True)
+            runs.append(run)
+            if 'error' in run:
+                break
+
+        errors = [run['error'] for run in runs if 'error' in run]
+        seconds = [run['seconds'] for run in runs if 'error' not in run]
+        entry = {
+            'runs': seconds,
+            'cold_s': seconds[0] if seconds else None,
+            'warm_s': min(seconds[1:]) if len(seconds) > 1 else None,
+            'max_rss_kb': max((run['max_rss_kb'] for run in runs if 'error' not in run), default=None),
+        }
+        if errors:
+            entry['error'] = errors[0]
+            print(f"   {Colors.RED}{target:<22} {errors[0]}{Colors.RESET}")
+        else:
+            warm = f"{entry['warm_s']:8.3f}s warm" if entry['warm_s'] is not None else ''
+            print(f"   {target:<22} {entry['cold_s']:8.3f}s cold {warm}  "
+                  f"{entry['max_rss_kb'] / 1024:7.1f} MB peak")
+        results[target] = entry
+        shutil.rmtree(cache, ignore_errors=True)
+
+    shutil.rmtree(template, ignore_errors=True)
+    return {'size': size, 'spec': spec.to_dict(), 'corpus': stats, 'targets': results}
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR,
+                                capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Print timing ratios against a baseline; returns False when any slowed past the threshold"""
+    print(f"\n📊 Compared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')})")
+    previous = {(entry['size'], target): result
+                for entry in baseline.get('results', [])
+                for target, result in entry['targets'].items()}
+    ok = True
+    for entry in current['results']:
+        for target, result in entry['targets'].items():
+            before = previous.get((entry['size'], target))
+            if not before:
+                continue
+            for key in ('cold_s', 'warm_s'):
+                if result.get(key) is None or before.get(key) in (None, 0):
+                    continue
+                ratio = result[key] / before[key]
+                color = Colors.RED if ratio > threshold else Colors.GREEN if ratio < 1 / threshold else ''
+                print(f"  {color}{entry['size']:>6} {target:<22} {key[:-2]:<5} "
+                      f"{before[key]:8.3f}s → {result[key]:8.3f}s  ×{ratio:.2f}{Colors.RESET if color else ''}")
+                if ratio > threshold:
+                    ok = False
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the documentation tools on synthetic corpora')
+    parser.add_argument('--sizes', type=lambda value: [int(v) for v in value.split(',')],
+                       default=DEFAULT_SIZES, help='Comma-separated page counts (default: 1000,10000,50000)')
+    parser.add_argument('--targets', type=lambda value: [v.strip() for v in value.split(',') if v.strip()],
+                       default=list(TARGETS), help=f"Comma-separated tools to time: {', '.join(TARGETS)}")
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Runs per tool; the first uses an empty cache (default: 3)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='--jobs passed to the validator')
+    parser.add_argument('--timeout', type=float, help='Give up on a single run after this many seconds')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus generator seed')
+    parser.add_argument('--workdir', help='Directory for generated corpora (default: a temporary directory)')
+    parser.add_argument('--results-dir', default='.benchmarks/doc-tools',
+                       help='Where result files are stored (default: .benchmarks/doc-tools)')
+    parser.add_argument('--compare', metavar='RESULTS', help='Baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                       help='Slowdown ratio counted as a regression with --compare (default: 1.25)')
+    parser.add_argument('--run-target', choices=list(TARGETS), help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_target:
+        child_main(args.run_target, args.jobs)
+        return
+
+    unknown = [target for target in args.targets if target not in TARGETS]
+    if unknown:
+        print(f"{Colors.RED}Unknown targets: {', '.join(unknown)}{Colors.RESET}", file=sys.stderr)
+        print(f"Available: {', '.join(TARGETS)}", file=sys.stderr)
+        sys.exit(2)
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'jobs': args.jobs,
+        'results': [],
+    }
+
+    with contextlib.ExitStack() as stack:
+        if args.workdir:
+            workdir = Path(args.workdir)
+            workdir.mkdir(parents=True, exist_ok=True)
+        else:
+            workdir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix='doc-bench-')))
+        for size in args.sizes:
+            report['results'].append(benchmark_size(size, args.targets, workdir, args.repeat, args.jobs,
+                                                    args.timeout, {'seed': args.seed}))
+
+    results_dir = Path(args.results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    stamp = report['timestamp'].replace(':', '').replace('-', '')
+    results_file = results_dir / f"{stamp}-{report['commit'] or 'nogit'}.json"
+    with open(results_file, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {results_file}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.threshold):
+            print(f"\n{Colors.YELLOW}Slowdown above ×{args.threshold:g} detected{Colors.RESET}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Check links across the documentation tree
+Resolves every relative link and #fragment against one index of page paths
+and heading anchors, and reports broken links, links to pages missing from
+the structure, and which pages link to a given page (for impact analysis).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from mosaic_docs.corpus import DocCorpus
+from mosaic_docs.links import LinkIndex
+from mosaic_docs.parse_cache import ParseCache
+from mosaic_docs.structure import load_structure
+
+def main():
+    parser = argparse.ArgumentParser(description='Check links and anchors across the documentation tree')
+    parser.add_argument('docs_root', nargs='?', default='docs', help='Documentation root (default: docs)')
+    parser.add_argument('--structure', default='docs/bookstack/bookstack-structure-optimized.yaml',
+                       help='Structure file used to flag links to unlisted pages')
+    parser.add_argument('--reverse', nargs='+', metavar='PAGE',
+                       help='Show the pages linking to these docs-relative pages')
+    parser.add_argument('--json', metavar='PATH', help='Write broken links and the reverse-link graph as JSON')
+
+    args = parser.parse_args()
+
+    structure = load_structure(args.structure) if Path(args.structure).exists() else None
+    corpus = DocCorpus(args.docs_root)
+    cache = ParseCache()
+    cache.prime(corpus)
+    cache.close()
+
+    index = LinkIndex(corpus, structure)
+
+    if args.reverse:
+        for page in args.reverse:
+            sources = index.linked_from(page)
+            print(f"\n🔗 {page} is linked from {len(sources)} pages")
+            for source in sources:
+                print(f"  - {source}")
+        return
+
+    print(f"🔍 Checked {len(index.links)} links in {len(corpus)} pages")
+
+    if index.broken:
+        print(f"\n❌ Broken links ({len(index.broken)}):")
+        current = None
+        for link, reason in index.broken:
+            if link.source != current:
+                current = link.source
+                print(f"\n  {current}")
+            print(f"    [{link.text}]({link.target}) - {reason}")
+
+    if index.orphan_links:
+        print(f"\n⚠️  Links to pages not in the structure ({len(index.orphan_links)}):")
+        for link in index.orphan_links:
+            print(f"  {link.source} -> {link.resolved}")
+
+    if not index.broken and not index.orphan_links:
+        print("\n✅ All links resolve")
+
+    if args.json:
+        report = {
+            'summary': {
+                'pages': len(corpus),
+                'links': len(index.links),
+                'broken': len(index.broken),
+                'orphan_links': len(index.orphan_links)
+            },
+            'broken': [
+                {'source': link.source, 'target': link.target, 'reason': reason}
+                for link, reason in index.broken
+            ],
+            'orphan_links': [
+                {'source': link.source, 'target': link.resolved} for link in index.orphan_links
+            ],
+            'reverse': index.reverse
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to: {args.json}")
+
+    sys.exit(1 if index.broken else 0)
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import os
 import re
 from pathlib import Path
 
+from mosaic_docs.corpus import DocCorpus
+
 class ContentCleaner:
     def __init__(self):
         self.docs_dir = Path("docs")
@@ -86,11 +88,8 @@ class ContentCleaner:
         print("Starting cleanup of migrated content...")
         
         # Find all markdown files with migrated content
-        for md_file in self.docs_dir.rglob("*.md"):
-            if "_old" in str(md_file):
-                continue
-                
-            self.clean_file(md_file)
+        for doc in DocCorpus(self.docs_dir):
+            self.clean_file(doc.path)
         
         print(f"\nCleaned up {self.processed} files:")
         for file_path in self.cleaned_files:
@@ -3,11 +3,14 @@
 Consolidate documentation from _old to new structure
 """
 
+import argparse
 import os
 import shutil
+import sys
 from pathlib import Path
 from datetime import datetime
 import re
+import yaml
 
 def create_frontmatter(title: str, category: str, order: int = 1, tags: list = None):
     """Create BookStack-compatible frontmatter"""
@@ -46,6 +49,9 @@ def consolidate_category(category_name: str, files: list, target_path: str, stra
         # Merge multiple files into one
         page_name = strategy.get('page_name', f"01-{category_name}-guide")
         page_title = strategy.get('page_title', f"{category_name.title()} Guide")
+        target_file = target_dir / f"{page_name}.md"
+        if target_file.exists():
+            raise FileExistsError(f"{target_file} already exists, not overwriting it")
         
         merged_content = create_frontmatter(
             title=page_title,
@@ -78,12 +84,16 @@ def consolidate_category(category_name: str, files: list, target_path: str, stra
                 consolidated_files.append(str(file_path))
         
         # Write merged file
-        target_file = target_dir / f"{page_name}.md"
         target_file.write_text(merged_content)
         print(f"Created merged file: {target_file}")
         
     elif strategy.get('type') == 'separate':
         # Keep files separate but reorganize
+        targets = [target_dir / f"{i+1:02d}-{Path(file_path).stem}.md" for i, file_path in enumerate(sorted(files))]
+        existing = [str(target) for target in targets if target.exists()]
+        if existing:
+            raise FileExistsError(f"{', '.join(existing)} already exist(s), not overwriting")
+        
         for i, file_path in enumerate(sorted(files)):
             src_file = Path("docs/_old") / file_path
             if src_file.exists():
@@ -150,7 +160,46 @@ consolidation_strategies = {
     }
 }
 
+def consolidate_merge_groups(groups_file: str):
+    """Merge each group of near-duplicates written by analyze-old-docs.py into one page"""
+    
+    with open(groups_file) as f:
+        groups = yaml.safe_load(f).get('groups') or []
+    
+    # Check every target before moving anything, so a clash cannot leave a run half done
+    targets = [Path("docs") / group['target'] / f"{group['strategy']['page_name']}.md" for group in groups]
+    clashes = sorted({str(target) for target in targets if target.exists() or targets.count(target) > 1})
+    if clashes:
+        raise FileExistsError(f"Merge targets already exist or repeat: {', '.join(clashes)}")
+    
+    consolidated = []
+    for group in groups:
+        print(f"Merging {group['name']} ({len(group['files'])} files)...")
+        consolidated += consolidate_category(
+            group['name'],
+            group['files'],
+            str(Path("docs") / group['target']),
+            group['strategy']
+        )
+    
+    return consolidated
+
 def main():
+    parser = argparse.ArgumentParser(description='Consolidate documentation from _old to the new structure')
+    parser.add_argument('--merge-groups', metavar='FILE',
+                        help='Merge the near-duplicate groups in FILE (from analyze-old-docs.py)')
+    args = parser.parse_args()
+    
+    if args.merge_groups:
+        try:
+            consolidated = consolidate_merge_groups(args.merge_groups)
+        except FileExistsError as e:
+            print(f"❌ {e}")
+            print("Re-run analyze-old-docs.py to allocate free page names")
+            sys.exit(1)
+        print(f"\nConsolidated {len(consolidated)} files")
+        return
+    
     # Example consolidation for CI/CD
     cicd_files = [
         'ci-cd/CI-CD-BEST-PRACTICES.md',
@@ -160,12 +209,16 @@ def main():
     ]
     
     print("Consolidating CI/CD documentation...")
-    consolidated = consolidate_category(
-        'cicd',
-        cicd_files,
-        'docs/engineering/cicd-handbook/pipeline-setup',
-        consolidation_strategies['cicd']
-    )
+    try:
+        consolidated = consolidate_category(
+            'cicd',
+            cicd_files,
+            'docs/engineering/cicd-handbook/pipeline-setup',
+            consolidation_strategies['cicd']
+        )
+    except FileExistsError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
     
     print(f"\nConsolidated {len(consolidated)} files")
     
@@ -10,23 +10,25 @@ import os
 import re
 from pathlib import Path
 
-def fix_readme_references(docs_root: str):
+from mosaic_docs.corpus import DocCorpus
+from mosaic_docs.links import resolve_link
+from mosaic_docs.structure import load_structure
+
+def fix_readme_references(corpus: DocCorpus):
     """Fix README.md files that reference non-existent pages"""
     
     fixed_count = 0
     
-    for readme_path in Path(docs_root).rglob("README.md"):
-        if '_old' in str(readme_path):
-            continue
-            
+    for readme in corpus.named("README.md"):
         # Skip root README
-        if readme_path.parent == Path(docs_root):
+        if readme.rel_path == "README.md":
             continue
-            
+        
+        readme_path = readme.path
         print(f"\nChecking: {readme_path}")
         
         # Read README content
-        content = readme_path.read_text()
+        content = readme.text
         
         # Find all markdown links
         links = re.findall(r'\[([^\]]+)\]\(\.\/([^\)]+)\.md\)', content)
@@ -34,13 +36,13 @@ def fix_readme_references(docs_root: str):
         if not links:
             continue
             
-        # Check which files actually exist
+        # Check which files actually exist, against the corpus instead of one stat per link
         existing_files = []
         missing_files = []
         
         for link_text, link_file in links:
-            file_path = readme_path.parent / f"{link_file}.md"
-            if file_path.exists():
+            target, _ = resolve_link(readme.rel_path, f"./{link_file}.md")
+            if target in corpus.by_path:
                 existing_files.append((link_text, link_file))
             else:
                 missing_files.append((link_text, link_file))
@@ -57,22 +59,20 @@ def fix_readme_references(docs_root: str):
                 new_content += f"- [{link_text}](./{link_file}.md)\n"
             
             # Write updated README
-            readme_path.write_text(new_content)
+            readme.write(new_content)
             fixed_count += 1
             print(f"  Fixed README - removed {len(missing_files)} broken references")
     
     return fixed_count
 
-def fix_incomplete_references(docs_root: str):
+def fix_incomplete_references(corpus: DocCorpus):
     """Fix incomplete references like [Learning 1]"""
     
     fixed_count = 0
     
-    for md_file in Path(docs_root).rglob("*.md"):
-        if '_old' in str(md_file):
-            continue
-            
-        content = md_file.read_text()
+    for doc in corpus:
+        md_file = doc.path
+        content = doc.text
         
         # Find incomplete references
         incomplete_refs = re.findall(r'\[Learning \d+\]|\[TODO\]|\[PLACEHOLDER\]', content)
@@ -94,7 +94,7 @@ def fix_incomplete_references(docs_root: str):
             # Clean up multiple blank lines
             new_content = re.sub(r'\n\n\n+', '\n\n', new_content)
             
-            md_file.write_text(new_content)
+            doc.write(new_content)
             fixed_count += 1
     
     return fixed_count
@@ -102,35 +102,23 @@ def fix_incomplete_references(docs_root: str):
 def create_missing_structure_pages(docs_root: str, structure_file: str):
     """Create stub pages for files referenced in structure but missing"""
     
-    import yaml
-    
-    with open(structure_file, 'r') as f:
-        structure = yaml.safe_load(f)
+    structure = load_structure(structure_file)
     
     created_count = 0
     
-    for shelf_config in structure['structure']:
-        shelf = shelf_config['shelf']
-        shelf_slug = shelf['slug']
+    for page in structure.iter_pages():
+        chapter = page.parent
+        chapter_slug = chapter.slug
+        book_slug = chapter.parent.slug
+        page_slug = page.slug
+        page_path = Path(docs_root) / page.file_path
         
-        for book_config in shelf.get('books', []):
-            book = book_config['book']
-            book_slug = book['slug']
+        if not page_path.exists():
+            print(f"Creating missing page: {page_path}")
             
-            for chapter_config in book.get('chapters', []):
-                chapter = chapter_config['chapter']
-                chapter_slug = chapter['slug']
-                
-                # Check each page
-                for page_slug in chapter.get('pages', []):
-                    page_path = Path(docs_root) / shelf_slug / book_slug / chapter_slug / f"{page_slug}.md"
-                    
-                    if not page_path.exists():
-                        print(f"Creating missing page: {page_path}")
-                        
-                        # Create stub content
-                        page_title = page_slug.replace('-', ' ').title()
-                        content = f"""---
+            # Create stub content
+            page_title = page_slug.replace('-', ' ').title()
+            content = f"""---
 title: "{page_title}"
 order: {int(page_slug[:2]) if page_slug[:2].isdigit() else 1:02d}
 category: "{chapter_slug}"
@@ -155,15 +143,15 @@ This documentation is currently being developed.
 
 ## See Also
 
-- [Back to {chapter['name']}](./README.md)
+- [Back to {chapter.name}](./README.md)
 """
-                        
-                        # Ensure directory exists
-                        page_path.parent.mkdir(parents=True, exist_ok=True)
-                        
-                        # Write stub file
-                        page_path.write_text(content)
-                        created_count += 1
+            
+            # Ensure directory exists
+            page_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Write stub file
+            page_path.write_text(content)
+            created_count += 1
     
     return created_count
 
@@ -173,12 +161,15 @@ def main():
     
     print("Fixing documentation issues...")
     
+    # Scan the tree once for both fixers
+    corpus = DocCorpus(docs_root)
+    
     # Fix README references
-    fixed_readmes = fix_readme_references(docs_root)
+    fixed_readmes = fix_readme_references(corpus)
     print(f"\nFixed {fixed_readmes} README files")
     
     # Fix incomplete references
-    fixed_refs = fix_incomplete_references(docs_root)
+    fixed_refs = fix_incomplete_references(corpus)
     print(f"\nFixed {fixed_refs} files with incomplete references")
     
     # Create missing pages
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic documentation corpus
+Writes <output>/docs and <output>/docs/bookstack/bookstack-structure-optimized.yaml
+with a configurable number of pages and rates of broken frontmatter, orphans,
+missing pages, broken links, stubs and legacy files, for testing and benchmarks.
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import fields
+from pathlib import Path
+
+from mosaic_docs.synthetic import CorpusSpec, generate_corpus
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic documentation corpus')
+    parser.add_argument('output', help='Directory to write docs/ and the structure definition into')
+    parser.add_argument('--pages', type=int, default=1000,
+                       help='Approximate number of structured pages (default: 1000)')
+    defaults = CorpusSpec()
+    for field in fields(CorpusSpec):
+        if field.name in ('shelves', 'books', 'chapters', 'pages'):
+            continue
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=type(getattr(defaults, field.name)),
+                            default=getattr(defaults, field.name),
+                            help=f"(default: {getattr(defaults, field.name)})")
+
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    if (output / 'docs').exists():
+        print(f"❌ {output / 'docs'} already exists", file=sys.stderr)
+        sys.exit(1)
+
+    overrides = {field.name: getattr(args, field.name) for field in fields(CorpusSpec)
+                 if field.name not in ('shelves', 'books', 'chapters', 'pages')}
+    spec = CorpusSpec.for_pages(args.pages, **overrides)
+    print(f"Generating {spec.page_count} pages "
+          f"({spec.shelves} shelves × {spec.books} books × {spec.chapters} chapters × {spec.pages} pages)")
+    stats = generate_corpus(output, spec)
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
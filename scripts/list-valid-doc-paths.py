@@ -4,44 +4,27 @@ List all valid documentation paths based on bookstack-structure.yaml
 Helps agents know where to place new documentation
 """
 
-import yaml
 from pathlib import Path
 import argparse
 
-def load_structure(structure_file: str) -> dict:
-    """Load the BookStack structure definition"""
-    with open(structure_file, 'r') as f:
-        return yaml.safe_load(f)
+from mosaic_docs.structure import StructureModel, load_structure
 
-def list_valid_paths(structure: dict, docs_root: str = "docs") -> list:
+def list_valid_paths(structure: StructureModel, docs_root: str = "docs") -> list:
     """Generate all valid documentation paths"""
     paths = []
     
-    for shelf_config in structure['structure']:
-        shelf = shelf_config['shelf']
-        shelf_slug = shelf['slug']
-        shelf_name = shelf['name']
+    for chapter in structure.iter_chapters():
+        shelf_name = chapter.shelf.name
+        book_name = chapter.parent.name
+        chapter_name = chapter.name
         
-        for book_config in shelf.get('books', []):
-            book = book_config['book']
-            book_slug = book['slug']
-            book_name = book['name']
-            
-            for chapter_config in book.get('chapters', []):
-                chapter = chapter_config['chapter']
-                chapter_slug = chapter['slug']
-                chapter_name = chapter['name']
-                
-                # Full path for this chapter
-                full_path = f"{docs_root}/{shelf_slug}/{book_slug}/{chapter_slug}/"
-                
-                paths.append({
-                    'path': full_path,
-                    'shelf': shelf_name,
-                    'book': book_name,
-                    'chapter': chapter_name,
-                    'description': f"{shelf_name} > {book_name} > {chapter_name}"
-                })
+        paths.append({
+            'path': f"{docs_root}/{chapter.path}/",
+            'shelf': shelf_name,
+            'book': book_name,
+            'chapter': chapter_name,
+            'description': f"{shelf_name} > {book_name} > {chapter_name}"
+        })
     
     return paths
 
@@ -7,36 +7,54 @@ This script analyzes current docs and suggests/performs migrations
 import os
 import re
 import shutil
-import yaml
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import argparse
 import json
 
+from mosaic_docs.classifier import load_classifier
+from mosaic_docs.corpus import DocCorpus
+from mosaic_docs.links import LinkIndex, rewrite_links
+from mosaic_docs.numbering import NumberAllocator
+from mosaic_docs.parse_cache import ParseCache
+from mosaic_docs.structure import StructureModel, load_structure
+from mosaic_docs.transaction import MigrationTransaction, TransactionError
+
 class DocMigrator:
     def __init__(self, docs_root: str, structure_file: str):
         self.docs_root = Path(docs_root)
         self.structure_file = structure_file
         self.structure = self._load_structure()
         self.migrations = []
+        self.allocator = None
+        # Chapter directories --compact leaves alone because the structure file names their pages
+        self.compaction_skipped: List[str] = []
+        self.transaction: Optional[MigrationTransaction] = None
+        self.link_passes = 0
+        # Mapping rules live in mosaic_docs/classifiers.yaml
+        self.classifier = load_classifier('doc-migrator')
+        self._corpus = None
+    
+    @property
+    def corpus(self) -> DocCorpus:
+        """Markdown files under docs_root (excluding bookstack and legacy dirs), scanned once"""
+        if self._corpus is None:
+            self._corpus = DocCorpus(self.docs_root)
+        return self._corpus
         
-    def _load_structure(self) -> Dict:
+    def _load_structure(self) -> StructureModel:
         """Load the BookStack structure definition"""
-        with open(self.structure_file, 'r') as f:
-            return yaml.safe_load(f)
+        return load_structure(self.structure_file)
     
     def analyze_current_docs(self) -> List[Dict]:
         """Analyze current documentation structure"""
         issues = []
         
         # Find all markdown files
-        for md_file in self.docs_root.rglob("*.md"):
-            # Skip bookstack directory
-            if 'bookstack' in md_file.parts:
-                continue
-                
-            rel_path = md_file.relative_to(self.docs_root)
-            parts = rel_path.parts
+        for doc in self.corpus:
+            rel_path = doc.rel_path
+            parts = doc.parts
             
             # Check if it follows the 4-level structure
             if len(parts) < 4:
@@ -47,11 +65,11 @@ class DocMigrator:
                 })
             
             # Check if file is numbered
-            if not re.match(r'^\d{2}-', md_file.name):
+            if not re.match(r'^\d{2}-', doc.name):
                 issues.append({
                     'file': str(rel_path),
                     'issue': 'Page not numbered (should start with 01-, 02-, etc.)',
-                    'filename': md_file.name
+                    'filename': doc.name
                 })
         
         return issues
@@ -60,88 +78,26 @@ class DocMigrator:
         """Suggest migrations for existing files"""
         migrations = []
         
-        # Define migration mappings
-        mappings = {
-            # Agent management docs -> Projects shelf
-            'agent-management/tech-lead-tony': 'projects/epics/active',
-            
-            # Architecture docs -> Stack shelf
-            'architecture': 'stack/architecture/overview',
-            
-            # CI/CD docs -> Engineering shelf
-            'ci-cd': 'engineering/ci-cd-guide/setup',
-            'cicd': 'engineering/ci-cd-guide/setup',
-            
-            # API docs -> Engineering shelf
-            'api': 'engineering/api-guide/overview',
-            
-            # Deployment docs -> Stack shelf
-            'deployment': 'stack/setup/installation',
-            
-            # Operations docs are mostly correct
-            'operations': 'operations',
-            
-            # Monitoring docs -> Operations shelf
-            'monitoring': 'operations/monitoring/setup',
-            
-            # Git docs -> Engineering shelf  
-            'git': 'engineering/git-guide/setup',
-            
-            # Integration docs -> Stack shelf
-            'integration': 'stack/integration/overview',
-            
-            # Security docs -> Stack shelf
-            'security': 'stack/security/overview',
-            
-            # Testing docs -> Engineering shelf
-            'testing': 'engineering/testing-guide/overview'
-        }
+        # Numbers in use per directory, from the corpus scan; updated as files are assigned
+        allocator = NumberAllocator(self.corpus)
         
         # Process each file
-        for md_file in self.docs_root.rglob("*.md"):
-            if 'bookstack' in md_file.parts:
-                continue
-                
-            rel_path = md_file.relative_to(self.docs_root)
+        for doc in self.corpus:
+            md_file = doc.path
+            rel_path = Path(doc.rel_path)
             
-            # Find best mapping
-            suggested_path = None
-            for pattern, target in mappings.items():
-                if pattern in str(rel_path).lower():
-                    # Extract filename without path
-                    filename = md_file.name
-                    
-                    # Add number prefix if missing
-                    if not re.match(r'^\d{2}-', filename):
-                        # Find next available number
-                        target_dir = self.docs_root / target
-                        existing_numbers = []
-                        if target_dir.exists():
-                            for f in target_dir.glob("*.md"):
-                                match = re.match(r'^(\d{2})-', f.name)
-                                if match:
-                                    existing_numbers.append(int(match.group(1)))
-                        
-                        next_num = max(existing_numbers + [0]) + 1
-                        filename = f"{next_num:02d}-{filename}"
-                    
-                    suggested_path = Path(target) / filename
-                    break
+            # Path mappings first, then content keywords (content is only read if no path rule matches)
+            target = self.classifier.classify(doc.rel_path, lambda: doc.text)
             
-            # If no mapping found, try to infer from content
-            if not suggested_path:
-                content = md_file.read_text()
-                if 'backup' in content.lower():
-                    suggested_path = Path('operations/backup/strategies') / f"01-{md_file.name}"
-                elif 'deploy' in content.lower():
-                    suggested_path = Path('stack/setup/installation') / f"01-{md_file.name}"
-                elif 'troubleshoot' in content.lower():
-                    suggested_path = Path('stack/troubleshooting/common-issues') / f"01-{md_file.name}"
-                else:
-                    # Default to projects
-                    suggested_path = Path('projects/misc/uncategorized') / f"01-{md_file.name}"
+            # Already in place: keeps its name and number
+            if str(rel_path.parent) == target and re.match(r'^\d{2}-', md_file.name):
+                continue
             
-            if suggested_path and suggested_path != rel_path:
+            # Keep the file's number if it is free in the target, else take the next one
+            suggested_path = Path(target) / allocator.assign(target, md_file.name)
+            
+            if suggested_path != rel_path:
+                allocator.release(doc.rel_path)
                 migrations.append({
                     'source': str(rel_path),
                     'target': str(suggested_path),
@@ -149,9 +105,33 @@ class DocMigrator:
                 })
         
         self.migrations = migrations
+        self.allocator = allocator
         return migrations
     
-    def generate_migration_report(self) -> str:
+    def compaction_plan(self) -> List[Dict]:
+        """Renames that renumber each directory's pages 01, 02, ... after the suggested moves
+
+        Chapters defined in the structure file list their pages by numbered
+        slug, so renumbering them would orphan every page; they are skipped
+        and reported in compaction_skipped.
+        """
+        if self.allocator is None:
+            self.suggest_migrations()
+        renames = []
+        self.compaction_skipped = []
+        for directory, pairs in self.allocator.compaction_plan().items():
+            if directory in self.structure.by_chapter:
+                self.compaction_skipped.append(directory)
+                continue
+            for old_name, new_name in pairs:
+                renames.append({
+                    'source': f"{directory}/{old_name}" if directory else old_name,
+                    'target': f"{directory}/{new_name}" if directory else new_name,
+                    'reason': 'Renumber to close gaps and duplicates'
+                })
+        return renames
+    
+    def generate_migration_report(self, renames: Optional[List[Dict]] = None) -> str:
         """Generate a detailed migration report"""
         report = ["# Documentation Migration Report\n"]
         report.append(f"Total files to migrate: {len(self.migrations)}\n")
@@ -172,29 +152,77 @@ class DocMigrator:
         
         # Add unmatched files
         report.append("\n## Files Needing Manual Review")
-        all_files = set(str(p.relative_to(self.docs_root)) 
-                       for p in self.docs_root.rglob("*.md") 
-                       if 'bookstack' not in p.parts)
+        all_files = set(doc.rel_path for doc in self.corpus)
         migrated_files = set(m['source'] for m in self.migrations)
         unmatched = all_files - migrated_files
         
         for file in sorted(unmatched):
             report.append(f"- `{file}` - No clear migration path")
         
+        if renames is not None:
+            report.append(f"\n## Renumbering Plan ({len(renames)} files)")
+            for item in renames:
+                report.append(f"- `{item['source']}` → `{item['target']}`")
+            if self.compaction_skipped:
+                report.append(f"\nNot renumbered, pages are named in {self.structure_file}:")
+                for directory in self.compaction_skipped:
+                    report.append(f"- `{directory}`")
+        
         return "\n".join(report)
     
+    def begin(self, renames: Optional[List[Dict]] = None) -> MigrationTransaction:
+        """Start a journaled transaction recording the plan, so it can be resumed or rolled back"""
+        self.transaction = MigrationTransaction.begin(
+            self.docs_root, 'doc-migrator', plan={'migrations': self.migrations, 'renames': renames})
+        return self.transaction
+    
+    def resume(self, tx_id: Optional[str] = None) -> Optional[List[Dict]]:
+        """Continue an interrupted transaction with its original plan; returns its renumbering plan"""
+        tx = MigrationTransaction.load(self.docs_root, tx_id) if tx_id else \
+            MigrationTransaction.latest(self.docs_root, 'doc-migrator', status='open')
+        if tx is None or tx.status != 'open':
+            raise TransactionError("No interrupted migration to resume")
+        self.transaction = tx
+        self.migrations = tx.plan['migrations']
+        print(f"Resuming {tx.summary()}")
+        return tx.plan.get('renames')
+    
+    def finish(self) -> None:
+        if self.transaction is not None:
+            self.transaction.commit()
+            print(f"Transaction {self.transaction.id} committed (undo with --rollback {self.transaction.id})")
+    
     def perform_migration(self, dry_run: bool = True) -> bool:
         """Execute the migration"""
         if dry_run:
             print("DRY RUN - No files will be moved")
+        elif self.transaction is None:
+            self.begin()
+        tx = self.transaction
         
         success_count = 0
         error_count = 0
         
+        # Reverse-link index of the tree before anything moves
+        index = self._link_index(self.corpus)
+        moves = {}
+        
         for migration in self.migrations:
             source = self.docs_root / migration['source']
             target = self.docs_root / migration['target']
             
+            if tx is not None and f"move:{tx.rel(source)}" in tx.ops:
+                # Started before the run was interrupted: the journal knows whether it finished
+                try:
+                    tx.move(source, target)
+                except (OSError, TransactionError) as e:
+                    print(f"❌ Error moving file: {e}")
+                    error_count += 1
+                    continue
+                success_count += 1
+                moves[migration['source']] = migration['target']
+                continue
+            
             if not source.exists():
                 print(f"❌ Source not found: {source}")
                 error_count += 1
@@ -204,69 +232,129 @@ class DocMigrator:
             
             if not dry_run:
                 try:
-                    # Create target directory
-                    target.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Move file
-                    shutil.move(str(source), str(target))
+                    # Journaled rename; creates the target directory
+                    tx.move(source, target)
                     success_count += 1
+                    moves[migration['source']] = migration['target']
                     
-                    # Update any internal links
-                    self._update_links(target, migration['source'], migration['target'])
-                    
-                except Exception as e:
+                except (OSError, TransactionError) as e:
                     print(f"❌ Error moving file: {e}")
                     error_count += 1
             else:
                 success_count += 1
+                moves[migration['source']] = migration['target']
+        
+        # Fix links in moved files and in files pointing at them, once all moves are known
+        error_count += self._update_links(moves, index, dry_run)
         
         print(f"\n✅ Success: {success_count} files")
         print(f"❌ Errors: {error_count} files")
         
         return error_count == 0
     
-    def _update_links(self, file_path: Path, old_path: str, new_path: str):
-        """Update internal links in moved files"""
-        content = file_path.read_text()
+    def perform_compaction(self, renames: List[Dict], dry_run: bool = True) -> bool:
+        """Apply a renumbering plan in two passes, so renames within a directory cannot collide"""
+        for rename in renames:
+            print(f"{'Would renumber' if dry_run else 'Renumbering'}: {rename['source']} → {rename['target']}")
+        if dry_run:
+            print(f"\n✅ Renumbered: {len(renames)} files")
+            return True
+        
+        if self.transaction is None:
+            self.begin(renames)
+        tx = self.transaction
+        
+        # Files have moved since the corpus was scanned: index links in the tree as it is now
+        index = self._link_index(DocCorpus(self.docs_root))
+        
+        staged = []
+        error_count = 0
+        for i, rename in enumerate(renames):
+            source = self.docs_root / rename['source']
+            temp = source.with_name(f".renumber-{i}-{source.name}")
+            try:
+                tx.move(source, temp)
+            except TransactionError as e:
+                print(f"❌ {e}")
+                error_count += 1
+                continue
+            staged.append((rename, temp))
         
-        # Update relative links
-        old_dir = Path(old_path).parent
-        new_dir = Path(new_path).parent
+        moves = {}
+        for rename, temp in staged:
+            try:
+                tx.move(temp, self.docs_root / rename['target'])
+            except TransactionError as e:
+                print(f"❌ {e}, left as {temp}")
+                error_count += 1
+                continue
+            moves[rename['source']] = rename['target']
         
-        # Simple link update (this could be more sophisticated)
-        updated_content = content
+        error_count += self._update_links(moves, index, dry_run=False)
         
-        # Update links that might point to the old location
-        # This is simplified - a real implementation would be more complex
-        if old_dir != new_dir:
-            # Calculate relative path adjustments
-            pass
+        print(f"\n✅ Renumbered: {len(moves)} files")
+        return error_count == 0
+    
+    def _link_index(self, corpus: DocCorpus) -> LinkIndex:
+        """Reverse-link index of a corpus, parsed through the shared parse cache"""
+        cache = ParseCache()
+        cache.prime(corpus)
+        cache.close()
+        return LinkIndex(corpus)
+    
+    def _update_links(self, moves: Dict[str, str], index: LinkIndex, dry_run: bool) -> int:
+        """Rewrite links after a batch of moves (old -> new docs-relative path); returns the error count
+        
+        Only the moved files and the files linking to them are touched, each
+        read and written once, whatever the number of moves.
+        """
+        # New location -> location the links were written for
+        touched = {new: old for old, new in moves.items()}
+        for old in moves:
+            for source in index.linked_from(old):
+                # Moved files keep the old location their links were written for
+                if source not in moves:
+                    touched.setdefault(source, source)
+        
+        # Journal keys are per pass: compaction may rewrite a file the migration pass already rewrote
+        self.link_passes += 1
+        changed_files = changed_links = error_count = 0
+        for current, original in sorted(touched.items()):
+            # A dry run moved nothing, so files are still at their old paths
+            path = self.docs_root / (original if dry_run else current)
+            key = f"links-{self.link_passes}:{current}"
+            if not dry_run and self.transaction.is_done(key):
+                continue  # Rewritten before the run was interrupted
+            try:
+                content = path.read_text()
+                updated, count = rewrite_links(content, original, current, moves)
+                if count and not dry_run:
+                    self.transaction.write(path, updated, key=key)
+            except (OSError, UnicodeDecodeError, TransactionError) as e:
+                print(f"❌ Error updating links in {current}: {e}")
+                error_count += 1
+                continue
+            if count:
+                changed_files += 1
+                changed_links += count
         
-        if updated_content != content:
-            file_path.write_text(updated_content)
+        print(f"🔗 {'Would update' if dry_run else 'Updated'} {changed_links} links in {changed_files} files")
+        return error_count
     
     def create_missing_structure(self):
         """Create missing directories for the defined structure"""
         created_dirs = []
         
-        for shelf_config in self.structure['structure']:
-            shelf_slug = shelf_config['shelf']['slug']
-            
-            for book_config in shelf_config['shelf'].get('books', []):
-                book_slug = book_config['book']['slug']
+        for chapter in self.structure.iter_chapters():
+            # Create directory
+            dir_path = self.docs_root / chapter.path
+            if not dir_path.exists():
+                dir_path.mkdir(parents=True, exist_ok=True)
+                created_dirs.append(str(dir_path))
                 
-                for chapter_config in book_config['book'].get('chapters', []):
-                    chapter_slug = chapter_config['chapter']['slug']
-                    
-                    # Create directory
-                    dir_path = self.docs_root / shelf_slug / book_slug / chapter_slug
-                    if not dir_path.exists():
-                        dir_path.mkdir(parents=True, exist_ok=True)
-                        created_dirs.append(str(dir_path))
-                        
-                        # Create .gitkeep to preserve empty directories
-                        gitkeep = dir_path / '.gitkeep'
-                        gitkeep.touch()
+                # Create .gitkeep to preserve empty directories
+                gitkeep = dir_path / '.gitkeep'
+                gitkeep.touch()
         
         return created_dirs
 
@@ -298,6 +386,30 @@ def main():
         action='store_true',
         help='Perform migration'
     )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Also renumber pages 01, 02, ... in each directory (with --report or --migrate)'
+    )
+    parser.add_argument(
+        '--resume',
+        nargs='?',
+        const='',
+        metavar='TX_ID',
+        help='Resume an interrupted --migrate run with its original plan (default: the latest)'
+    )
+    parser.add_argument(
+        '--rollback',
+        nargs='?',
+        const='',
+        metavar='TX_ID',
+        help='Undo a migration by replaying its journal backwards (default: the latest)'
+    )
+    parser.add_argument(
+        '--transactions',
+        action='store_true',
+        help='List journaled migrations'
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -311,8 +423,40 @@ def main():
     
     args = parser.parse_args()
     
+    if args.transactions:
+        for tx in MigrationTransaction.history(args.docs_root, 'doc-migrator'):
+            print(tx.summary())
+        return
+    
+    if args.rollback is not None:
+        try:
+            tx = MigrationTransaction.for_rollback(args.docs_root, 'doc-migrator', args.rollback or None)
+        except TransactionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"Rolling back {tx.summary()}")
+        problems = tx.rollback()
+        for problem in problems:
+            print(f"❌ {problem}")
+        print("✅ Rolled back" if not problems else f"⚠️  Rolled back with {len(problems)} problems")
+        sys.exit(1 if problems else 0)
+    
     migrator = DocMigrator(args.docs_root, args.structure)
     
+    if args.resume is not None:
+        try:
+            renames = migrator.resume(args.resume or None)
+        except TransactionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print("\nPerforming migration...")
+        success = migrator.perform_migration(dry_run=False)
+        if renames:
+            print("\nRenumbering pages...")
+            success = migrator.perform_compaction(renames, dry_run=False) and success
+        migrator.finish()
+        sys.exit(0 if success else 1)
+    
     if args.analyze:
         print("Analyzing current documentation structure...\n")
         issues = migrator.analyze_current_docs()
@@ -327,9 +471,12 @@ def main():
     if args.report or args.migrate:
         print("\nGenerating migration suggestions...")
         migrations = migrator.suggest_migrations()
+        renames = migrator.compaction_plan() if args.compact else None
+        for directory in migrator.compaction_skipped:
+            print(f"⚠️  Not renumbering {directory}: its pages are named in {args.structure}")
         
         if args.report:
-            report = migrator.generate_migration_report()
+            report = migrator.generate_migration_report(renames)
             print(report)
             
             # Save report
@@ -339,8 +486,17 @@ def main():
     
     if args.migrate:
         print("\nPerforming migration...")
+        if not args.dry_run:
+            migrator.begin(renames)
         success = migrator.perform_migration(dry_run=args.dry_run)
         
+        if renames:
+            print("\nRenumbering pages...")
+            success = migrator.perform_compaction(renames, dry_run=args.dry_run) and success
+        
+        if not args.dry_run:
+            migrator.finish()
+        
         if not args.dry_run and success:
             print("\n✅ Migration completed successfully!")
             print("Run validation to ensure structure is correct:")
@@ -7,15 +7,17 @@ import os
 from pathlib import Path
 from collections import defaultdict
 
+from mosaic_docs.corpus import DocCorpus
+from mosaic_docs.parse_cache import ParseCache
+
 def get_status():
     old_docs = Path("docs/_old")
     new_docs = Path("docs")
     moved_docs = Path("docs/_old/_moved")
     
     # Count files
-    old_files = list(old_docs.rglob("*.md"))
-    old_files = [f for f in old_files if '_moved' not in str(f)]
-    moved_files = list(moved_docs.rglob("*.md"))
+    old_files = [doc.path for doc in DocCorpus(old_docs, ignore_dirs={'_moved'})]
+    moved_files = [doc.path for doc in DocCorpus(moved_docs, ignore_dirs=())]
     
     # Count by category
     old_by_category = defaultdict(int)
@@ -26,18 +28,20 @@ def get_status():
             old_by_category[category] += 1
     
     # Count new docs
-    new_files = list(new_docs.rglob("*.md"))
-    new_files = [f for f in new_files if '_old' not in str(f) and 'bookstack' not in str(f)]
+    new_files = DocCorpus(new_docs)
+    cache = ParseCache()
+    cache.prime(new_files)
+    cache.close()
     
-    # Count stubs vs real content
+    # Count stubs vs real content (stubs are generated with status: "draft")
     stubs = []
     real_content = []
-    for f in new_files:
-        content = f.read_text()
-        if 'status: "draft"' in content:
-            stubs.append(f)
+    for doc in new_files:
+        frontmatter = doc.frontmatter if isinstance(doc.frontmatter, dict) else {}
+        if frontmatter.get('status') == 'draft':
+            stubs.append(doc)
         else:
-            real_content.append(f)
+            real_content.append(doc)
     
     print("=== Documentation Migration Status ===\n")
     
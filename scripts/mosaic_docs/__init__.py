@@ -0,0 +1,66 @@
+"""
+Shared library for the MosAIc documentation tooling
+Used by the BookStack sync, validation and migration scripts in scripts/
+"""
+
+from .structure import Shelf, Book, Chapter, Page, StructureModel, load_structure
+from .classifier import Classifier, load_classifier
+from .corpus import DEFAULT_IGNORE_DIRS, Document, DocCorpus, heading_anchor, split_frontmatter
+from .fingerprints import ParagraphIndex
+from .links import Link, LinkIndex, relocate_link, resolve_link, rewrite_links
+from .migration_state import MigrationState
+from .minhash import DuplicateCluster, NearDuplicateFinder, SignatureStore, find_near_duplicates
+from .numbering import NumberAllocator, page_number
+from .overlay import DryRunOverlay
+from .parse_cache import ParseCache
+from .profiling import Profiler
+from .reporters import REPORTERS, Reporter
+from .results_cache import ResultsCache
+from .rules import RULES, Rule, RuleContext, ValidationError, register, select_rules
+from .synthetic import CorpusSpec, generate_corpus
+from .transaction import MigrationTransaction, TransactionError
+
+__all__ = [
+    'Classifier',
+    'load_classifier',
+    'DEFAULT_IGNORE_DIRS',
+    'Document',
+    'DocCorpus',
+    'heading_anchor',
+    'ParagraphIndex',
+    'Link',
+    'LinkIndex',
+    'relocate_link',
+    'resolve_link',
+    'rewrite_links',
+    'MigrationState',
+    'DuplicateCluster',
+    'NearDuplicateFinder',
+    'SignatureStore',
+    'find_near_duplicates',
+    'NumberAllocator',
+    'page_number',
+    'DryRunOverlay',
+    'ParseCache',
+    'Profiler',
+    'REPORTERS',
+    'Reporter',
+    'ResultsCache',
+    'RULES',
+    'Rule',
+    'RuleContext',
+    'ValidationError',
+    'register',
+    'select_rules',
+    'split_frontmatter',
+    'CorpusSpec',
+    'generate_corpus',
+    'MigrationTransaction',
+    'TransactionError',
+    'Shelf',
+    'Book',
+    'Chapter',
+    'Page',
+    'StructureModel',
+    'load_structure',
+]
@@ -0,0 +1,129 @@
+"""
+On-disk cache location and format shared by the documentation tools
+The cache lives in a directory only the current user can write, and holds
+plain data only (tagged JSON, never pickle), so a file planted in it by
+someone else cannot run code in the tools that read it.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import stat
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Optional
+
+# Where earlier versions kept the cache, relative to the working directory
+LEGACY_CACHE_DIR = '.cache/mosaic-docs'
+
+_fallback_dir: Optional[Path] = None
+
+
+def default_cache_dir() -> Path:
+    """$XDG_CACHE_HOME/mosaic-docs, or ~/.cache/mosaic-docs"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'mosaic-docs'
+
+
+def _is_private_dir(path: Path) -> bool:
+    """Create path if missing; True when it is a real directory that only this user can write"""
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if hasattr(os, 'getuid'):
+        if st.st_uid != os.getuid():
+            return False
+        if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            try:
+                os.chmod(path, 0o700)
+            except OSError:
+                return False
+    return os.access(path, os.W_OK)
+
+
+def cache_dir() -> Path:
+    """Return the cache directory, honouring MOSAIC_DOCS_CACHE
+
+    The directory must belong to the current user and not be writable by
+    anyone else. The cache is only an optimisation: when no such directory
+    can be had, a fresh private temporary directory is used for this process.
+    """
+    global _fallback_dir
+    path = Path(os.environ.get('MOSAIC_DOCS_CACHE') or default_cache_dir())
+    if _is_private_dir(path):
+        return path
+    if _fallback_dir is None:
+        _fallback_dir = Path(tempfile.mkdtemp(prefix='mosaic-docs-'))
+    return _fallback_dir
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Cache format: JSON where every object is a one-key tag, so values keep their types
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {'dict': [[_encode(key), _encode(item)] for key, item in value.items()]}
+    if isinstance(value, tuple):
+        return {'tuple': [_encode(item) for item in value]}
+    if isinstance(value, frozenset):
+        return {'frozenset': [_encode(item) for item in value]}
+    if isinstance(value, set):
+        return {'set': [_encode(item) for item in value]}
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'date': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'bytes': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"Cannot cache a {type(value).__name__} value")
+
+
+_DECODERS = {
+    'dict': lambda items: {key: item for key, item in items},
+    'tuple': tuple,
+    'frozenset': frozenset,
+    'set': set,
+    'datetime': datetime.fromisoformat,
+    'date': date.fromisoformat,
+    'bytes': base64.b64decode,
+}
+
+
+def _decode(tagged: dict) -> Any:
+    if len(tagged) != 1:
+        raise ValueError("Malformed cache entry")
+    (tag, value), = tagged.items()
+    if tag not in _DECODERS:
+        raise ValueError(f"Unknown cache entry type {tag!r}")
+    return _DECODERS[tag](value)
+
+
+def dump_data(value: Any) -> bytes:
+    """Serialise plain data: what yaml.safe_load produces, plus tuples; raises TypeError otherwise"""
+    return json.dumps(_encode(value), separators=(',', ':')).encode('utf-8')
+
+
+def load_data(blob: bytes) -> Any:
+    """Inverse of dump_data; raises ValueError for anything it did not write"""
+    try:
+        return json.loads(blob, object_hook=_decode)
+    except (TypeError, KeyError) as e:
+        raise ValueError(f"Malformed cache entry: {e}") from None
@@ -0,0 +1,145 @@
+"""
+Multi-pattern classifier for migration path mapping
+Classification rules are declared in YAML (classifiers.yaml next to this
+module) as ordered rule sets. Each rule has path and/or content keyword
+conditions and a target. Every keyword in a rule set is compiled into one
+combined regular expression, so a path or body is scanned once however many
+rules there are, and the first rule whose conditions hold wins.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import yaml
+
+DEFAULT_RULES_FILE = Path(__file__).with_name('classifiers.yaml')
+
+# A condition is a list of keyword groups: every group needs at least one keyword present
+Condition = Tuple[FrozenSet[str], ...]
+
+
+def _condition(value: Any) -> Condition:
+    """Parse `[a, b]` (any of a, b) or `[[a, b], [c]]` ((a or b) and c); keywords are case-insensitive"""
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = [value]
+    if any(isinstance(item, list) for item in value):
+        groups = [item if isinstance(item, list) else [item] for item in value]
+    else:
+        groups = [value]
+    return tuple(frozenset(str(term).lower() for term in group) for group in groups)
+
+
+@dataclass
+class ClassifierRule:
+    """One rule: the target applies when the path and content conditions both hold"""
+    target: Optional[str]   # None means "matched, but leave the file alone"
+    path: Condition = ()
+    content: Condition = ()
+    name: str = ''
+    priority: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def matches(self, path_terms: FrozenSet[str], content_terms: Optional[FrozenSet[str]]) -> bool:
+        if not all(group & path_terms for group in self.path):
+            return False
+        return all(group & content_terms for group in self.content)
+
+
+class KeywordMatcher:
+    """Finds which of a set of keywords occur in a text, in one regex pass
+
+    A lookahead at every position reports the longest keyword starting there;
+    keywords that are prefixes of it are credited too, so overlapping matches
+    (deploy / deployment) are all found.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(keywords), key=lambda term: (-len(term), term))
+        self.regex = None
+        if self.keywords:
+            alternation = '|'.join(re.escape(term) for term in self.keywords)
+            self.regex = re.compile(f"(?=({alternation}))", re.IGNORECASE)
+        self.prefixes = {term: frozenset(other for other in self.keywords if term.startswith(other))
+                         for term in self.keywords}
+
+    def find(self, text: str) -> FrozenSet[str]:
+        if self.regex is None or not text:
+            return frozenset()
+        found = set()
+        for match in self.regex.finditer(text):
+            term = match.group(1).lower()
+            if term not in found:
+                found |= self.prefixes.get(term, {term})
+        return frozenset(found)
+
+
+class Classifier:
+    """An ordered rule set compiled into one path matcher and one content matcher"""
+
+    def __init__(self, name: str, rules: List[ClassifierRule], description: str = ''):
+        self.name = name
+        self.description = description
+        # Higher priority first; declaration order breaks ties
+        self.rules = sorted(rules, key=lambda rule: -rule.priority)
+        self.path_matcher = KeywordMatcher(term for rule in rules for group in rule.path for term in group)
+        self.content_matcher = KeywordMatcher(term for rule in rules for group in rule.content for term in group)
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> 'Classifier':
+        rules = []
+        for i, entry in enumerate(data.get('rules') or []):
+            if 'target' not in entry:
+                raise ValueError(f"Classifier {name}: rule {i + 1} has no target")
+            extra = {key: value for key, value in entry.items()
+                     if key not in ('target', 'path', 'content', 'name', 'priority')}
+            rules.append(ClassifierRule(
+                target=entry['target'],
+                path=_condition(entry.get('path')),
+                content=_condition(entry.get('content')),
+                name=entry.get('name') or f"rule-{i + 1}",
+                priority=int(entry.get('priority', 0)),
+                extra=extra
+            ))
+        return cls(name, rules, data.get('description', ''))
+
+    def match(self, path: str, content: Union[str, Callable[[], str], None] = None) -> Optional[ClassifierRule]:
+        """First rule that holds for path and content; content (or a callable returning it) is only scanned if needed"""
+        path_terms = self.path_matcher.find(path)
+        content_terms = None
+        for rule in self.rules:
+            if rule.content and content_terms is None:
+                text = content() if callable(content) else content
+                content_terms = self.content_matcher.find(text or '')
+            if rule.matches(path_terms, content_terms):
+                return rule
+        return None
+
+    def classify(self, path: str, content: Union[str, Callable[[], str], None] = None) -> Optional[str]:
+        """Target of the first matching rule, or None"""
+        rule = self.match(path, content)
+        return rule.target if rule else None
+
+
+_loaded: Dict[str, Dict[str, Classifier]] = {}
+
+
+def load_classifiers(rules_file: Union[str, Path, None] = None) -> Dict[str, Classifier]:
+    """All rule sets declared in a classifier YAML file, compiled once per process"""
+    rules_file = str(rules_file or DEFAULT_RULES_FILE)
+    if rules_file not in _loaded:
+        with open(rules_file, 'r') as f:
+            data = yaml.safe_load(f) or {}
+        _loaded[rules_file] = {name: Classifier.from_dict(name, rule_set)
+                               for name, rule_set in (data.get('rule_sets') or {}).items()}
+    return _loaded[rules_file]
+
+
+def load_classifier(name: str, rules_file: Union[str, Path, None] = None) -> Classifier:
+    classifiers = load_classifiers(rules_file)
+    if name not in classifiers:
+        raise KeyError(f"No classifier rule set named {name!r} in {rules_file or DEFAULT_RULES_FILE}")
+    return classifiers[name]
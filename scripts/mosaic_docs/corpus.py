@@ -0,0 +1,311 @@
+"""
+Documentation corpus: one filesystem scan, lazily parsed documents
+Walks a docs tree once with os.scandir, applies the shared ignore rules and
+exposes Document objects whose frontmatter, body, headings and links are
+parsed on first access and memoized.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import yaml
+
+# Directories never treated as live documentation (dot-directories are always skipped)
+DEFAULT_IGNORE_DIRS = frozenset({'_old', '_moved', 'bookstack', 'drafts', 'archive'})
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+LINK_RE = re.compile(r'(?<!!)\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+INLINE_LINK_RE = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+ANCHOR_STRIP_RE = re.compile(r'[^\w\- ]', re.UNICODE)
+
+_UNSET = object()
+
+
+def split_frontmatter(content: str) -> Tuple[Optional[str], str]:
+    """Split markdown into (raw frontmatter, body); raw is None without a frontmatter block"""
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            return parts[1], parts[2].strip()
+    return None, content
+
+
+def heading_anchor(text: str) -> str:
+    """GitHub-style anchor slug for a heading"""
+    text = INLINE_LINK_RE.sub(r'\1', text)
+    return ANCHOR_STRIP_RE.sub('', text.strip().lower()).replace(' ', '-')
+
+
+def iter_prose_lines(text: str) -> Iterator[str]:
+    """Yield lines outside fenced code blocks"""
+    in_fence = False
+    for line in text.split('\n'):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if not in_fence:
+            yield line
+
+
+class Document:
+    """A markdown file in the corpus; content is read and parsed on demand"""
+    __slots__ = ('path', 'rel_path', '_text', '_frontmatter_raw', '_body', '_state',
+                 '_frontmatter', '_frontmatter_error', '_headings', '_links', '_anchors', '_word_count')
+
+    def __init__(self, path: Path, rel_path: str):
+        self.path = path
+        self.rel_path = rel_path
+        self._reset()
+
+    def _reset(self):
+        self._text = _UNSET
+        self._frontmatter_raw = _UNSET
+        self._body = _UNSET
+        self._state = _UNSET
+        self._frontmatter = _UNSET
+        self._frontmatter_error = None
+        self._headings = _UNSET
+        self._links = _UNSET
+        self._anchors = _UNSET
+        self._word_count = _UNSET
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        return tuple(self.rel_path.split('/'))
+
+    @property
+    def text(self) -> str:
+        if self._text is _UNSET:
+            self._text = self.path.read_text(encoding='utf-8')
+        return self._text
+
+    def prime_text(self, content: str) -> None:
+        """Use content that was already read instead of reading the file again"""
+        self._reset()
+        self._text = content
+
+    def write(self, content: str) -> None:
+        """Write new content and drop everything parsed from the old content"""
+        self.path.write_text(content, encoding='utf-8')
+        self._reset()
+        self._text = content
+
+    def _split(self):
+        if self._frontmatter_raw is _UNSET:
+            self._frontmatter_raw, self._body = split_frontmatter(self.text)
+
+    @property
+    def frontmatter_state(self) -> str:
+        """'present', 'missing' (no leading ---) or 'invalid' (unterminated block)"""
+        if self._state is _UNSET:
+            if not self.text.startswith('---'):
+                self._state = 'missing'
+            else:
+                self._state = 'present' if self.frontmatter_raw is not None else 'invalid'
+        return self._state
+
+    @property
+    def has_frontmatter_block(self) -> bool:
+        return self.frontmatter_state == 'present'
+
+    @property
+    def frontmatter_raw(self) -> Optional[str]:
+        self._split()
+        return self._frontmatter_raw
+
+    @property
+    def body(self) -> str:
+        self._split()
+        return self._body
+
+    @property
+    def frontmatter(self) -> Any:
+        """Parsed frontmatter (None when absent, empty or unparseable)"""
+        if self._frontmatter is _UNSET:
+            self._frontmatter = None
+            raw = self.frontmatter_raw if self.has_frontmatter_block else None
+            if raw is not None:
+                try:
+                    self._frontmatter = yaml.safe_load(raw)
+                except yaml.YAMLError as e:
+                    self._frontmatter_error = e
+        return self._frontmatter
+
+    @property
+    def frontmatter_error(self) -> Optional[yaml.YAMLError]:
+        self.frontmatter
+        return self._frontmatter_error
+
+    @property
+    def headings(self) -> List[Tuple[int, str]]:
+        """ATX headings as (level, text), ignoring fenced code"""
+        if self._headings is _UNSET:
+            self._headings = []
+            for line in iter_prose_lines(self.body):
+                match = HEADING_RE.match(line)
+                if match:
+                    self._headings.append((len(match.group(1)), match.group(2)))
+        return self._headings
+
+    @property
+    def links(self) -> List[Tuple[str, str]]:
+        """Inline markdown links as (text, target), ignoring images and fenced code"""
+        if self._links is _UNSET:
+            self._links = []
+            for line in iter_prose_lines(self.body):
+                self._links.extend(LINK_RE.findall(line))
+        return self._links
+
+    @property
+    def anchors(self) -> List[str]:
+        """Heading anchors, with GitHub's -1, -2 suffixes for repeated headings"""
+        if self._anchors is _UNSET:
+            seen: Dict[str, int] = {}
+            self._anchors = []
+            for _, text in self.headings:
+                anchor = heading_anchor(text)
+                count = seen.get(anchor, 0)
+                seen[anchor] = count + 1
+                self._anchors.append(f"{anchor}-{count}" if count else anchor)
+        return self._anchors
+
+    @property
+    def word_count(self) -> int:
+        if self._word_count is _UNSET:
+            self._word_count = len(self.body.split())
+        return self._word_count
+
+    def facts(self) -> Dict[str, Any]:
+        """Everything derived from parsing, in a form the parse cache can store"""
+        error = self.frontmatter_error
+        return {
+            'frontmatter_state': self.frontmatter_state,
+            'frontmatter': self.frontmatter,
+            'frontmatter_error': str(error) if error else None,
+            'headings': self.headings,
+            'anchors': self.anchors,
+            'links': self.links,
+            'word_count': self.word_count,
+        }
+
+    def prime(self, facts: Dict[str, Any]) -> None:
+        """Fill the parse memo from cached facts so the file is never read"""
+        self._state = facts['frontmatter_state']
+        self._frontmatter = facts['frontmatter']
+        error = facts['frontmatter_error']
+        self._frontmatter_error = yaml.YAMLError(error) if error else None
+        self._headings = facts['headings']
+        self._anchors = facts['anchors']
+        self._links = facts['links']
+        self._word_count = facts['word_count']
+
+    @property
+    def title(self) -> str:
+        frontmatter = self.frontmatter
+        if isinstance(frontmatter, dict) and frontmatter.get('title'):
+            return str(frontmatter['title'])
+        for level, text in self.headings:
+            if level == 1:
+                return text
+        return self.stem.replace('-', ' ').title()
+
+    def __repr__(self) -> str:
+        return f"Document({self.rel_path!r})"
+
+
+class DocCorpus:
+    """All markdown documents under a root, found with a single directory walk
+
+    With `paths`, only those root-relative files are included and no walk is
+    done; `directories` then holds just their existing ancestor directories.
+    """
+
+    def __init__(self, root, ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS, suffix: str = '.md',
+                 paths: Optional[Iterable[str]] = None):
+        self.root = Path(root)
+        self.ignore_dirs = frozenset(ignore_dirs)
+        self.suffix = suffix
+        self.documents: List[Document] = []
+        self.by_path: Dict[str, Document] = {}
+        self.directories = set()
+        self.complete = paths is None
+        if paths is None:
+            self._scan()
+        else:
+            self._add_paths(paths)
+
+    def _scan(self):
+        stack = [('', str(self.root))]
+        while stack:
+            rel_dir, abs_dir = stack.pop()
+            try:
+                entries = list(os.scandir(abs_dir))
+            except (FileNotFoundError, NotADirectoryError, PermissionError):
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir():
+                    if entry.name not in self.ignore_dirs:
+                        self.directories.add(rel_path)
+                        stack.append((rel_path, entry.path))
+                elif entry.name.endswith(self.suffix) and entry.is_file():
+                    self.by_path[rel_path] = Document(Path(self.root, rel_path), rel_path)
+
+        # Deterministic order regardless of directory listing order
+        self.documents = [self.by_path[path] for path in sorted(self.by_path)]
+
+    def _add_paths(self, paths: Iterable[str]):
+        for rel_path in sorted(set(paths)):
+            parts = rel_path.split('/')
+            if any(part.startswith('.') for part in parts):
+                continue
+            if any(part in self.ignore_dirs for part in parts[:-1]):
+                continue
+
+            for depth in range(1, len(parts)):
+                rel_dir = '/'.join(parts[:depth])
+                if rel_dir in self.directories:
+                    continue
+                if not os.path.isdir(os.path.join(self.root, rel_dir)):
+                    break
+                self.directories.add(rel_dir)
+
+            if rel_path.endswith(self.suffix) and os.path.isfile(os.path.join(self.root, rel_path)):
+                self.by_path[rel_path] = Document(Path(self.root, rel_path), rel_path)
+
+        self.documents = [self.by_path[path] for path in sorted(self.by_path)]
+
+    def includes(self, rel_path: str) -> bool:
+        """Whether a root-relative file path falls under this corpus' suffix and ignore rules"""
+        parts = rel_path.split('/')
+        if parts[0] == '..' or not rel_path.endswith(self.suffix):
+            return False
+        if any(part.startswith('.') for part in parts):
+            return False
+        return not any(part in self.ignore_dirs for part in parts[:-1])
+
+    def __iter__(self) -> Iterator[Document]:
+        return iter(self.documents)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def get(self, rel_path: str) -> Optional[Document]:
+        return self.by_path.get(rel_path)
+
+    def named(self, filename: str) -> Iterator[Document]:
+        """Documents with the given file name, e.g. README.md"""
+        return (doc for doc in self.documents if doc.name == filename)
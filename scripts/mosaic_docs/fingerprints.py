@@ -0,0 +1,137 @@
+"""
+Paragraph and section fingerprints for duplicate-free merges
+Markdown is split into blocks (paragraphs, lists, fenced code, headings) and
+sections (a heading and the blocks under it). Each is fingerprinted by a
+short hash of its whitespace- and case-normalized text, so content merged
+into a page a second time, or shared by several sources, is recognised and
+left out.
+"""
+
+import hashlib
+from typing import Iterator, List, Set
+
+from .corpus import FENCE_RE, HEADING_RE
+
+# Blocks shorter than this (normalized) are structure, not content: rules, labels, "TODO"
+MIN_PARAGRAPH_CHARS = 40
+
+
+def normalize(text: str) -> str:
+    return ' '.join(text.split()).casefold()
+
+
+def fingerprint(text: str) -> bytes:
+    return hashlib.blake2b(normalize(text).encode('utf-8'), digest_size=8).digest()
+
+
+def split_blocks(text: str) -> List[str]:
+    """Blank-line separated blocks; a fenced code block is one block and a heading is always its own"""
+    blocks, current = [], []
+    in_fence = False
+
+    def flush():
+        if current:
+            blocks.append('\n'.join(current))
+            current.clear()
+
+    for line in text.split('\n'):
+        if FENCE_RE.match(line):
+            if not in_fence:
+                flush()
+            current.append(line)
+            in_fence = not in_fence
+            if not in_fence:
+                flush()
+        elif in_fence:
+            current.append(line)
+        elif not line.strip():
+            flush()
+        elif HEADING_RE.match(line):
+            flush()
+            blocks.append(line)
+        else:
+            current.append(line)
+    flush()
+    return blocks
+
+
+def is_heading(block: str) -> bool:
+    return '\n' not in block and HEADING_RE.match(block) is not None
+
+
+def is_content(block: str) -> bool:
+    """Whether a block is substantial enough to count as duplicated content"""
+    return not is_heading(block) and len(normalize(block)) >= MIN_PARAGRAPH_CHARS
+
+
+def split_sections(blocks: List[str]) -> Iterator[List[str]]:
+    """Group blocks into sections, each starting at a heading (the first may have none)"""
+    section: List[str] = []
+    for block in blocks:
+        if is_heading(block) and section:
+            yield section
+            section = []
+        section.append(block)
+    if section:
+        yield section
+
+
+class ParagraphIndex:
+    """Fingerprints of the sections and paragraphs already in a page"""
+
+    def __init__(self, text: str = ''):
+        self.paragraphs: Set[bytes] = set()
+        self.sections: Set[bytes] = set()
+        self.skipped_paragraphs = 0
+        self.skipped_sections = 0
+        if text:
+            self.add(text)
+
+    def add(self, text: str) -> None:
+        for section in split_sections(split_blocks(text)):
+            self._add_section(section)
+
+    def _add_section(self, section: List[str]) -> None:
+        if any(is_content(block) for block in section):
+            self.sections.add(fingerprint('\n\n'.join(section)))
+        self.paragraphs.update(fingerprint(block) for block in section if is_content(block))
+
+    def novel(self, text: str) -> str:
+        """The part of text not already indexed, which is then indexed too
+
+        Sections seen before are dropped whole, then paragraphs seen before
+        (including earlier in text). Headings stay unless their section has
+        nothing new left. Returns text unchanged when nothing was dropped,
+        and '' when something was and nothing new remains.
+        """
+        kept_sections = []
+        dropped = False
+        for section in split_sections(split_blocks(text)):
+            substantial = any(is_content(block) for block in section)
+            if substantial and fingerprint('\n\n'.join(section)) in self.sections:
+                self.skipped_sections += 1
+                dropped = True
+                continue
+            kept, removed = [], False
+            for block in section:
+                if is_content(block):
+                    digest = fingerprint(block)
+                    if digest in self.paragraphs:
+                        self.skipped_paragraphs += 1
+                        removed = True
+                        continue
+                    self.paragraphs.add(digest)
+                kept.append(block)
+            if substantial:
+                self.sections.add(fingerprint('\n\n'.join(section)))
+            if removed:
+                dropped = True
+                if not any(is_content(block) for block in kept):
+                    continue
+            kept_sections.append(kept)
+
+        if not dropped:
+            return text
+        if not any(is_content(block) for section in kept_sections for block in section):
+            return ''
+        return '\n\n'.join('\n\n'.join(section) for section in kept_sections)
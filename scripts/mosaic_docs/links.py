@@ -0,0 +1,242 @@
+"""
+Link and anchor index for the documentation corpus
+Indexes every page path and heading anchor once, then resolves every
+relative link and #fragment against that index with dictionary lookups.
+Produces broken links, links to pages missing from the structure and the
+reverse-link graph (which pages link to a given target), and rewrites links
+when pages move. Single pages (including unsaved editor buffers) and the
+links pointing into a set of pages can be checked without indexing the rest.
+"""
+
+import os
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote
+
+from .corpus import FENCE_RE, DocCorpus, Document
+from .structure import StructureModel
+
+# Links with a scheme (https:, mailto:) or protocol-relative links are not checked
+EXTERNAL_RE = re.compile(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)')
+
+# Inline links and images; images move with their page too, so rewriting includes them
+REWRITE_LINK_RE = re.compile(r'!?\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+
+
+def resolve_link(source: str, target: str) -> Tuple[Optional[str], str]:
+    """Resolve a relative link from a docs-relative page into (docs-relative path, fragment)
+
+    The path is None for same-page links such as '#usage'. Links starting
+    with / are taken relative to the docs root.
+    """
+    path, _, fragment = target.partition('#')
+    path = unquote(path.split('?', 1)[0])
+    if not path:
+        return None, unquote(fragment)
+    if path.startswith('/'):
+        resolved = posixpath.normpath(path.lstrip('/'))
+    else:
+        resolved = posixpath.normpath(posixpath.join(posixpath.dirname(source), path))
+    return resolved, unquote(fragment)
+
+
+def relocate_link(target: str, old_source: str, new_source: str, moves: Dict[str, str]) -> Optional[str]:
+    """Rewrite a link target for a page moved from old_source to new_source
+
+    `moves` maps docs-relative old paths to new paths for every page moved
+    in the same batch. Returns None when the link needs no change.
+    """
+    if EXTERNAL_RE.match(target):
+        return None
+    resolved, _ = resolve_link(old_source, target)
+    if resolved is None:
+        return None  # Same-page #fragment
+    new_path = moves.get(resolved, resolved)
+    if new_path == resolved and posixpath.dirname(old_source) == posixpath.dirname(new_source):
+        return None
+
+    # Keep the query, fragment and trailing slash as written
+    path, hash_, fragment = target.partition('#')
+    path, question, query = path.partition('?')
+    if path.startswith('/'):
+        if new_path == resolved:
+            return None
+        href = '/' + new_path
+    else:
+        href = posixpath.relpath(new_path, posixpath.dirname(new_source) or '.')
+        if path.startswith('./') and not href.startswith('../'):
+            href = './' + href
+    if path.endswith('/') and not href.endswith('/'):
+        href += '/'
+    if '%' in path:
+        href = quote(href)
+    href += question + query + hash_ + fragment
+    return None if href == target else href
+
+
+def rewrite_links(text: str, old_source: str, new_source: str, moves: Dict[str, str]) -> Tuple[str, int]:
+    """Rewrite every relative link and image in a page's text after a batch of moves
+
+    Returns (text, number of links changed). Fenced code is left alone.
+    """
+    changed = 0
+
+    def replace(match):
+        nonlocal changed
+        href = relocate_link(match.group(2), old_source, new_source, moves)
+        if href is None:
+            return match.group(0)
+        changed += 1
+        start, end = match.start(2) - match.start(0), match.end(2) - match.start(0)
+        return match.group(0)[:start] + href + match.group(0)[end:]
+
+    lines = text.split('\n')
+    in_fence = False
+    for i, line in enumerate(lines):
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if not in_fence and '](' in line:
+            lines[i] = REWRITE_LINK_RE.sub(replace, line)
+    return ('\n'.join(lines), changed) if changed else (text, 0)
+
+
+@dataclass
+class Link:
+    """A relative link found in a page"""
+    source: str     # docs-relative path of the linking page
+    text: str
+    target: str     # link target as written
+    resolved: str   # docs-relative path the link points at (the source itself for #fragments)
+    fragment: str
+
+
+def page_links(doc: Document) -> Iterator[Link]:
+    """Relative links in a page, resolved"""
+    for text, target in doc.links:
+        if EXTERNAL_RE.match(target):
+            continue
+        resolved, fragment = resolve_link(doc.rel_path, target)
+        yield Link(doc.rel_path, text, target, resolved or doc.rel_path, fragment)
+
+
+def links_into(corpus: DocCorpus, targets: Set[str]) -> Iterator[Link]:
+    """Links from pages outside targets to pages in targets (which may no longer exist)"""
+    for doc in corpus:
+        if doc.rel_path in targets:
+            continue
+        for link in page_links(doc):
+            if link.resolved in targets:
+                yield link
+
+
+class LinkIndex:
+    """Resolves every relative link in a corpus against its paths and heading anchors
+
+    With build=False nothing is indexed up front; check_page and check_links
+    resolve what they are given, loading target pages as needed.
+    """
+
+    def __init__(self, corpus: DocCorpus, structure: Optional[StructureModel] = None, build: bool = True):
+        self.corpus = corpus
+        self.structure = structure
+        self.root = str(corpus.root)
+        self.links: List[Link] = []
+        self.broken: List[Tuple[Link, str]] = []
+        # Links to pages that exist but are not listed in the structure
+        self.orphan_links: List[Link] = []
+        # Target path -> sorted pages linking to it
+        self.reverse: Dict[str, List[str]] = {}
+        self._pages: Dict[str, Optional[Document]] = {}
+        self._anchors: Dict[str, Set[str]] = {}
+        self._exists: Dict[str, bool] = {}
+        if build:
+            self._build()
+
+    def _path_exists(self, rel_path: str) -> bool:
+        if rel_path not in self._exists:
+            self._exists[rel_path] = os.path.exists(os.path.join(self.root, rel_path))
+        return self._exists[rel_path]
+
+    def page(self, rel_path: str) -> Optional[Document]:
+        """The corpus page at rel_path; a scoped corpus loads pages outside its selection from disk"""
+        if rel_path not in self._pages:
+            doc = self.corpus.get(rel_path)
+            if doc is None and not self.corpus.complete and self.corpus.includes(rel_path) \
+                    and self._path_exists(rel_path):
+                doc = Document(Path(self.root, rel_path), rel_path)
+            self._pages[rel_path] = doc
+        return self._pages[rel_path]
+
+    def anchors(self, rel_path: str) -> Set[str]:
+        if rel_path not in self._anchors:
+            doc = self.page(rel_path)
+            try:
+                self._anchors[rel_path] = set(doc.anchors) if doc else set()
+            except (OSError, UnicodeDecodeError):
+                self._anchors[rel_path] = set()
+        return self._anchors[rel_path]
+
+    def _check(self, link: Link, current: Optional[Document] = None) -> Optional[str]:
+        """Reason the link is broken, or None; links into `current` use its headings, not the file's"""
+        rel_path = link.resolved
+        if current is not None and rel_path == current.rel_path:
+            return self._check_anchor(link, set(current.anchors))
+        if rel_path == '..' or rel_path.startswith('../'):
+            # Outside the docs root: only existence can be checked
+            return None if self._path_exists(rel_path) else 'File not found'
+
+        if self.page(rel_path) is None:
+            if rel_path in self.corpus.directories or self._path_exists(rel_path):
+                return None  # A directory, an asset or a page in an ignored directory
+            return 'File not found'
+
+        return self._check_anchor(link, self.anchors(rel_path))
+
+    @staticmethod
+    def _check_anchor(link: Link, anchors: Set[str]) -> Optional[str]:
+        if link.fragment and link.fragment not in anchors and link.fragment.lower() not in anchors:
+            return f"Heading #{link.fragment} not found in {link.resolved}"
+        return None
+
+    def _is_orphan_link(self, link: Link) -> bool:
+        return self.structure is not None and link.resolved != link.source \
+            and self.page(link.resolved) is not None \
+            and link.resolved not in self.structure.by_file_path
+
+    def check_links(self, links: Iterable[Link],
+                    current: Optional[Document] = None) -> Tuple[List[Tuple[Link, str]], List[Link]]:
+        """(broken links with reasons, links to pages missing from the structure) among links"""
+        broken, orphan_links = [], []
+        for link in links:
+            reason = self._check(link, current)
+            if reason:
+                broken.append((link, reason))
+            elif self._is_orphan_link(link):
+                orphan_links.append(link)
+        return broken, orphan_links
+
+    def check_page(self, doc: Document) -> Tuple[List[Tuple[Link, str]], List[Link]]:
+        """check_links for the links in one page, which may be an unsaved buffer"""
+        return self.check_links(page_links(doc), current=doc)
+
+    def _build(self):
+        reverse: Dict[str, Set[str]] = {}
+        for doc in self.corpus:
+            links = list(page_links(doc))
+            self.links.extend(links)
+            for link in links:
+                if link.resolved != doc.rel_path:
+                    reverse.setdefault(link.resolved, set()).add(doc.rel_path)
+            broken, orphan_links = self.check_links(links)
+            self.broken.extend(broken)
+            self.orphan_links.extend(orphan_links)
+
+        self.reverse = {target: sorted(sources) for target, sources in sorted(reverse.items())}
+
+    def linked_from(self, rel_path: str) -> List[str]:
+        """Pages that link to rel_path"""
+        return self.reverse.get(rel_path, [])
@@ -0,0 +1,359 @@
+"""
+Language server for the documentation validator
+Speaks the Language Server Protocol over stdio. The structure model and the
+parsed documents stay in memory: an edited, saved or changed file is
+re-checked on its own and its diagnostics are pushed to the editor, while
+structure-wide findings are recomputed from the in-memory file listing. A
+polling watcher picks up changes made outside the editor (checkouts, moves);
+with the links rule, pages linking to a changed file are re-checked too.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .corpus import DEFAULT_IGNORE_DIRS, DocCorpus, Document
+from .links import links_into
+from .parse_cache import ParseCache
+from .rules import RULES, TREE, Rule, RuleContext, ValidationError
+from .structure import load_structure
+
+logger = logging.getLogger(__name__)
+
+# LSP DiagnosticSeverity
+SEVERITY = {'error': 1, 'warning': 2, 'info': 3}
+
+
+def path_to_uri(path: Path) -> str:
+    return Path(path).resolve().as_uri()
+
+
+def uri_to_path(uri: str) -> Path:
+    return Path(unquote(urlparse(uri).path))
+
+
+class LspStream:
+    """Content-Length framed JSON-RPC messages over a pair of byte streams"""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO):
+        self.reader = reader
+        self.writer = writer
+        self.lock = threading.Lock()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        length = None
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode('ascii').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value.strip())
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode('utf-8'))
+
+    def write(self, message: Dict[str, Any]) -> None:
+        body = json.dumps(message).encode('utf-8')
+        with self.lock:
+            self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+            self.writer.flush()
+
+
+class ValidationServer:
+    """Resident validator: holds the structure and documents, re-checks files as they change"""
+
+    def __init__(self, structure_file: str, docs_root: str, rule_names: List[str],
+                 stream: LspStream, poll_interval: float = 2.0):
+        self.structure_file = Path(structure_file)
+        self.docs_root = Path(docs_root)
+        self.rule_names = rule_names
+        self.stream = stream
+        self.poll_interval = poll_interval
+        self.lock = threading.RLock()
+        self.stopping = threading.Event()
+        self.shutdown_requested = False
+
+        self.structure = None
+        self.rules: List[Rule] = []
+        self.ignore_dirs = DEFAULT_IGNORE_DIRS
+        self.corpus: Optional[DocCorpus] = None
+        # Unsaved editor buffers by docs-relative path
+        self.overlays: Dict[str, str] = {}
+        # (size, mtime_ns) per file and for the structure definition, as last seen by the watcher
+        self.file_stats: Dict[str, Tuple[int, int]] = {}
+        self.structure_stat: Optional[Tuple[int, int]] = None
+        self.published: Dict[str, bool] = {}
+
+    # Loading
+
+    def load(self) -> None:
+        """(Re)load the structure definition and the docs tree"""
+        self.structure = load_structure(str(self.structure_file))
+        self.rules = [RULES[name](self.structure.conventions) for name in self.rule_names]
+        self.ignore_dirs = self.structure.conventions.get('skip_dirs', DEFAULT_IGNORE_DIRS)
+        self.structure_stat = self._stat(self.structure_file)
+
+        self.corpus = DocCorpus(self.docs_root, ignore_dirs=self.ignore_dirs)
+        cache = ParseCache()
+        cache.prime(self.corpus)
+        cache.close()
+        self.file_stats = self._stat_corpus(self.corpus)
+
+    def _stat(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _stat_corpus(self, corpus: DocCorpus) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for doc in corpus:
+            stat = self._stat(doc.path)
+            if stat:
+                stats[doc.rel_path] = stat
+        return stats
+
+    def _rel_path(self, uri: str) -> Optional[str]:
+        """Docs-relative path for a URI, or None when the file is not a validated page"""
+        try:
+            rel_path = uri_to_path(uri).resolve().relative_to(self.docs_root.resolve()).as_posix()
+        except ValueError:
+            return None
+        return rel_path if self.corpus.includes(rel_path) else None
+
+    # Checking
+
+    def _context(self) -> RuleContext:
+        return RuleContext(self.structure, self.docs_root, self.corpus)
+
+    def check_structure(self) -> List[ValidationError]:
+        """Findings that belong to the structure definition rather than to one page"""
+        context = self._context()
+        findings = []
+        for rule in self.rules:
+            if type(rule).check_structure is not Rule.check_structure:
+                findings.extend(rule.check_structure(context))
+        return findings
+
+    def check_file(self, rel_path: str) -> List[ValidationError]:
+        """Run the per-file rules on the editor buffer if open, else on the file on disk"""
+        if rel_path in self.overlays:
+            doc = Document(self.docs_root / rel_path, rel_path)
+            doc.prime_text(self.overlays[rel_path])
+        else:
+            doc = self.corpus.get(rel_path)
+            if doc is None:
+                return []
+        context = self._context()
+        findings = []
+        for rule in self.rules:
+            if rule.checks_files:
+                findings.extend(rule.check_file(doc, context))
+        return findings
+
+    # Publishing
+
+    def _diagnostic(self, finding: ValidationError, prefix_path: bool) -> Dict[str, Any]:
+        message = finding.message
+        if prefix_path and finding.path:
+            message = f"{finding.path}: {message}"
+        return {
+            'range': {'start': {'line': finding.line, 'character': 0},
+                      'end': {'line': finding.line, 'character': 0}},
+            'severity': SEVERITY.get(finding.severity, 3),
+            'code': finding.rule,
+            'source': 'bookstack-structure',
+            'message': message
+        }
+
+    def publish(self, uri: str, findings: List[ValidationError], prefix_path: bool = False) -> None:
+        # Skip clearing files that never had diagnostics
+        if not findings and not self.published.get(uri):
+            return
+        self.published[uri] = bool(findings)
+        self.stream.write({
+            'jsonrpc': '2.0',
+            'method': 'textDocument/publishDiagnostics',
+            'params': {'uri': uri, 'diagnostics': [self._diagnostic(f, prefix_path) for f in findings]}
+        })
+
+    def publish_structure(self) -> None:
+        self.publish(path_to_uri(self.structure_file), self.check_structure(), prefix_path=True)
+
+    def publish_file(self, rel_path: str) -> None:
+        self.publish(path_to_uri(self.docs_root / rel_path), self.check_file(rel_path))
+
+    def validate_all(self) -> None:
+        with self.lock:
+            self.publish_structure()
+            for doc in self.corpus:
+                self.publish_file(doc.rel_path)
+            for rel_path in self.overlays:
+                if rel_path not in self.corpus.by_path:
+                    self.publish_file(rel_path)
+
+    # Watching
+
+    def poll(self) -> None:
+        """Pick up changes on disk: re-check changed files, and structure findings when files come or go"""
+        with self.lock:
+            if self._stat(self.structure_file) != self.structure_stat:
+                logger.info("Structure definition changed, reloading")
+                self.load()
+                self.validate_all()
+                return
+
+            listing = DocCorpus(self.docs_root, ignore_dirs=self.ignore_dirs)
+            stats = self._stat_corpus(listing)
+            changed = {rel_path for rel_path, stat in stats.items() if self.file_stats.get(rel_path) != stat}
+            removed = [rel_path for rel_path in self.file_stats if rel_path not in stats]
+            if not changed and not removed:
+                return
+
+            # Keep parsed documents for files that did not change
+            for rel_path in stats:
+                if rel_path not in changed and rel_path in self.corpus.by_path:
+                    listing.by_path[rel_path] = self.corpus.by_path[rel_path]
+            listing.documents = [listing.by_path[rel_path] for rel_path in sorted(listing.by_path)]
+            added_or_removed = removed or any(rel_path not in self.file_stats for rel_path in changed)
+            self.corpus = listing
+            self.file_stats = stats
+
+            for rel_path in sorted(changed | self._linking_pages(changed | set(removed))):
+                self.publish_file(rel_path)
+            for rel_path in removed:
+                if rel_path in self.overlays:
+                    self.publish_file(rel_path)
+                else:
+                    self.publish(path_to_uri(self.docs_root / rel_path), [])
+            if added_or_removed:
+                self.publish_structure()
+
+    def _linking_pages(self, rel_paths: set) -> set:
+        """Pages whose findings depend on rel_paths through links, when a rule checks them"""
+        if not any(TREE in rule.inputs for rule in self.rules):
+            return set()
+        return {link.source for link in links_into(self.corpus, rel_paths)}
+
+    def _watch(self) -> None:
+        while not self.stopping.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Watcher poll failed")
+
+    # Protocol
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        method = message.get('method')
+        params = message.get('params') or {}
+        handler = getattr(self, 'on_' + (method or '').replace('/', '_').replace('$', ''), None)
+
+        if 'id' in message and method is not None:
+            if handler is None:
+                self.stream.write({'jsonrpc': '2.0', 'id': message['id'],
+                                   'error': {'code': -32601, 'message': f"Method not found: {method}"}})
+                return
+            try:
+                result = handler(params)
+            except Exception as e:
+                logger.exception("Request %s failed", method)
+                self.stream.write({'jsonrpc': '2.0', 'id': message['id'],
+                                   'error': {'code': -32603, 'message': str(e)}})
+                return
+            self.stream.write({'jsonrpc': '2.0', 'id': message['id'], 'result': result})
+        elif handler is not None:
+            try:
+                handler(params)
+            except Exception:
+                logger.exception("Notification %s failed", method)
+
+    def on_initialize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.load()
+        return {
+            'capabilities': {
+                # Full document sync; diagnostics are pushed, nothing else is offered
+                'textDocumentSync': {'openClose': True, 'change': 1, 'save': {'includeText': False}}
+            },
+            'serverInfo': {'name': 'bookstack-structure'}
+        }
+
+    def on_initialized(self, params: Dict[str, Any]) -> None:
+        self.validate_all()
+        if self.poll_interval > 0:
+            threading.Thread(target=self._watch, name='docs-watcher', daemon=True).start()
+
+    def on_shutdown(self, params: Dict[str, Any]) -> None:
+        self.shutdown_requested = True
+        self.stopping.set()
+        return None
+
+    def on_exit(self, params: Dict[str, Any]) -> None:
+        self.stopping.set()
+        raise SystemExit(0 if self.shutdown_requested else 1)
+
+    def on_textDocument_didOpen(self, params: Dict[str, Any]) -> None:
+        self._update_overlay(params['textDocument']['uri'], params['textDocument']['text'])
+
+    def on_textDocument_didChange(self, params: Dict[str, Any]) -> None:
+        changes = params.get('contentChanges') or []
+        if changes:
+            # Full sync: the last change carries the whole buffer
+            self._update_overlay(params['textDocument']['uri'], changes[-1]['text'])
+
+    def on_textDocument_didSave(self, params: Dict[str, Any]) -> None:
+        self.poll()
+
+    def on_textDocument_didClose(self, params: Dict[str, Any]) -> None:
+        uri = params['textDocument']['uri']
+        rel_path = self._rel_path(uri)
+        if rel_path is None:
+            return
+        with self.lock:
+            self.overlays.pop(rel_path, None)
+            if rel_path in self.corpus.by_path:
+                self.publish_file(rel_path)
+            else:
+                self.publish(uri, [])
+
+    def on_workspace_didChangeWatchedFiles(self, params: Dict[str, Any]) -> None:
+        self.poll()
+
+    def _update_overlay(self, uri: str, text: str) -> None:
+        rel_path = self._rel_path(uri)
+        if rel_path is None:
+            return
+        with self.lock:
+            self.overlays[rel_path] = text
+            self.publish(uri, self.check_file(rel_path))
+
+    def serve(self) -> int:
+        """Handle messages until the client sends exit or closes the stream"""
+        try:
+            while True:
+                message = self.stream.read()
+                if message is None:
+                    return 1
+                self.handle(message)
+        except SystemExit as e:
+            return e.code
+        finally:
+            self.stopping.set()
+
+
+def serve_stdio(structure_file: str, docs_root: str, rule_names: List[str], poll_interval: float = 2.0) -> int:
+    """Run the language server on stdin/stdout; logging goes to stderr"""
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format='%(levelname)s: %(message)s')
+    stream = LspStream(sys.stdin.buffer, sys.stdout.buffer)
+    server = ValidationServer(structure_file, docs_root, rule_names, stream, poll_interval)
+    return server.serve()
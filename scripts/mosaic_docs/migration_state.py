@@ -0,0 +1,238 @@
+"""
+Migration state store for DocumentMigrator
+Per-file migration status lives in SQLite (WAL mode, so several migrators
+can record progress at once), keyed by docs root and source path, with a log
+of every status change. The database is kept with the migration journals in
+the docs root, not in the disposable cache. The status and log block of
+MIGRATION-SCRATCHPAD.md is regenerated from it between markers, leaving the
+hand-written sections alone; an existing scratchpad's log is imported the
+first time.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .transaction import journal_dir
+
+# Statuses whose log entries put the status, not a destination, after the arrow
+NO_DESTINATION = ('SKIPPED', 'ERROR')
+
+LOG_LINE_RE = re.compile(r'^\[([^\]]+)\] \[([^\]]+)\] → \[([^\]]*)\] \[(.*)\]\s*$')
+ENTRY_START_RE = re.compile(r'(?<=\])(?=\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] \[)')
+
+# The generated block of the scratchpad; everything outside it is left as written
+STATE_FILE = 'migration-state.sqlite'
+
+BEGIN_MARKER = '<!-- migration-state:begin -->'
+END_MARKER = '<!-- migration-state:end -->'
+
+
+class MigrationState:
+    """SQLite-backed status of every source file a migration has seen
+
+    One instance may be shared by several threads; other processes get their
+    own connection to the same database.
+    """
+
+    def __init__(self, docs_root, db_path: Optional[Path] = None):
+        self.root = str(Path(docs_root).resolve())
+        self.db_path = Path(db_path) if db_path else journal_dir(self.root) / STATE_FILE
+        if str(self.db_path) != ':memory:':
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    root TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    destination TEXT,
+                    status TEXT NOT NULL,
+                    message TEXT,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (root, source)
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS files_status ON files (root, status)')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    root TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    destination TEXT,
+                    status TEXT NOT NULL,
+                    message TEXT,
+                    time REAL NOT NULL
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS log_root ON log (root, id)')
+
+    @classmethod
+    def snapshot(cls, docs_root) -> 'MigrationState':
+        """An in-memory copy of the stored state, for dry runs
+
+        The stored database is opened read-only and need not exist; nothing
+        is created or changed on disk.
+        """
+        state = cls(docs_root, db_path=Path(':memory:'))
+        stored = journal_dir(state.root, create=False) / STATE_FILE
+        if stored.exists():
+            # Even read-only, SQLite creates -wal/-shm files for a WAL database unless it is
+            # opened as immutable, which is only safe when no write-ahead log is pending
+            wal = stored.with_name(stored.name + '-wal')
+            mode = 'mode=ro' if wal.exists() else 'immutable=1'
+            source = sqlite3.connect(f"{stored.as_uri()}?{mode}", uri=True, timeout=30)
+            try:
+                source.backup(state.conn)
+            finally:
+                source.close()
+        return state
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, source: str, destination: Optional[str], status: str,
+               message: Optional[str] = None, when: Optional[float] = None) -> None:
+        """Set a file's status and log the change (one short write transaction)"""
+        self.record_many([(source, destination, status, message)], when)
+
+    def record_many(self, entries: Iterable[Tuple[str, Optional[str], str, Optional[str]]],
+                    when: Optional[float] = None) -> None:
+        """Record (source, destination, status, message) entries in one transaction"""
+        when = time.time() if when is None else when
+        rows = [(self.root, source, destination, status, message, when) for source, destination, status, message in entries]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany('''
+                INSERT INTO files (root, source, destination, status, message, updated) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (root, source) DO UPDATE SET destination = excluded.destination,
+                    status = excluded.status, message = excluded.message, updated = excluded.updated
+            ''', rows)
+            self.conn.executemany(
+                'INSERT INTO log (root, source, destination, status, message, time) VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    # Queries
+
+    def is_empty(self) -> bool:
+        return self.conn.execute('SELECT 1 FROM files WHERE root = ? LIMIT 1', (self.root,)).fetchone() is None
+
+    def status(self, source: str) -> Optional[Tuple[Optional[str], str, Optional[str]]]:
+        """(destination, status, message) of one source file, or None if never seen"""
+        return self.conn.execute('SELECT destination, status, message FROM files WHERE root = ? AND source = ?',
+                                 (self.root, source)).fetchone()
+
+    def sources(self, status: str) -> Set[str]:
+        return {source for source, in self.conn.execute(
+            'SELECT source FROM files WHERE root = ? AND status = ?', (self.root, status))}
+
+    def processed(self) -> Set[str]:
+        return self.sources('SUCCESS')
+
+    def files(self, status: Optional[str] = None) -> List[Tuple[str, Optional[str], str, Optional[str]]]:
+        """(source, destination, status, message) per file, optionally of one status"""
+        query = 'SELECT source, destination, status, message FROM files WHERE root = ?'
+        params = [self.root]
+        if status:
+            query += ' AND status = ?'
+            params.append(status)
+        return self.conn.execute(query + ' ORDER BY source', params).fetchall()
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute(
+            'SELECT status, COUNT(*) FROM files WHERE root = ? GROUP BY status ORDER BY status', (self.root,)))
+
+    def destinations(self) -> Dict[str, List[str]]:
+        """Migrated source files per destination"""
+        merged: Dict[str, List[str]] = {}
+        for source, destination in self.conn.execute(
+                "SELECT source, destination FROM files WHERE root = ? AND status = 'SUCCESS' ORDER BY source",
+                (self.root,)):
+            merged.setdefault(destination, []).append(source)
+        return merged
+
+    def log(self) -> Iterator[Tuple[float, str, Optional[str], str, Optional[str]]]:
+        yield from self.conn.execute(
+            'SELECT time, source, destination, status, message FROM log WHERE root = ? ORDER BY id', (self.root,))
+
+    # Scratchpad view
+
+    def import_scratchpad(self, scratchpad: Path) -> int:
+        """Load the processing log of a scratchpad written before the store existed; returns entries read"""
+        if not scratchpad.exists():
+            return 0
+        log_section = scratchpad.read_text().split("## Processing Log")[-1]
+        count = 0
+        # Appending scratchpads could glue an entry onto the line before it
+        entries = (entry for line in log_section.splitlines() for entry in ENTRY_START_RE.split(line))
+        for line in entries:
+            match = LOG_LINE_RE.match(line.strip())
+            if not match:
+                continue
+            stamp, source, destination, status = match.groups()
+            try:
+                when = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp()
+            except ValueError:
+                continue  # The "[timestamp] [file] → ..." legend, not an entry
+            message = None
+            if destination in NO_DESTINATION:
+                # "[file] → [ERROR] [message]"
+                destination, status, message = None, destination, status
+            self.record(source, destination, status, message, when)
+            count += 1
+        return count
+
+    def render_scratchpad(self, scratchpad: Path, title: str = "Documentation Migration Scratchpad") -> None:
+        """Regenerate the status and log block of the scratchpad (written atomically)
+
+        Only the text between the markers is replaced. A scratchpad without
+        them gets the block in place of its old "## Processing Log" section,
+        which the store has imported, or at its end; a new one gets a title.
+        """
+        counts = self.counts()
+        lines = [
+            BEGIN_MARKER,
+            f"<!-- Generated from {self.db_path} on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}; "
+            f"edits inside this block are overwritten. -->",
+            "",
+            "## Migration State",
+            "",
+        ]
+        lines += [f"- {status}: {count}" for status, count in counts.items()] or ["- No files processed yet"]
+        errors = self.files('ERROR')
+        if errors:
+            lines += ["", "### Errors", ""]
+            lines += [f"- {source}: {message}" for source, _, _, message in errors]
+        lines += ["", "## Processing Log", ""]
+        for when, source, destination, status, message in self.log():
+            stamp = datetime.fromtimestamp(when).strftime("%Y-%m-%d %H:%M:%S")
+            if status in NO_DESTINATION:
+                lines.append(f"[{stamp}] [{source}] → [{status}] [{message}]")
+            else:
+                lines.append(f"[{stamp}] [{source}] → [{destination}] [{status}]")
+        lines.append(END_MARKER)
+        block = "\n".join(lines) + "\n"
+
+        existing = scratchpad.read_text() if scratchpad.exists() else None
+        if existing is None:
+            content = f"# {title}\n\n{block}"
+        elif BEGIN_MARKER in existing and END_MARKER in existing:
+            before, _, rest = existing.partition(BEGIN_MARKER)
+            after = rest.partition(END_MARKER)[2].lstrip('\n')
+            content = before + block + after
+        elif "## Processing Log" in existing:
+            content = existing.rpartition("## Processing Log")[0] + block
+        else:
+            content = existing.rstrip('\n') + "\n\n" + block
+
+        tmp = scratchpad.with_name(f".{scratchpad.name}.{os.getpid()}.tmp")
+        tmp.write_text(content)
+        os.replace(tmp, scratchpad)
@@ -0,0 +1,249 @@
+"""
+Near-duplicate detection with MinHash and LSH
+Each document body is cut into word shingles and summarised by a MinHash
+signature whose positions agree between two documents with probability
+equal to their Jaccard similarity. Signatures use one-permutation hashing
+(one hash per shingle, binned, empty bins filled from their neighbours) so
+they cost O(shingles) rather than O(shingles x permutations) in pure Python.
+LSH banding finds candidate pairs without comparing all pairs; candidates
+are confirmed on the estimated similarity and joined into clusters.
+Signatures are cached in SQLite, keyed like the parse cache.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+from array import array
+from dataclasses import dataclass, field
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .cache import cache_dir
+from .corpus import DocCorpus, split_frontmatter
+
+# Bump when shingling or hashing changes so cached signatures are discarded
+SIGNATURE_VERSION = 1
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 5
+
+WORD_RE = re.compile(r'\w+')
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> set:
+    """Word n-grams of a document body (frontmatter excluded), case-folded"""
+    words = WORD_RE.findall(split_frontmatter(text)[1].casefold())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def signature(text: str, num_perm: int = DEFAULT_NUM_PERM,
+              shingle_size: int = DEFAULT_SHINGLE_SIZE) -> Optional[Signature]:
+    """MinHash signature of a document, or None when it has no words"""
+    grams = shingles(text, shingle_size)
+    if not grams:
+        return None
+    span = (1 << 64) // num_perm
+    bins: List[Optional[int]] = [None] * num_perm
+    for gram in grams:
+        value = int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'big')
+        slot, offset = divmod(value, span)
+        if slot < num_perm and (bins[slot] is None or offset < bins[slot]):
+            bins[slot] = offset
+    # Densify: an empty bin borrows the next filled bin's value, shifted by the distance
+    # so borrowed values only match values borrowed the same way
+    if all(value is None for value in bins):
+        return None
+    result = list(bins)
+    for i, value in enumerate(bins):
+        if value is None:
+            distance = next((d for d in range(1, num_perm) if bins[(i + d) % num_perm] is not None), 0)
+            result[i] = bins[(i + distance) % num_perm] + distance * span
+    return tuple(result)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def lsh_bands(threshold: float, num_perm: int = DEFAULT_NUM_PERM) -> Tuple[int, int]:
+    """(bands, rows) whose LSH threshold (1/bands)^(1/rows) is the highest not above threshold"""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+class SignatureStore:
+    """SQLite cache of document signatures
+
+    A file whose size and mtime are unchanged is served without being read;
+    a touched file whose content hash still matches is not re-shingled.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE,
+                 db_path: Optional[Path] = None):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.params = f"v{SIGNATURE_VERSION}-p{num_perm}-k{shingle_size}"
+        self.db_path = Path(db_path) if db_path else cache_dir() / 'minhash-signatures.sqlite'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.stats = {'hits': 0, 'rehashed': 0, 'computed': 0}
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS signatures (
+                path TEXT NOT NULL,
+                params TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                signature BLOB,
+                PRIMARY KEY (path, params)
+            )
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def signatures(self, paths: Iterable[str]) -> Dict[str, Optional[Signature]]:
+        """Signature per path (None for files without words), computing and storing what is missing"""
+        paths = list(paths)
+        cached = {}
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            for row in self.conn.execute(
+                    f'SELECT path, size, mtime_ns, sha256, signature FROM signatures '
+                    f'WHERE params = ? AND path IN ({placeholders})', [self.params] + chunk):
+                cached[row[0]] = row[1:]
+
+        result: Dict[str, Optional[Signature]] = {}
+        updates = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entry = cached.get(path)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                self.stats['hits'] += 1
+                result[path] = self._decode(entry[3])
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            sha = hashlib.sha256(data).hexdigest()
+            if entry and entry[2] == sha:
+                self.stats['rehashed'] += 1
+                blob = entry[3]
+            else:
+                self.stats['computed'] += 1
+                sig = signature(data.decode('utf-8', errors='replace'), self.num_perm, self.shingle_size)
+                blob = array('Q', sig).tobytes() if sig else None
+            result[path] = self._decode(blob)
+            updates.append((path, self.params, stat.st_size, stat.st_mtime_ns, sha, blob))
+
+        if updates:
+            self.conn.executemany('INSERT OR REPLACE INTO signatures VALUES (?, ?, ?, ?, ?, ?)', updates)
+            self.conn.commit()
+        return result
+
+    @staticmethod
+    def _decode(blob: Optional[bytes]) -> Optional[Signature]:
+        return tuple(array('Q', blob)) if blob else None
+
+
+@dataclass
+class DuplicateCluster:
+    """Documents that are near-duplicates of each other, directly or through a chain"""
+    members: List[str]
+    pairs: List[Tuple[str, str, float]] = field(default_factory=list)
+
+    @property
+    def max_similarity(self) -> float:
+        return max(score for _, _, score in self.pairs)
+
+    @property
+    def mean_similarity(self) -> float:
+        return sum(score for _, _, score in self.pairs) / len(self.pairs)
+
+
+class NearDuplicateFinder:
+    """LSH index of signatures that reports pairs and clusters above a similarity threshold"""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = DEFAULT_NUM_PERM):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.signatures: Dict[str, Signature] = {}
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = {}
+
+    def add(self, key: str, sig: Optional[Signature]) -> None:
+        if sig is None:
+            return
+        self.signatures[key] = sig
+        for band in range(self.bands):
+            start = band * self.rows
+            self.buckets.setdefault((band, sig[start:start + self.rows]), []).append(key)
+
+    def pairs(self) -> List[Tuple[str, str, float]]:
+        """Confirmed (a, b, similarity) pairs, a < b, most similar first"""
+        candidates = set()
+        for keys in self.buckets.values():
+            if len(keys) > 1:
+                candidates.update(combinations(sorted(keys), 2))
+        confirmed = []
+        for a, b in candidates:
+            score = similarity(self.signatures[a], self.signatures[b])
+            if score >= self.threshold:
+                confirmed.append((a, b, score))
+        return sorted(confirmed, key=lambda pair: (-pair[2], pair[0], pair[1]))
+
+    def clusters(self) -> List[DuplicateCluster]:
+        """Connected groups of confirmed pairs, largest first"""
+        parent: Dict[str, str] = {}
+
+        def find(key: str) -> str:
+            while parent.setdefault(key, key) != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        pairs = self.pairs()
+        for a, b, _ in pairs:
+            parent[find(a)] = find(b)
+        groups: Dict[str, DuplicateCluster] = {}
+        for a, b, score in pairs:
+            cluster = groups.setdefault(find(a), DuplicateCluster(members=[]))
+            cluster.pairs.append((a, b, score))
+        for cluster in groups.values():
+            cluster.members = sorted({key for a, b, _ in cluster.pairs for key in (a, b)})
+        return sorted(groups.values(), key=lambda cluster: (-len(cluster.members), cluster.members))
+
+
+def find_near_duplicates(corpus: DocCorpus, threshold: float = 0.8, num_perm: int = DEFAULT_NUM_PERM,
+                         shingle_size: int = DEFAULT_SHINGLE_SIZE,
+                         store: Optional[SignatureStore] = None) -> List[DuplicateCluster]:
+    """Clusters of near-duplicate documents in a corpus, by relative path"""
+    owned = store is None
+    store = store or SignatureStore(num_perm, shingle_size)
+    try:
+        by_path = {os.path.abspath(doc.path): doc.rel_path for doc in corpus}
+        finder = NearDuplicateFinder(threshold, num_perm)
+        for path, sig in store.signatures(by_path).items():
+            finder.add(by_path[path], sig)
+    finally:
+        if owned:
+            store.close()
+    return finder.clusters()
@@ -0,0 +1,110 @@
+"""
+Per-directory page number allocator
+Page files are ordered by an `NN-` prefix. The allocator indexes the numbers
+in use in every directory from one corpus scan, then hands out unique
+prefixes in O(1) as files are assigned to directories, so files planned in
+the same run never share a number. It can also plan a compaction that
+renumbers a directory's pages 01, 02, ... in their current order.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from .corpus import DocCorpus
+
+NUMBER_RE = re.compile(r'^(\d{2,})-')
+
+
+def page_number(filename: str) -> Optional[int]:
+    """The NN- prefix of a page file name, or None when unnumbered"""
+    match = NUMBER_RE.match(filename)
+    return int(match.group(1)) if match else None
+
+
+def strip_number(filename: str) -> str:
+    return NUMBER_RE.sub('', filename, count=1)
+
+
+class NumberAllocator:
+    """Tracks numbered page names per docs-relative directory"""
+
+    def __init__(self, corpus: DocCorpus):
+        self.corpus = corpus
+        # Directory -> numbered file names currently planned to be there
+        self.names: Dict[str, Set[str]] = {}
+        # Directory -> numbers ever seen there, and the highest; numbers are never reused within a run
+        self.used: Dict[str, Set[int]] = {}
+        self.highest: Dict[str, int] = {}
+        for doc in corpus:
+            directory, _, name = doc.rel_path.rpartition('/')
+            self._add(directory, name)
+
+    def _add(self, directory: str, name: str) -> None:
+        number = page_number(name)
+        if number is None:
+            return
+        self.names.setdefault(directory, set()).add(name)
+        self.used.setdefault(directory, set()).add(number)
+        if number > self.highest.get(directory, 0):
+            self.highest[directory] = number
+
+    def _ensure(self, directory: str) -> None:
+        """Index a directory the corpus scan did not cover (ignored or created outside it)"""
+        if directory in self.highest:
+            return
+        if self.corpus.complete and (directory == '' or directory in self.corpus.directories):
+            return
+        self.highest[directory] = 0
+        try:
+            entries = list(os.scandir(os.path.join(self.corpus.root, directory)))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return
+        for entry in entries:
+            if entry.name.endswith(self.corpus.suffix) and not entry.name.startswith('.') and entry.is_file():
+                self._add(directory, entry.name)
+
+    def numbers(self, directory: str) -> Set[int]:
+        self._ensure(directory)
+        return self.used.get(directory, set())
+
+    def next_number(self, directory: str) -> int:
+        self._ensure(directory)
+        return self.highest.get(directory, 0) + 1
+
+    def assign(self, directory: str, filename: str) -> str:
+        """Claim a unique numbered name for filename in directory
+
+        A numbered name is kept when its number is still free there;
+        otherwise, and for unnumbered names, the next number is used.
+        """
+        self._ensure(directory)
+        number = page_number(filename)
+        if number is None or number in self.numbers(directory):
+            filename = f"{self.next_number(directory):02d}-{strip_number(filename)}"
+        self._add(directory, filename)
+        return filename
+
+    def release(self, rel_path: str) -> None:
+        """Record that a file is leaving its directory (its number stays reserved)"""
+        directory, _, name = rel_path.rpartition('/')
+        self._ensure(directory)
+        self.names.get(directory, set()).discard(name)
+
+    def compaction_plan(self, directory: Optional[str] = None) -> Dict[str, List[Tuple[str, str]]]:
+        """Renames (old name, new name) closing gaps and duplicates, per directory
+
+        Pages keep their order by (number, name) and are renumbered from 01.
+        """
+        directories = [directory] if directory is not None else sorted(self.names)
+        plan = {}
+        for current in directories:
+            ordered = sorted(self.names.get(current, ()), key=lambda name: (page_number(name), name))
+            renames = []
+            for position, name in enumerate(ordered, 1):
+                new_name = f"{position:02d}-{strip_number(name)}"
+                if new_name != name:
+                    renames.append((name, new_name))
+            if renames:
+                plan[current] = renames
+        return plan
@@ -0,0 +1,152 @@
+"""
+Copy-on-write in-memory overlay of a directory tree
+DryRunOverlay offers the operations of a MigrationTransaction (read, exists,
+write, move) without touching the disk: reads fall through to the real tree
+until a path is written or moved, and every operation is recorded, so a
+migration can run unchanged against it and report what it would have done.
+"""
+
+import difflib
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .transaction import TransactionError
+
+PathLike = Union[str, Path]
+
+
+def _digest(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class DryRunOverlay:
+    """A MigrationTransaction stand-in that keeps every change in memory"""
+
+    id = 'dry-run'
+    status = 'open'
+    plan: Any = None
+
+    def __init__(self, root: PathLike):
+        self.root = Path(root).resolve()
+        # Relative path -> content in the overlay; None marks a path moved away
+        self.files: Dict[str, Optional[str]] = {}
+        # Relative path -> content on disk before the first change (None: did not exist)
+        self.originals: Dict[str, Optional[str]] = {}
+        self.records: List[Dict[str, Any]] = []
+        self.ops: Dict[str, Dict[str, Any]] = {}
+        self.done = set()
+        self._lock = threading.Lock()
+
+    # Paths
+
+    def rel(self, path: PathLike) -> str:
+        path = Path(path)
+        absolute = path if path.is_absolute() else Path.cwd() / path
+        return os.path.relpath(absolute, self.root).replace(os.sep, '/')
+
+    def abs(self, rel_path: str) -> Path:
+        return self.root / rel_path
+
+    # Reads
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done
+
+    def _read(self, rel_path: str) -> str:
+        if rel_path in self.files:
+            content = self.files[rel_path]
+            if content is None:
+                raise FileNotFoundError(f"{rel_path} was moved away")
+            return content
+        return self.abs(rel_path).read_text(encoding='utf-8')
+
+    def _exists(self, rel_path: str) -> bool:
+        if rel_path in self.files:
+            return self.files[rel_path] is not None
+        return self.abs(rel_path).exists()
+
+    def read_text(self, path: PathLike, key: Optional[str] = None) -> str:
+        return self._read(self.rel(path))
+
+    def exists(self, path: PathLike, key: Optional[str] = None) -> bool:
+        return self._exists(self.rel(path))
+
+    # Operations
+
+    def _set(self, rel_path: str, content: Optional[str]) -> None:
+        if rel_path not in self.originals:
+            self.originals[rel_path] = self._read(rel_path) if self._exists(rel_path) else None
+        self.files[rel_path] = content
+
+    def _record(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+        self.ops[record['key']] = record
+        self.done.add(record['key'])
+
+    def move(self, src: PathLike, dst: PathLike, key: Optional[str] = None) -> bool:
+        src_rel, dst_rel = self.rel(src), self.rel(dst)
+        key = key or f"move:{src_rel}"
+        with self._lock:
+            if key in self.done:
+                return False
+            if not self._exists(src_rel):
+                raise TransactionError(f"Source not found: {src_rel}")
+            if self._exists(dst_rel):
+                raise TransactionError(f"Target exists: {dst_rel}")
+            content = self._read(src_rel)
+            self._set(dst_rel, content)
+            self._set(src_rel, None)
+            self._record({'op': 'move', 'key': key, 'src': src_rel, 'dst': dst_rel})
+        return True
+
+    def write(self, path: PathLike, content: str, key: Optional[str] = None,
+              meta: Optional[Dict[str, Any]] = None) -> bool:
+        rel_path = self.rel(path)
+        key = key or f"write:{rel_path}"
+        with self._lock:
+            if key in self.done:
+                return False
+            self._set(rel_path, content)
+            self._record({'op': 'write', 'key': key, 'path': rel_path, 'sha256': _digest(content), 'meta': meta})
+        return True
+
+    def commit(self) -> None:
+        """Nothing to commit: the overlay is discarded"""
+
+    def close(self) -> None:
+        pass
+
+    def operations(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records)
+
+    def summary(self) -> str:
+        moves = sum(1 for op in self.records if op['op'] == 'move')
+        writes = sum(1 for op in self.records if op['op'] == 'write')
+        return f"{self.id} {moves} moves, {writes} writes"
+
+    # Reporting
+
+    def changed(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Paths whose final content differs from the disk: {'before', 'after'}, None meaning absent"""
+        return {rel_path: {'before': self.originals[rel_path], 'after': content}
+                for rel_path, content in sorted(self.files.items())
+                if content != self.originals[rel_path]}
+
+    def diff(self, context: int = 3) -> Iterator[str]:
+        """Unified diff of every written file, and a rename line per move"""
+        for op in self.records:
+            if op['op'] == 'move':
+                yield f"rename {op['src']} => {op['dst']}\n"
+        written = {op['path'] for op in self.records if op['op'] == 'write'}
+        for rel_path, change in self.changed().items():
+            if rel_path not in written:
+                continue
+            before = (change['before'] or '').splitlines(keepends=True)
+            after = (change['after'] or '').splitlines(keepends=True)
+            for line in difflib.unified_diff(before, after,
+                                             fromfile=f"a/{rel_path}" if change['before'] is not None else '/dev/null',
+                                             tofile=f"b/{rel_path}", n=context):
+                yield line if line.endswith('\n') else line + '\n\\ No newline at end of file\n'
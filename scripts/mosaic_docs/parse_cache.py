@@ -0,0 +1,190 @@
+"""
+Persistent parse cache for markdown documents
+Stores each file's parsed frontmatter, headings, anchors, outbound links and
+word count in SQLite, keyed by path, size, mtime and content hash. A file
+whose size and mtime are unchanged is served without being read; a file
+that was only touched is re-hashed but not re-parsed. Changed files can be
+parsed across a process pool; results are merged in corpus order.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cache import cache_dir, dump_data, load_data
+from .corpus import DocCorpus, Document
+
+# Bump when Document parsing changes so cached facts are discarded
+PARSE_VERSION = 2
+
+# (read seconds, YAML parse seconds, bytes read) for one file
+FileTiming = Tuple[float, float, int]
+
+# (sha256, encoded facts or None when the cached hash matched, text or None, timing)
+ParseResult = Optional[Tuple[str, Optional[bytes], Optional[str], FileTiming]]
+
+
+def _parse_file(task: Tuple[str, Optional[str], bool]) -> ParseResult:
+    """Read, hash and parse one file; runs in worker processes when jobs > 1"""
+    path, cached_sha, keep_text = task
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None  # Left unprimed so the caller reports the read failure
+    read_seconds = time.perf_counter() - start
+    sha = hashlib.sha256(data).hexdigest()
+    if sha == cached_sha:
+        return sha, None, None, (read_seconds, 0.0, len(data))
+
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return None  # Left unprimed so the caller reports the decode failure
+    doc = Document(Path(path), '')
+    doc.prime_text(text)
+    start = time.perf_counter()
+    doc.frontmatter
+    parse_seconds = time.perf_counter() - start
+    facts_blob = dump_data(doc.facts())
+    return sha, facts_blob, text if keep_text else None, (read_seconds, parse_seconds, len(data))
+
+
+def parse_files(tasks: List[Tuple[str, Optional[str], bool]], jobs: int = 1) -> Iterator[ParseResult]:
+    """Parse files in task order, sharded across `jobs` processes when more than one"""
+    if jobs > 1 and len(tasks) > 1:
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            yield from pool.map(_parse_file, tasks, chunksize=chunksize)
+    else:
+        yield from map(_parse_file, tasks)
+
+
+def parse_corpus(corpus: DocCorpus, jobs: int = 1, profiler=None) -> None:
+    """Parse every document up front without a cache, e.g. to spread YAML parsing over cores
+
+    A profiler, when given, receives each file's read and parse timings.
+    """
+    docs = list(corpus)
+    # Text stays in the workers; parsed facts are all the checks need
+    tasks = [(str(doc.path), None, jobs <= 1) for doc in docs]
+    for doc, result in zip(docs, parse_files(tasks, jobs)):
+        if result is None:
+            continue
+        _, facts_blob, text, timing = result
+        if text is not None:
+            doc.prime_text(text)
+        doc.prime(load_data(facts_blob))
+        if profiler:
+            profiler.record_file(doc.rel_path, *timing)
+
+
+class ParseCache:
+    """SQLite-backed store of per-file parse results"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else cache_dir() / 'parse-cache.sqlite'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.stats = {'hits': 0, 'rehashed': 0, 'parsed': 0}
+        # Content hash of every primed document, by relative path
+        self.digests: Dict[str, str] = {}
+        self._init_schema()
+
+    def _init_schema(self):
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'parse_version'").fetchone()
+        if row is None or row[0] != str(PARSE_VERSION):
+            self.conn.execute('DROP TABLE IF EXISTS files')
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('parse_version', ?)", (str(PARSE_VERSION),))
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                facts BLOB NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _load_rows(self, prefix: str) -> Dict[str, Tuple[int, int, str, bytes]]:
+        rows = self.conn.execute(
+            'SELECT path, size, mtime_ns, sha256, facts FROM files WHERE path >= ? AND path < ?',
+            (prefix, prefix + '\uffff')
+        )
+        return {path: (size, mtime_ns, sha, facts) for path, size, mtime_ns, sha, facts in rows}
+
+    def _load_keys(self, keys: List[str]) -> Dict[str, Tuple[int, int, str, bytes]]:
+        rows = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            for path, size, mtime_ns, sha, facts in self.conn.execute(
+                    f'SELECT path, size, mtime_ns, sha256, facts FROM files WHERE path IN ({placeholders})', chunk):
+                rows[path] = (size, mtime_ns, sha, facts)
+        return rows
+
+    def prime(self, corpus: DocCorpus, jobs: int = 1, profiler=None) -> None:
+        """Fill every document's parse memo from the cache, parsing only changed files
+
+        A profiler, when given, receives read and parse timings of the files that were read.
+        """
+        prefix = str(corpus.root.resolve()) + os.sep
+        if corpus.complete:
+            rows = self._load_rows(prefix)
+        else:
+            # A corpus of selected files only needs their rows
+            rows = self._load_keys([prefix + doc.rel_path for doc in corpus])
+        pending = []
+
+        for doc in corpus:
+            key = prefix + doc.rel_path
+            row = rows.pop(key, None)
+            try:
+                st = os.stat(doc.path)
+            except OSError:
+                continue
+
+            if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                doc.prime(load_data(row[3]))
+                self.digests[doc.rel_path] = row[2]
+                self.stats['hits'] += 1
+                continue
+            pending.append((doc, key, st, row))
+
+        # Workers only send back facts; text is kept when parsing in-process
+        tasks = [(str(doc.path), row[2] if row else None, jobs <= 1) for doc, _, _, row in pending]
+        updates = []
+        for (doc, key, st, row), result in zip(pending, parse_files(tasks, jobs)):
+            if result is None:
+                continue
+            sha, facts_blob, text, timing = result
+            if profiler:
+                profiler.record_file(doc.rel_path, *timing)
+            if facts_blob is None:
+                facts_blob = row[3]
+                self.stats['rehashed'] += 1
+            else:
+                if text is not None:
+                    doc.prime_text(text)
+                self.stats['parsed'] += 1
+            doc.prime(load_data(facts_blob))
+            self.digests[doc.rel_path] = sha
+            updates.append((key, st.st_size, st.st_mtime_ns, sha, facts_blob))
+
+        with self.conn:
+            if updates:
+                self.conn.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)', updates)
+            # Rows left over are either outside this corpus' ignore rules or for deleted files
+            stale = [(path,) for path in rows if not os.path.exists(path)]
+            if stale:
+                self.conn.executemany('DELETE FROM files WHERE path = ?', stale)
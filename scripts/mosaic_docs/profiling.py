@@ -0,0 +1,98 @@
+"""
+Lightweight profiler for the documentation tools
+Accumulates wall and CPU time per labelled span, per-file read and YAML
+parse times and bytes read, and can write the recorded spans as a
+speedscope trace (https://www.speedscope.app/file-format-schema.json).
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+
+class Profiler:
+    """Collects timings while a tool runs; cheap enough to leave spans in place"""
+
+    def __init__(self, trace: bool = False):
+        self.origin = time.perf_counter()
+        # Label -> [wall seconds, CPU seconds, calls], in first-seen order
+        self.totals: Dict[str, List[float]] = {}
+        # Relative path -> (read seconds, YAML parse seconds, bytes read)
+        self.files: Dict[str, Tuple[float, float, int]] = {}
+        # Speedscope open/close events, recorded only when tracing
+        self.trace = trace
+        self.events: List[Tuple[str, str, float]] = []
+
+    @contextmanager
+    def span(self, name: str, total: bool = True) -> Iterator[None]:
+        """Time a block; total=False keeps it out of the summary table (trace only)"""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if self.trace:
+            self.events.append(('O', name, wall_start - self.origin))
+        try:
+            yield
+        finally:
+            wall_end = time.perf_counter()
+            if self.trace:
+                self.events.append(('C', name, wall_end - self.origin))
+            if total:
+                entry = self.totals.setdefault(name, [0.0, 0.0, 0])
+                entry[0] += wall_end - wall_start
+                entry[1] += time.process_time() - cpu_start
+                entry[2] += 1
+
+    def record_file(self, rel_path: str, read_seconds: float, parse_seconds: float, nbytes: int) -> None:
+        self.files[rel_path] = (read_seconds, parse_seconds, nbytes)
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(nbytes for _, _, nbytes in self.files.values())
+
+    def report(self, top: int = 10) -> List[str]:
+        """Summary table lines: per-span totals, slowest files, bytes read"""
+        lines = [f"{'Span':<44} {'Wall':>9} {'CPU':>9} {'Calls':>7}"]
+        for name, (wall, cpu, calls) in self.totals.items():
+            lines.append(f"{name:<44} {wall:>8.3f}s {cpu:>8.3f}s {calls:>7}")
+
+        for title, column in (('read', 0), ('YAML parse', 1)):
+            slowest = sorted(self.files.items(), key=lambda item: item[1][column], reverse=True)[:top]
+            slowest = [(path, timing) for path, timing in slowest if timing[column] > 0]
+            if slowest:
+                lines.append('')
+                lines.append(f"Slowest files by {title}:")
+                for path, timing in slowest:
+                    lines.append(f"  {timing[column] * 1000:>9.2f} ms  {path}")
+
+        lines.append('')
+        lines.append(f"Bytes read: {self.bytes_read:,} ({len(self.files)} files read, cache hits excluded)")
+        return lines
+
+    def write_speedscope(self, path: str, name: str = 'validation') -> None:
+        frames: List[Dict[str, str]] = []
+        frame_index: Dict[str, int] = {}
+        events = []
+        for kind, label, at in self.events:
+            if label not in frame_index:
+                frame_index[label] = len(frames)
+                frames.append({'name': label})
+            events.append({'type': kind, 'frame': frame_index[label], 'at': at})
+
+        trace = {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'evented',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': events[0]['at'] if events else 0,
+                'endValue': events[-1]['at'] if events else 0,
+                'events': events
+            }],
+            'name': name,
+            'exporter': 'mosaic_docs.profiling'
+        }
+        with open(Path(path), 'w') as f:
+            json.dump(trace, f)
@@ -0,0 +1,158 @@
+"""
+Streaming reporters for validation findings
+Each finding is written to the output file as soon as the validator
+produces it, so memory use does not grow with the number of findings.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Type
+from urllib.parse import quote
+
+from .rules import FILES, RULES, ValidationError
+
+
+class Reporter:
+    """Base class: receives findings one at a time between start() and finish()"""
+    extension = ''
+
+    def __init__(self, output: Path):
+        self.output = Path(output)
+        self.stream: Optional[TextIO] = None
+        self.structure_file = ''
+        self.docs_root = ''
+
+    def start(self, structure_file: str, docs_root: Path) -> None:
+        self.structure_file = structure_file
+        self.docs_root = str(docs_root)
+        self.stream = open(self.output, 'w', encoding='utf-8')
+
+    def emit(self, finding: ValidationError, rule_name: str = '') -> None:
+        """Write one finding; rule_name is the registered rule that produced it"""
+        raise NotImplementedError
+
+    def finish(self, summary: Dict[str, Any]) -> None:
+        self.stream.close()
+
+
+class JsonlReporter(Reporter):
+    """One JSON object per finding, followed by a summary line"""
+    extension = 'jsonl'
+
+    def emit(self, finding: ValidationError, rule_name: str = '') -> None:
+        self.stream.write(json.dumps({
+            'severity': finding.severity,
+            'rule': finding.rule,
+            'path': finding.path,
+            'message': finding.message
+        }) + '\n')
+
+    def finish(self, summary: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps({'summary': summary}) + '\n')
+        super().finish(summary)
+
+
+def source_root(path: str) -> Path:
+    """The repository containing path (the nearest directory with .git), else the current directory"""
+    current = Path(os.path.abspath(path))
+    for directory in [current] + list(current.parents):
+        if (directory / '.git').exists():
+            return directory
+    return Path.cwd()
+
+
+class SarifReporter(Reporter):
+    """SARIF 2.1.0 log, written incrementally as results arrive
+
+    Locations are URIs relative to the repository root (%SRCROOT%), so code
+    scanning maps them to repository files. The rule descriptors results
+    refer to are only known once every result is in, so the run's results
+    come first and its tool section is written by finish().
+    """
+    extension = 'sarif'
+
+    SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+    BASE_ID = '%SRCROOT%'
+
+    def __init__(self, output: Path):
+        super().__init__(output)
+        self.first = True
+        self.root = Path.cwd()
+        self.docs_dir = Path.cwd()
+        # Rule descriptors in order of first use; results refer to them by index
+        self.rules: List[Dict[str, Any]] = []
+        self.rule_index: Dict[str, int] = {}
+
+    def start(self, structure_file: str, docs_root: Path) -> None:
+        super().start(structure_file, docs_root)
+        self.root = source_root(self.docs_root)
+        self.docs_dir = Path(self.docs_root).resolve()
+        header = {
+            '$schema': self.SCHEMA,
+            'version': '2.1.0',
+            'runs': [{'originalUriBaseIds': {self.BASE_ID: {'uri': self.root.as_uri() + '/'}}, 'results': []}]
+        }
+        # Emit everything up to the open results array; results and the closing brackets follow
+        text = json.dumps(header)
+        self.stream.write(text[:text.rindex('[]') + 1])
+
+    def artifact_location(self, path: str) -> Dict[str, str]:
+        absolute = Path(os.path.abspath(path))
+        try:
+            relative = absolute.relative_to(self.root)
+        except ValueError:
+            return {'uri': absolute.as_uri()}
+        return {'uri': quote(relative.as_posix()), 'uriBaseId': self.BASE_ID}
+
+    def names_file(self, finding: ValidationError, rule_name: str) -> bool:
+        """Whether the finding's path is a file under the docs root rather than a structure entry
+
+        Paths are compared resolved, so a docs root of '.', one with a trailing
+        slash or an absolute one all match. Rules that never look at files
+        report slug paths, which must not be mistaken for files even when
+        they resolve inside the docs root.
+        """
+        rule_class = RULES.get(rule_name)
+        if not finding.path or (rule_class is not None and FILES not in rule_class.inputs):
+            return False
+        return Path(finding.path).resolve().is_relative_to(self.docs_dir)
+
+    def _rule(self, rule_id: str, rule_name: str) -> int:
+        if rule_id not in self.rule_index:
+            descriptor = {'id': rule_id, 'name': rule_id}
+            rule_class = RULES.get(rule_name)
+            if rule_class is not None and rule_class.__doc__:
+                descriptor['shortDescription'] = {'text': rule_class.__doc__.splitlines()[0]}
+                descriptor['properties'] = {'rule': rule_name}
+            self.rule_index[rule_id] = len(self.rules)
+            self.rules.append(descriptor)
+        return self.rule_index[rule_id]
+
+    def emit(self, finding: ValidationError, rule_name: str = '') -> None:
+        # File findings point at the file; structure findings point at the structure definition
+        if self.names_file(finding, rule_name):
+            path, message = finding.path, finding.message
+        else:
+            path = self.structure_file
+            message = f"{finding.path}: {finding.message}" if finding.path else finding.message
+        result = {
+            'ruleId': finding.rule,
+            'ruleIndex': self._rule(finding.rule, rule_name),
+            'level': 'error' if finding.severity == 'error' else 'warning',
+            'message': {'text': message},
+            'locations': [{'physicalLocation': {'artifactLocation': self.artifact_location(path)}}]
+        }
+        self.stream.write(('' if self.first else ',') + json.dumps(result))
+        self.first = False
+
+    def finish(self, summary: Dict[str, Any]) -> None:
+        tool = {'driver': {'name': 'validate-bookstack-structure', 'rules': self.rules}}
+        self.stream.write('],"tool":' + json.dumps(tool) + '}]}\n')
+        super().finish(summary)
+
+
+REPORTERS: Dict[str, Type[Reporter]] = {
+    'jsonl': JsonlReporter,
+    'sarif': SarifReporter,
+}
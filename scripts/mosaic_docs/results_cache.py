@@ -0,0 +1,85 @@
+"""
+Persistent cache of per-file validation results
+Stores the findings of content-local checks in SQLite, keyed by path,
+content hash and a rule-set key. A file whose hash and rule set are
+unchanged is not re-checked; global checks still run on every invocation.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache import cache_dir, dump_data, load_data
+
+
+class ResultsCache:
+    """SQLite-backed store of per-file check findings"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path) if db_path else cache_dir() / 'results-cache.sqlite'
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self.stats = {'hits': 0, 'checked': 0}
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                ruleset TEXT NOT NULL,
+                findings BLOB NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _select(self, prefix: str, rel_paths: Optional[List[str]]) -> Iterator[Tuple[str, str, str, bytes]]:
+        if rel_paths is None:
+            yield from self.conn.execute(
+                'SELECT path, sha256, ruleset, findings FROM results WHERE path >= ? AND path < ?',
+                (prefix, prefix + '\uffff')
+            )
+            return
+        keys = [prefix + rel_path for rel_path in rel_paths]
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            yield from self.conn.execute(
+                f'SELECT path, sha256, ruleset, findings FROM results WHERE path IN ({placeholders})', chunk)
+
+    def load(self, root: Path, ruleset: str, rel_paths: Optional[List[str]] = None) -> Dict[str, Tuple[str, Any]]:
+        """Cached (sha256, findings) for files under root checked with this rule set, by relative path
+
+        Loads every file under root unless rel_paths narrows it down.
+        """
+        prefix = str(Path(root).resolve()) + os.sep
+        cached = {}
+        stale = []
+        for path, sha, row_ruleset, findings in list(self._select(prefix, rel_paths)):
+            if row_ruleset == ruleset:
+                try:
+                    cached[path[len(prefix):]] = (sha, load_data(findings))
+                except ValueError:
+                    pass  # Written in an older format: re-checked and replaced
+            elif not os.path.exists(path):
+                stale.append((path,))
+        if stale:
+            with self.conn:
+                self.conn.executemany('DELETE FROM results WHERE path = ?', stale)
+        return cached
+
+    def store(self, root: Path, ruleset: str, entries: List[Tuple[str, str, Any]],
+              removed: Iterable[str] = ()) -> None:
+        """Save (relative path, sha256, findings) entries and drop results for removed files"""
+        prefix = str(Path(root).resolve()) + os.sep
+        with self.conn:
+            if entries:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                    [(prefix + rel_path, sha, ruleset, dump_data(findings))
+                     for rel_path, sha, findings in entries]
+                )
+            stale = [(prefix + rel_path,) for rel_path in removed]
+            if stale:
+                self.conn.executemany('DELETE FROM results WHERE path = ?', stale)
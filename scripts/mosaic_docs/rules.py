@@ -0,0 +1,403 @@
+"""
+Validation rules for the BookStack documentation structure
+Each rule declares the inputs it needs (the structure definition, the file
+list, parsed frontmatter or page bodies) so the validator only loads what
+the selected rules use. Rules read their settings from the structure YAML's
+`conventions` block and fall back to the defaults below.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+from .corpus import DocCorpus, Document
+from .links import LinkIndex, links_into
+from .structure import Book, Chapter, Shelf, StructureModel
+
+# Inputs a rule can declare
+STRUCTURE = 'structure'      # the parsed structure definition (always loaded)
+FILES = 'files'              # the directory walk: file and directory listing
+FRONTMATTER = 'frontmatter'  # parsed frontmatter of every file
+BODY = 'body'                # page bodies (headings, links, anchors)
+TREE = 'tree'                # with a file scope, the rest of the docs tree as well
+
+
+@dataclass
+class ValidationError:
+    """Represents a validation error"""
+    severity: str  # error, warning, info
+    rule: str
+    path: str
+    message: str
+    line: int = 0
+
+
+class RuleContext:
+    """Inputs loaded for the selected rules; corpus is None when no rule needs files
+
+    scope holds the docs-relative paths being validated when only some files
+    are checked (e.g. staged files), or None for the whole tree. tree is the
+    whole docs tree when corpus is scoped and a rule declares TREE.
+    """
+
+    def __init__(self, structure: StructureModel, docs_root: Path, corpus: Optional[DocCorpus] = None,
+                 scope: Optional[Set[str]] = None, tree: Optional[DocCorpus] = None):
+        self.structure = structure
+        self.docs_root = Path(docs_root)
+        self.corpus = corpus
+        self.scope = scope
+        self.tree = tree
+
+
+class Rule:
+    """Base class for validation rules"""
+    name = ''
+    description = ''
+    inputs = frozenset({STRUCTURE})
+    # Per-file results depend only on the file's path and content and may be cached
+    cacheable = False
+    # Bump when the rule's logic changes so cached per-file results are discarded
+    version = 1
+    # Run when no rules are named; opt-in rules only run when selected
+    default = True
+
+    def __init__(self, conventions: Dict[str, Any]):
+        self.conventions = conventions or {}
+
+    @property
+    def checks_files(self) -> bool:
+        return type(self).check_file is not Rule.check_file
+
+    def settings(self) -> Tuple:
+        """Configuration that affects check_file results, part of the results cache key"""
+        return ()
+
+    def check_structure(self, context: RuleContext) -> Iterator[ValidationError]:
+        """Checks run once per validation"""
+        return iter(())
+
+    def check_file(self, doc: Document, context: RuleContext) -> Iterator[ValidationError]:
+        """Checks run for every markdown file in a single pass"""
+        return iter(())
+
+    def error(self, rule: str, path: str, message: str) -> ValidationError:
+        return ValidationError('error', rule, path, message)
+
+    def warning(self, rule: str, path: str, message: str) -> ValidationError:
+        return ValidationError('warning', rule, path, message)
+
+
+# Rules by name, in the order their findings are reported
+RULES: Dict[str, Type[Rule]] = {}
+
+
+def register(rule_class: Type[Rule]) -> Type[Rule]:
+    """Class decorator adding a rule to the registry"""
+    RULES[rule_class.name] = rule_class
+    return rule_class
+
+
+def select_rules(only: Optional[List[str]] = None, skip: Optional[List[str]] = None) -> List[str]:
+    """Rule names to run, in registry order; raises KeyError for unknown names
+
+    Without `only` the default rules run. 'default' in `only` stands for
+    them, so 'default,links' adds the opt-in links rule.
+    """
+    for name in (only or []) + (skip or []):
+        if name not in RULES and name != 'default':
+            raise KeyError(name)
+    defaults = not only or 'default' in only
+    return [name for name in RULES
+            if ((defaults and RULES[name].default) or name in (only or [])) and name not in (skip or [])]
+
+
+@register
+class StructureDefinitionRule(Rule):
+    """Every shelf, book and chapter definition carries its required fields"""
+    name = 'structure_definition'
+    description = 'structure definition'
+
+    def check_structure(self, context: RuleContext) -> Iterator[ValidationError]:
+        structure = context.structure
+        if not structure.has_structure:
+            yield self.error('structure_definition', '', 'Missing structure definition')
+            return
+
+        for _ in range(structure.invalid_entries):
+            yield self.error('structure_definition', '', 'Invalid shelf definition')
+
+        for shelf in structure.shelves:
+            yield from self._check_shelf(shelf)
+
+    def _check_shelf(self, shelf: Shelf) -> Iterator[ValidationError]:
+        for field in ['name', 'slug', 'books']:
+            if field not in shelf.keys:
+                yield self.error('missing_field', shelf.name or 'unknown',
+                                 f"Shelf missing required field: {field}")
+
+        for book in shelf.books:
+            yield from self._check_book(book, shelf.slug)
+
+    def _check_book(self, book: Book, shelf_slug: str) -> Iterator[ValidationError]:
+        for field in ['name', 'slug', 'chapters']:
+            if field not in book.keys:
+                yield self.error('missing_field', f"{shelf_slug}/{book.name or 'unknown'}",
+                                 f"Book missing required field: {field}")
+
+        for chapter in book.chapters:
+            yield from self._check_chapter(chapter, shelf_slug, book.slug)
+
+    def _check_chapter(self, chapter: Chapter, shelf_slug: str, book_slug: str) -> Iterator[ValidationError]:
+        path = f"{shelf_slug}/{book_slug}/{chapter.name or 'unknown'}"
+
+        for field in ['name', 'slug', 'pages']:
+            if field not in chapter.keys:
+                yield self.error('missing_field', path, f"Chapter missing required field: {field}")
+
+        if 'pages' in chapter.keys and len(chapter.pages) == 0:
+            yield self.error('required_pages', path, "Chapter must have at least one page")
+
+
+@register
+class FilesystemStructureRule(Rule):
+    """Every shelf, book and chapter directory and every page file exists"""
+    name = 'filesystem_structure'
+    description = 'filesystem structure'
+    inputs = frozenset({STRUCTURE, FILES})
+
+    def check_structure(self, context: RuleContext) -> Iterator[ValidationError]:
+        # Membership checks against the single directory walk instead of one stat per path
+        directories = context.corpus.directories
+        files = context.corpus.by_path
+        docs_root = context.docs_root
+
+        # With a file scope only the pages in it, and the directories above them, are checked
+        scoped = None
+        if context.scope is not None:
+            scoped = set()
+            for rel_path in context.scope:
+                page = context.structure.page_for_file(rel_path)
+                if page:
+                    scoped.update((page, page.parent, page.book, page.shelf))
+
+        for shelf in context.structure.shelves:
+            if scoped is not None and shelf not in scoped:
+                continue
+            if shelf.path not in directories:
+                yield self.warning('missing_directory', str(docs_root / shelf.path),
+                                   f"Shelf directory not found: {shelf.name}")
+                continue
+
+            for book in shelf.books:
+                if scoped is not None and book not in scoped:
+                    continue
+                if book.path not in directories:
+                    yield self.warning('missing_directory', str(docs_root / book.path),
+                                       f"Book directory not found: {book.name}")
+                    continue
+
+                for chapter in book.chapters:
+                    if scoped is not None and chapter not in scoped:
+                        continue
+                    if chapter.path not in directories:
+                        yield self.warning('missing_directory', str(docs_root / chapter.path),
+                                           f"Chapter directory not found: {chapter.name}")
+                        continue
+
+                    for page in chapter.pages:
+                        if scoped is not None and page not in scoped:
+                            continue
+                        if page.file_path not in files:
+                            yield self.warning('missing_page', str(docs_root / page.file_path),
+                                               f"Page file not found: {page.slug}")
+
+
+@register
+class NamingConventionRule(Rule):
+    """Page files are named 00-kebab-case
+
+    conventions.page_pattern: regex for page file stems
+    conventions.page_depth: path depth of page files (shelf/book/chapter/page.md)
+    """
+    name = 'naming_convention'
+    description = 'naming conventions'
+    inputs = frozenset({FILES})
+    cacheable = True
+
+    DEFAULT_PATTERN = r'^\d{2}-[a-z]+(-[a-z]+)*$'
+    DEFAULT_DEPTH = 4
+
+    def __init__(self, conventions: Dict[str, Any]):
+        super().__init__(conventions)
+        self.pattern = re.compile(self.conventions.get('page_pattern', self.DEFAULT_PATTERN))
+        self.depth = int(self.conventions.get('page_depth', self.DEFAULT_DEPTH))
+
+    def settings(self) -> Tuple:
+        return (self.pattern.pattern, self.depth)
+
+    def check_file(self, doc: Document, context: RuleContext) -> Iterator[ValidationError]:
+        # Skip files in root or special directories
+        if len(doc.parts) < self.depth:
+            return
+
+        page_name = doc.stem
+        if not self.pattern.match(page_name):
+            yield self.error('naming_convention', str(doc.path),
+                             f"Page name '{page_name}' doesn't match pattern '00-kebab-case'")
+
+
+@register
+class FrontmatterRule(Rule):
+    """Every page has parseable frontmatter with the required fields
+
+    conventions.required_frontmatter: list of required fields
+    conventions.date_fields: fields that must be YYYY-MM-DD dates
+    """
+    name = 'frontmatter'
+    description = 'frontmatter'
+    inputs = frozenset({FILES, FRONTMATTER})
+    cacheable = True
+
+    DEFAULT_REQUIRED = ['title', 'order', 'category', 'tags', 'last_updated', 'author']
+    DEFAULT_DATE_FIELDS = ['last_updated']
+
+    def __init__(self, conventions: Dict[str, Any]):
+        super().__init__(conventions)
+        self.required = list(self.conventions.get('required_frontmatter', self.DEFAULT_REQUIRED))
+        self.date_fields = list(self.conventions.get('date_fields', self.DEFAULT_DATE_FIELDS))
+
+    def settings(self) -> Tuple:
+        return (tuple(self.required), tuple(self.date_fields))
+
+    def check_file(self, doc: Document, context: RuleContext) -> Iterator[ValidationError]:
+        md_file = str(doc.path)
+        try:
+            if doc.frontmatter_state == 'missing':
+                yield self.error('frontmatter_required', md_file, "Missing frontmatter section")
+                return
+
+            if doc.frontmatter_state == 'invalid':
+                yield self.error('frontmatter_required', md_file, "Invalid frontmatter format")
+                return
+
+            frontmatter = doc.frontmatter
+            if doc.frontmatter_error:
+                yield self.error('frontmatter_parse', md_file,
+                                 f"Failed to parse frontmatter: {doc.frontmatter_error}")
+                return
+
+            if not frontmatter:
+                yield self.error('frontmatter_required', md_file, "Empty frontmatter")
+                return
+
+            for field in self.required:
+                if field not in frontmatter:
+                    yield self.error('frontmatter_field', md_file,
+                                     f"Missing required frontmatter field: {field}")
+
+            for field in self.date_fields:
+                if field in frontmatter:
+                    try:
+                        datetime.strptime(str(frontmatter[field]), '%Y-%m-%d')
+                    except ValueError:
+                        yield self.error('frontmatter_format', md_file,
+                                         f"Invalid date format for {field} (use YYYY-MM-DD)")
+
+        except Exception as e:
+            yield self.error('file_read', md_file, f"Failed to read file: {e}")
+
+
+@register
+class OrphanedFilesRule(Rule):
+    """Every markdown file is listed in the structure"""
+    name = 'orphaned_files'
+    description = 'orphaned files'
+    inputs = frozenset({STRUCTURE, FILES})
+
+    def check_file(self, doc: Document, context: RuleContext) -> Iterator[ValidationError]:
+        # Special directories are already excluded by the corpus ignore rules
+        if doc.rel_path not in context.structure.by_file_path:
+            yield self.warning('orphaned_file', str(doc.path), "File not defined in structure")
+
+
+@register
+class UniqueSlugsRule(Rule):
+    """Slugs are unique within their scope"""
+    name = 'unique_slugs'
+    description = 'unique slugs'
+
+    def check_structure(self, context: RuleContext) -> Iterator[ValidationError]:
+        shelf_slugs = set()
+        for shelf in context.structure.shelves:
+            shelf_slug = shelf.slug
+
+            if shelf_slug in shelf_slugs:
+                yield self.error('unique_slugs', shelf_slug, f"Duplicate shelf slug: {shelf_slug}")
+            shelf_slugs.add(shelf_slug)
+
+            book_slugs = set()
+            for book in shelf.books:
+                book_slug = book.slug
+
+                if book_slug in book_slugs:
+                    yield self.error('unique_slugs', f"{shelf_slug}/{book_slug}",
+                                     f"Duplicate book slug within shelf: {book_slug}")
+                book_slugs.add(book_slug)
+
+                chapter_slugs = set()
+                for chapter in book.chapters:
+                    chapter_slug = chapter.slug
+
+                    if chapter_slug in chapter_slugs:
+                        yield self.error('unique_slugs', f"{shelf_slug}/{book_slug}/{chapter_slug}",
+                                         f"Duplicate chapter slug within book: {chapter_slug}")
+                    chapter_slugs.add(chapter_slug)
+
+
+@register
+class LinksRule(Rule):
+    """Relative links and #fragments resolve to existing pages and headings
+
+    Opt-in (--rules default,links): it reads every page body. Each page's
+    links are checked with the page, so an edited buffer gets its own
+    findings; with a file scope, links from other pages into the selected
+    (possibly renamed or deleted) files are checked too.
+
+    conventions.broken_links: severity of broken links, 'error' or 'warning'
+    """
+    name = 'links'
+    description = 'links and anchors'
+    inputs = frozenset({STRUCTURE, FILES, BODY, TREE})
+    default = False
+
+    def __init__(self, conventions: Dict[str, Any]):
+        super().__init__(conventions)
+        self.severity = self.conventions.get('broken_links', 'warning')
+        self._index: Optional[LinkIndex] = None
+
+    def _link_index(self, context: RuleContext) -> LinkIndex:
+        # One index per corpus, so target pages and anchors are resolved once across pages
+        if self._index is None or self._index.corpus is not context.corpus \
+                or self._index.structure is not context.structure:
+            self._index = LinkIndex(context.corpus, context.structure, build=False)
+        return self._index
+
+    def _findings(self, broken, orphan_links, context: RuleContext) -> Iterator[ValidationError]:
+        for link, reason in broken:
+            yield ValidationError(self.severity, 'broken_link', str(context.docs_root / link.source),
+                                  f"{reason}: [{link.text}]({link.target})")
+        for link in orphan_links:
+            yield self.warning('link_to_orphan', str(context.docs_root / link.source),
+                               f"Links to a page not defined in structure: {link.target}")
+
+    def check_file(self, doc: Document, context: RuleContext) -> Iterator[ValidationError]:
+        yield from self._findings(*self._link_index(context).check_page(doc), context)
+
+    def check_structure(self, context: RuleContext) -> Iterator[ValidationError]:
+        if context.scope is None or context.tree is None:
+            return
+        # Pages outside the scope that link into it
+        links = links_into(context.tree, context.scope)
+        yield from self._findings(*self._link_index(context).check_links(links), context)
@@ -0,0 +1,213 @@
+"""
+Typed model of bookstack-structure.yaml
+Parses the nested shelf -> book -> chapter -> page definition once into
+compact node objects with parent pointers and precomputed path indexes.
+The parsed YAML is cached as plain data, keyed by the YAML hash, so later
+runs skip the slow YAML parser.
+"""
+
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from .cache import cache_dir, dump_data, file_digest, load_data
+
+# Bump when the cached data changes so stale entries are ignored
+MODEL_VERSION = 2
+
+
+class Shelf:
+    """A BookStack shelf (top-level directory)"""
+    __slots__ = ('name', 'slug', 'description', 'path', 'keys', 'books')
+
+    def __init__(self, name: Optional[str], slug: Optional[str], description: str, keys: Tuple[str, ...]):
+        self.name = name
+        self.slug = slug
+        self.description = description
+        self.path = slug or ''
+        self.keys = keys
+        self.books: List['Book'] = []
+
+    def __repr__(self) -> str:
+        return f"Shelf({self.path!r})"
+
+
+class Book:
+    """A BookStack book (second-level directory)"""
+    __slots__ = ('name', 'slug', 'description', 'path', 'keys', 'parent', 'chapters')
+
+    def __init__(self, name: Optional[str], slug: Optional[str], description: str,
+                 keys: Tuple[str, ...], parent: Shelf):
+        self.name = name
+        self.slug = slug
+        self.description = description
+        self.path = f"{parent.path}/{slug}"
+        self.keys = keys
+        self.parent = parent
+        self.chapters: List['Chapter'] = []
+
+    def __repr__(self) -> str:
+        return f"Book({self.path!r})"
+
+
+class Chapter:
+    """A BookStack chapter (third-level directory holding page files)"""
+    __slots__ = ('name', 'slug', 'description', 'path', 'keys', 'parent', 'pages')
+
+    def __init__(self, name: Optional[str], slug: Optional[str], description: str,
+                 keys: Tuple[str, ...], parent: Book):
+        self.name = name
+        self.slug = slug
+        self.description = description
+        self.path = f"{parent.path}/{slug}"
+        self.keys = keys
+        self.parent = parent
+        self.pages: List['Page'] = []
+
+    @property
+    def shelf(self) -> Shelf:
+        return self.parent.parent
+
+    def __repr__(self) -> str:
+        return f"Chapter({self.path!r})"
+
+
+class Page:
+    """A page slug listed in a chapter, backed by <chapter path>/<slug>.md"""
+    __slots__ = ('slug', 'path', 'file_path', 'parent')
+
+    def __init__(self, slug: str, parent: Chapter):
+        self.slug = slug
+        self.path = f"{parent.path}/{slug}"
+        self.file_path = f"{self.path}.md"
+        self.parent = parent
+
+    @property
+    def book(self) -> Book:
+        return self.parent.parent
+
+    @property
+    def shelf(self) -> Shelf:
+        return self.parent.parent.parent
+
+    def __repr__(self) -> str:
+        return f"Page({self.file_path!r})"
+
+
+class StructureModel:
+    """Parsed structure definition with O(1) lookups by slug path and file path"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.metadata = {key: value for key, value in data.items() if key != 'structure'}
+        self.has_structure = 'structure' in data
+        self.invalid_entries = 0
+        self.shelves: List[Shelf] = []
+        self.by_slug_path: Dict[str, Any] = {}
+        self.by_file_path: Dict[str, Page] = {}
+        self.by_chapter: Dict[str, Chapter] = {}
+        self._build(data.get('structure') or [])
+
+    @property
+    def version(self) -> str:
+        return self.metadata.get('version', 'unknown')
+
+    @property
+    def conventions(self) -> Dict[str, Any]:
+        return self.metadata.get('conventions') or {}
+
+    def _build(self, entries: List[Dict[str, Any]]):
+        for entry in entries:
+            if not isinstance(entry, dict) or 'shelf' not in entry:
+                self.invalid_entries += 1
+                continue
+            shelf_data = entry['shelf']
+            shelf = Shelf(shelf_data.get('name'), shelf_data.get('slug'),
+                          shelf_data.get('description', ''), tuple(shelf_data))
+            self.shelves.append(shelf)
+            self.by_slug_path.setdefault(shelf.path, shelf)
+
+            for book_entry in shelf_data.get('books') or []:
+                if 'book' not in book_entry:
+                    continue
+                book_data = book_entry['book']
+                book = Book(book_data.get('name'), book_data.get('slug'),
+                            book_data.get('description', ''), tuple(book_data), shelf)
+                shelf.books.append(book)
+                self.by_slug_path.setdefault(book.path, book)
+
+                for chapter_entry in book_data.get('chapters') or []:
+                    if 'chapter' not in chapter_entry:
+                        continue
+                    chapter_data = chapter_entry['chapter']
+                    chapter = Chapter(chapter_data.get('name'), chapter_data.get('slug'),
+                                      chapter_data.get('description', ''), tuple(chapter_data), book)
+                    book.chapters.append(chapter)
+                    self.by_slug_path.setdefault(chapter.path, chapter)
+                    self.by_chapter.setdefault(chapter.path, chapter)
+
+                    for page_slug in chapter_data.get('pages') or []:
+                        page = Page(str(page_slug), chapter)
+                        chapter.pages.append(page)
+                        self.by_slug_path.setdefault(page.path, page)
+                        self.by_file_path.setdefault(page.file_path, page)
+
+    def iter_books(self) -> Iterator[Book]:
+        for shelf in self.shelves:
+            yield from shelf.books
+
+    def iter_chapters(self) -> Iterator[Chapter]:
+        for book in self.iter_books():
+            yield from book.chapters
+
+    def iter_pages(self) -> Iterator[Page]:
+        for chapter in self.iter_chapters():
+            yield from chapter.pages
+
+    def node(self, slug_path: str):
+        """Look up a shelf, book, chapter or page by its slug path"""
+        return self.by_slug_path.get(slug_path.strip('/'))
+
+    def page_for_file(self, rel_path: str) -> Optional[Page]:
+        """Look up the page backed by a docs-relative file path"""
+        return self.by_file_path.get(rel_path)
+
+    def chapter(self, chapter_path: str) -> Optional[Chapter]:
+        """Look up a chapter by shelf/book/chapter path"""
+        return self.by_chapter.get(chapter_path.strip('/'))
+
+
+def load_structure(structure_file: str, use_cache: bool = True) -> StructureModel:
+    """Load a structure definition, reusing the cached YAML data when the file is unchanged
+
+    The cache is best-effort: any failure to read or write it falls back to
+    parsing the YAML.
+    """
+    if not use_cache:
+        with open(structure_file, 'r') as f:
+            return StructureModel(yaml.safe_load(f) or {})
+
+    try:
+        cache_file = cache_dir() / f"structure-v{MODEL_VERSION}-{file_digest(structure_file)}.json"
+    except OSError:
+        return load_structure(structure_file, use_cache=False)
+
+    if cache_file.exists():
+        try:
+            return StructureModel(load_data(cache_file.read_bytes()))
+        except (OSError, ValueError):
+            pass  # Corrupt or incompatible cache entry, rebuild below
+
+    with open(structure_file, 'r') as f:
+        data = yaml.safe_load(f) or {}
+
+    tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        tmp_file.write_bytes(dump_data(data))
+        tmp_file.replace(cache_file)
+    except (OSError, TypeError):
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+    return StructureModel(data)
@@ -0,0 +1,247 @@
+"""
+Synthetic documentation corpus
+Generates a bookstack structure definition plus a matching docs tree of a
+chosen size, with controllable rates of the problems the tools look for:
+broken frontmatter, orphaned and unnumbered pages, missing pages, broken
+links, stubs, placeholders and legacy files waiting in docs/_old. Output is
+deterministic for a given spec, so benchmark runs are comparable.
+"""
+
+import math
+import os
+import random
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+WORDS = (
+    'access', 'agent', 'alert', 'api', 'backup', 'build', 'cache', 'cluster', 'config', 'container',
+    'data', 'deploy', 'docker', 'event', 'gateway', 'git', 'health', 'index', 'ingress', 'job',
+    'key', 'log', 'metric', 'network', 'node', 'pipeline', 'plugin', 'policy', 'queue', 'release',
+    'restore', 'route', 'runner', 'schema', 'secret', 'service', 'session', 'stack', 'storage',
+    'sync', 'task', 'template', 'token', 'trace', 'upgrade', 'volume', 'webhook', 'worker',
+)
+
+# Slug pools that overlap the keyword mappings in the migration scripts
+SHELF_SLUGS = ('engineering', 'platform', 'operations', 'projects', 'learning', 'stack')
+BOOK_SLUGS = ('api-guide', 'ci-cd', 'deployment', 'monitoring', 'git-guide', 'security',
+              'testing', 'architecture', 'integration', 'services')
+CHAPTER_SLUGS = ('overview', 'setup', 'configuration', 'advanced', 'reference',
+                 'troubleshooting', 'backup', 'workflow', 'patterns', 'examples')
+
+# docs/_old layout: directories whose names the migration classifiers route on
+LEGACY_DIRS = ('ci-cd', 'development', 'api', 'mcp', 'deployment', 'services', 'operations',
+               'stack', 'agent-management', 'architecture', 'migration', 'orchestration',
+               'mosaic-stack', 'troubleshooting', 'bookstack', 'misc')
+LEGACY_TOPICS = ('template', 'troubleshoot', 'workflow', 'git', 'quick-start', 'nginx', 'docker',
+                 'backup', 'incident', 'startup', 'security', 'data-flow', 'routing', 'overview',
+                 'roadmap', 'config', 'notes', 'readme')
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus; rates are fractions of the structured pages"""
+    shelves: int = 2
+    books: int = 5              # per shelf
+    chapters: int = 5           # per book
+    pages: int = 20             # per chapter
+    page_bytes: int = 1500      # median body size
+    size_sigma: float = 0.8     # log-normal spread of body sizes
+    broken_frontmatter: float = 0.02
+    orphans: float = 0.02       # extra pages not listed in the structure (half unnumbered)
+    missing: float = 0.01       # pages listed in the structure but absent on disk
+    stubs: float = 0.05         # draft stub pages
+    placeholders: float = 0.02  # pages containing [TODO]-style placeholders
+    links: int = 3              # relative links per page
+    broken_links: float = 0.02  # share of links pointing at missing files or headings
+    legacy: float = 0.05        # files under docs/_old, for the migration scripts
+    seed: int = 0
+
+    @classmethod
+    def for_pages(cls, pages: int, **overrides: Any) -> 'CorpusSpec':
+        """A spec with roughly `pages` structured pages, 20 per chapter and 10 chapters per book"""
+        chapters = max(1, min(10, math.ceil(pages / 20)))
+        books = max(1, min(10, math.ceil(pages / (20 * chapters))))
+        shelves = max(1, math.ceil(pages / (20 * chapters * books)))
+        return cls(shelves=shelves, books=books, chapters=chapters, pages=20, **overrides)
+
+    @property
+    def page_count(self) -> int:
+        return self.shelves * self.books * self.chapters * self.pages
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _slug(pool: Tuple[str, ...], index: int) -> str:
+    """Unique letters-and-hyphens slug: pool[i], then pool[i]-b, pool[i]-c, ..."""
+    slug = pool[index % len(pool)]
+    round_ = index // len(pool)
+    suffix = ''
+    while round_:
+        round_, letter = divmod(round_ - 1, 26)
+        suffix = chr(ord('a') + letter) + suffix
+    return f"{slug}-{suffix}" if suffix else slug
+
+
+def _rel_link(source: str, target: str) -> str:
+    return os.path.relpath(target, os.path.dirname(source)).replace(os.sep, '/')
+
+
+class CorpusGenerator:
+    """Writes a CorpusSpec to disk as <root>/docs plus the structure definition"""
+
+    def __init__(self, spec: CorpusSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.pages: List[Tuple[str, str, str, List[str]]] = []  # rel_path, title, chapter slug, headings
+        self.stats: Dict[str, int] = {}
+
+    def _sentence(self) -> str:
+        words = self.rng.choices(WORDS, k=self.rng.randint(6, 14))
+        return ' '.join(words).capitalize() + '.'
+
+    def _body_size(self) -> int:
+        return max(80, int(self.rng.lognormvariate(math.log(self.spec.page_bytes), self.spec.size_sigma)))
+
+    def _count(self, name: str, n: int = 1):
+        self.stats[name] = self.stats.get(name, 0) + n
+
+    def build_structure(self) -> Dict[str, Any]:
+        spec = self.spec
+        shelves = []
+        for s in range(spec.shelves):
+            shelf_slug = _slug(SHELF_SLUGS, s)
+            books = []
+            for b in range(spec.books):
+                book_slug = _slug(BOOK_SLUGS, b)
+                chapters = []
+                for c in range(spec.chapters):
+                    chapter_slug = _slug(CHAPTER_SLUGS, c)
+                    slugs = []
+                    for p in range(spec.pages):
+                        page_slug = f"{(p % 99) + 1:02d}-{_slug(WORDS, p + s + b + c)}"
+                        slugs.append(page_slug)
+                        headings = ['Overview'] + self.rng.sample(['Usage', 'Configuration', 'Examples',
+                                                                   'Troubleshooting', 'Reference'], 2)
+                        rel_path = f"{shelf_slug}/{book_slug}/{chapter_slug}/{page_slug}.md"
+                        self.pages.append((rel_path, page_slug[3:].replace('-', ' ').title(),
+                                           chapter_slug, headings))
+                    chapters.append({'chapter': {'name': chapter_slug.replace('-', ' ').title(),
+                                                 'slug': chapter_slug, 'pages': slugs}})
+                books.append({'book': {'name': book_slug.replace('-', ' ').title(),
+                                       'slug': book_slug, 'chapters': chapters}})
+            shelves.append({'shelf': {'name': shelf_slug.replace('-', ' ').title(),
+                                      'slug': shelf_slug,
+                                      'description': f"Synthetic {shelf_slug} shelf",
+                                      'books': books}})
+        return {'version': '1.0', 'metadata': {'generator': 'mosaic_docs.synthetic', **self.spec.to_dict()},
+                'structure': shelves}
+
+    def _links(self, rel_path: str) -> List[str]:
+        lines = []
+        for _ in range(self.spec.links):
+            target, title, _, headings = self.rng.choice(self.pages)
+            href = _rel_link(rel_path, target)
+            if self.rng.random() < self.spec.broken_links:
+                self._count('broken_links')
+                if self.rng.random() < 0.5:
+                    href = href[:-3] + '-missing.md'
+                else:
+                    href += '#no-such-heading'
+            elif self.rng.random() < 0.3:
+                href += '#' + self.rng.choice(headings).lower()
+            lines.append(f"- [{title}]({href})")
+        return lines
+
+    def page_text(self, rel_path: str, title: str, category: str, headings: List[str]) -> str:
+        spec = self.spec
+        roll = self.rng.random()
+        if roll < spec.stubs:
+            self._count('stubs')
+            return (f'---\ntitle: "{title}"\norder: 1\ncategory: "{category}"\ntags: ["{category}"]\n'
+                    f'last_updated: "2025-01-19"\nauthor: "stub"\nversion: "1.0"\nstatus: "draft"\n---\n\n'
+                    f'# {title}\n\n## Overview\n\n[Content to be added]\n')
+
+        if self.rng.random() < spec.broken_frontmatter:
+            self._count('broken_frontmatter')
+            frontmatter = f'---\ntitle: "{title}\ntags: [{category}\n---\n'
+        else:
+            frontmatter = (f'---\ntitle: "{title}"\norder: 1\ncategory: "{category}"\n'
+                           f'tags: ["{category}", "synthetic"]\nlast_updated: "2025-01-19"\n'
+                           f'author: "generator"\nversion: "1.0"\nstatus: "published"\n---\n')
+
+        size = self._body_size()
+        per_section = max(1, size // len(headings))
+        parts = [frontmatter, f"# {title}\n"]
+        for heading in headings:
+            parts.append(f"\n## {heading}\n\n")
+            written = 0
+            while written < per_section:
+                sentence = self._sentence()
+                parts.append(sentence + ' ')
+                written += len(sentence) + 1
+            parts.append('\n')
+        if self.rng.random() < spec.placeholders:
+            self._count('placeholders')
+            parts.append('\n1. [TODO]\n2. [Learning 1]\n')
+        parts.append('\n## See Also\n\n' + '\n'.join(self._links(rel_path)) + '\n')
+        return ''.join(parts)
+
+    def _write(self, path: Path, text: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+        self._count('files')
+        self._count('bytes', len(text.encode('utf-8')))
+
+    def write(self, root: Path, structure_file: str = 'docs/bookstack/bookstack-structure-optimized.yaml') -> Dict[str, int]:
+        """Write the structure definition and the docs tree under root; returns counts"""
+        root = Path(root)
+        docs = root / 'docs'
+        structure = self.build_structure()
+        structure_path = root / structure_file
+        structure_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(structure_path, 'w') as f:
+            yaml.safe_dump(structure, f, sort_keys=False)
+
+        chapters: Dict[str, List[Tuple[str, str]]] = {}
+        for rel_path, title, category, headings in self.pages:
+            chapters.setdefault(os.path.dirname(rel_path), []).append((title, os.path.basename(rel_path)))
+            if self.rng.random() < self.spec.missing:
+                self._count('missing')
+                continue
+            self._write(docs / rel_path, self.page_text(rel_path, title, category, headings))
+
+        # Chapter READMEs in the format fix-doc-issues.py rewrites, with the occasional dead entry
+        for chapter_path, entries in chapters.items():
+            lines = [f"# {os.path.basename(chapter_path).title()}\n", "## Pages in this chapter:"]
+            for title, name in entries:
+                lines.append(f"- [{title}](./{name})")
+            if self.rng.random() < 0.2:
+                lines.append("- [Retired](./99-retired.md)")
+            self._write(docs / chapter_path / 'README.md', '\n'.join(lines) + '\n')
+
+        chapter_dirs = list(chapters)
+        for i in range(round(self.spec.page_count * self.spec.orphans)):
+            self._count('orphans')
+            word = _slug(WORDS, i)
+            name = f"{word}-notes.md" if i % 2 else f"{(i % 90) + 10:02d}-{word}-notes.md"
+            rel_path = f"{self.rng.choice(chapter_dirs)}/{name}"
+            self._write(docs / rel_path, self.page_text(rel_path, word.title(), 'orphan', ['Overview']))
+
+        for i in range(round(self.spec.page_count * self.spec.legacy)):
+            self._count('legacy')
+            directory = self.rng.choice(LEGACY_DIRS)
+            topic = self.rng.choice(LEGACY_TOPICS)
+            rel_path = f"{directory}/{topic}-{_slug(WORDS, i)}.md"
+            self._write(docs / '_old' / rel_path,
+                        self.page_text(rel_path, topic.title(), directory, ['Overview', 'Details']))
+
+        return dict(self.stats)
+
+
+def generate_corpus(root: str, spec: CorpusSpec) -> Dict[str, int]:
+    """Generate a synthetic corpus under root (root/docs and the structure definition)"""
+    return CorpusGenerator(spec).write(Path(root))
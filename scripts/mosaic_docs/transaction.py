@@ -0,0 +1,358 @@
+"""
+Journaled file transactions for the migration scripts
+Every move and write a migration makes goes through a MigrationTransaction,
+which appends it to a JSONL journal in the .migrations directory of the
+docs root before doing it. An interrupted run can be resumed (operations already done are skipped
+by key), and any transaction can be rolled back by replaying its journal
+backwards: moves are undone, overwritten files are restored from the copy
+saved before the write, and created files and directories are removed.
+"""
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .cache import LEGACY_CACHE_DIR
+
+PathLike = Union[str, Path]
+
+# Journals and the backups they restore from are the only copy of overwritten pages,
+# so they live beside the docs, not in the disposable cache
+MIGRATIONS_DIR = '.migrations'
+
+
+def journal_dir(root: PathLike, create: bool = True) -> Path:
+    """Directory holding the migration journals of a docs root"""
+    path = Path(root).resolve() / MIGRATIONS_DIR
+    if create:
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def legacy_journals(root: PathLike) -> List[Path]:
+    """Journals for root left in the cache directory by earlier versions"""
+    legacy = Path(os.environ.get('MOSAIC_DOCS_CACHE', LEGACY_CACHE_DIR)) / 'migrations'
+    found = []
+    for path in sorted(legacy.glob('*.jsonl')) if legacy.is_dir() else ():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                begin = json.loads(f.readline())
+        except (OSError, ValueError):
+            continue
+        if begin.get('root') == str(Path(root).resolve()):
+            found.append(path)
+    return found
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class TransactionError(Exception):
+    """A migration operation that cannot be done safely"""
+
+
+class MigrationTransaction:
+    """A journaled batch of moves and writes under one root directory
+
+    Paths are given relative to the root (or absolute under it) and stored
+    relative to it. Each operation is journaled as pending (fsynced) before
+    it touches the tree and marked done afterwards, so after a crash the
+    journal always covers what may have happened. Operations on different
+    keys may run from several threads at once.
+    """
+
+    def __init__(self, tx_id: str, root: PathLike, kind: str, records: Optional[List[Dict[str, Any]]] = None):
+        self.id = tx_id
+        self.root = Path(root).resolve()
+        self.kind = kind
+        self.path = journal_dir(self.root) / f"{tx_id}.jsonl"
+        self.blobs = journal_dir(self.root) / tx_id
+        self.records: List[Dict[str, Any]] = records or []
+        # Operation key -> pending record, and keys whose operation completed
+        self.ops: Dict[str, Dict[str, Any]] = {}
+        self.done = set()
+        self.status = 'open'
+        self.plan: Any = None
+        self.started = 0.0
+        self._lock = threading.Lock()
+        for record in self.records:
+            self._apply(record)
+        self._stream = None
+
+    # Journal
+
+    @classmethod
+    def begin(cls, root: PathLike, kind: str, plan: Any = None) -> 'MigrationTransaction':
+        """Start a new transaction; `plan` is stored so an interrupted run can be resumed as planned"""
+        tx_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{kind}-{uuid.uuid4().hex[:6]}"
+        tx = cls(tx_id, root, kind)
+        tx._append({'event': 'begin', 'kind': kind, 'root': str(tx.root),
+                    'time': time.time(), 'plan': plan}, sync=True)
+        return tx
+
+    @classmethod
+    def load(cls, root: PathLike, tx_id: str) -> 'MigrationTransaction':
+        path = journal_dir(root, create=False) / f"{tx_id}.jsonl"
+        if not path.exists():
+            raise TransactionError(f"No migration journal {tx_id} in {path.parent}")
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # Torn final line from a crash
+        begin = records[0]
+        # The journal directory moves with the tree, so the root is where it was found
+        return cls(tx_id, root, begin['kind'], records)
+
+    @classmethod
+    def history(cls, root: PathLike, kind: Optional[str] = None) -> List['MigrationTransaction']:
+        """Journaled transactions of a docs root, oldest first"""
+        directory = journal_dir(root, create=False)
+        if not directory.is_dir():
+            return []
+        transactions = []
+        for path in sorted(directory.glob('*.jsonl')):
+            try:
+                tx = cls.load(root, path.stem)
+            except (TransactionError, IndexError, KeyError):
+                continue
+            if kind is None or tx.kind == kind:
+                transactions.append(tx)
+        # Ids only have one-second resolution; runs started within a second are ordered by begin time
+        return sorted(transactions, key=lambda tx: (tx.started, tx.id))
+
+    @classmethod
+    def latest(cls, root: PathLike, kind: str, status: Optional[str] = None) -> Optional['MigrationTransaction']:
+        for tx in reversed(cls.history(root, kind)):
+            if status is None or tx.status == status:
+                return tx
+        return None
+
+    @classmethod
+    def for_rollback(cls, root: PathLike, kind: str, tx_id: Optional[str] = None) -> 'MigrationTransaction':
+        """The transaction to undo (tx_id, or the latest); raises TransactionError if there is none"""
+        tx = cls.load(root, tx_id) if tx_id else cls.latest(root, kind)
+        if tx is None:
+            directory = journal_dir(root, create=False)
+            message = f"No {kind} journal to roll back in {directory}"
+            legacy = legacy_journals(root)
+            if legacy:
+                message += (f"; {len(legacy)} journals for this root are in {legacy[0].parent}, "
+                            f"move them and their backup directories to {directory} to use them")
+            raise TransactionError(message)
+        if tx.status == 'rolled_back':
+            raise TransactionError(f"{tx.id} was already rolled back")
+        return tx
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        event = record['event']
+        if event == 'begin':
+            self.plan = record.get('plan')
+            self.started = record.get('time', 0.0)
+        elif event == 'op':
+            self.ops[record['key']] = record
+        elif event == 'done':
+            self.done.add(record['key'])
+        elif event in ('commit', 'rollback'):
+            self.status = {'commit': 'committed', 'rollback': 'rolled_back'}[event]
+
+    def _append(self, record: Dict[str, Any], sync: bool = False) -> None:
+        with self._lock:
+            if self._stream is None:
+                self._stream = open(self.path, 'a', encoding='utf-8')
+            self._stream.write(json.dumps(record) + '\n')
+            self._stream.flush()
+            if sync:
+                os.fsync(self._stream.fileno())
+            self.records.append(record)
+            self._apply(record)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+    def commit(self) -> None:
+        self._append({'event': 'commit', 'time': time.time()}, sync=True)
+        self.close()
+
+    # Paths
+
+    def rel(self, path: PathLike) -> str:
+        path = Path(path)
+        absolute = path if path.is_absolute() else Path.cwd() / path
+        return os.path.relpath(absolute, self.root).replace(os.sep, '/')
+
+    def abs(self, rel_path: str) -> Path:
+        return self.root / rel_path
+
+    def _missing_dirs(self, directory: Path) -> List[str]:
+        """Directories that creating `directory` would add, outermost first (undone on rollback)"""
+        missing = []
+        current = directory
+        while not current.exists():
+            missing.append(self.rel(current))
+            current = current.parent
+        return list(reversed(missing))
+
+    # Operations
+
+    def is_done(self, key: str) -> bool:
+        return key in self.done
+
+    def _interrupted_write(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        op = self.ops.get(key) if key else None
+        if op and op['op'] == 'write' and key not in self.done:
+            return op
+        return None
+
+    def read_text(self, path: PathLike, key: Optional[str] = None) -> str:
+        """Current content, or for a write `key` interrupted by a crash, the content it replaced
+
+        Recomputing an interrupted write from what it replaced gives the same
+        result, so the retry is recognised when the write had already landed.
+        """
+        op = self._interrupted_write(key)
+        if op is not None:
+            if op['backup'] is None:
+                raise FileNotFoundError(f"{op['path']} did not exist before {key}")
+            return (self.blobs / op['backup']).read_text(encoding='utf-8')
+        return Path(path).read_text(encoding='utf-8')
+
+    def exists(self, path: PathLike, key: Optional[str] = None) -> bool:
+        op = self._interrupted_write(key)
+        if op is not None:
+            return op['backup'] is not None
+        return Path(path).exists()
+
+    def move(self, src: PathLike, dst: PathLike, key: Optional[str] = None) -> bool:
+        """Move a file (os.rename, copying only across filesystems); returns False if already done"""
+        src_rel, dst_rel = self.rel(src), self.rel(dst)
+        key = key or f"move:{src_rel}"
+        if key in self.done:
+            return False
+        src_path, dst_path = self.abs(src_rel), self.abs(dst_rel)
+        if key in self.ops and not src_path.exists() and dst_path.exists():
+            # Interrupted after the rename, before it was marked done
+            self._append({'event': 'done', 'key': key})
+            return False
+        if not src_path.exists():
+            raise TransactionError(f"Source not found: {src_rel}")
+        if dst_path.exists():
+            raise TransactionError(f"Target exists: {dst_rel}")
+
+        # A retried move keeps the directories recorded by the first attempt
+        created_dirs = self.ops[key]['created_dirs'] if key in self.ops else self._missing_dirs(dst_path.parent)
+        self._append({'event': 'op', 'op': 'move', 'key': key, 'src': src_rel, 'dst': dst_rel,
+                      'created_dirs': created_dirs}, sync=True)
+        dst_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(src_path, dst_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(str(src_path), str(dst_path))
+        self._append({'event': 'done', 'key': key})
+        return True
+
+    def write(self, path: PathLike, content: str, key: Optional[str] = None,
+              meta: Optional[Dict[str, Any]] = None) -> bool:
+        """Write a file atomically, saving what it replaces; returns False if already done
+
+        `meta` is kept in the journal with the operation for the caller's use.
+        """
+        rel_path = self.rel(path)
+        key = key or f"write:{rel_path}"
+        if key in self.done:
+            return False
+        target = self.abs(rel_path)
+        data = content.encode('utf-8')
+        new_digest = _digest(data)
+
+        pending = self.ops.get(key)
+        if pending and target.exists() and _digest(target.read_bytes()) == pending['sha256']:
+            # Interrupted after the replace, before it was marked done
+            self._append({'event': 'done', 'key': key})
+            return False
+
+        if pending:
+            # Retry: keep the original backup, which holds the content before this transaction
+            record = dict(pending, sha256=new_digest, meta=meta)
+        else:
+            record = {'event': 'op', 'op': 'write', 'key': key, 'path': rel_path, 'sha256': new_digest,
+                      'backup': None, 'created_dirs': self._missing_dirs(target.parent), 'meta': meta}
+            if target.exists():
+                self.blobs.mkdir(parents=True, exist_ok=True)
+                # Named after the key, which is unique within the transaction
+                backup = self.blobs / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]}.orig"
+                shutil.copy2(target, backup)
+                record['backup'] = backup.name
+        self._append(record, sync=True)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Fixed temporary name: a retry after a crash overwrites any leftover
+        tmp = target.with_name(f".{target.name}.migrating")
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, target)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self._append({'event': 'done', 'key': key})
+        return True
+
+    # Undo
+
+    def operations(self) -> Iterator[Dict[str, Any]]:
+        """Journaled operations in the order they were started"""
+        seen = set()
+        for record in self.records:
+            if record['event'] == 'op' and record['key'] not in seen:
+                seen.add(record['key'])
+                yield self.ops[record['key']]
+
+    def rollback(self) -> List[str]:
+        """Undo every operation, newest first; returns messages for anything that could not be undone"""
+        problems = []
+        for op in reversed(list(self.operations())):
+            try:
+                if op['op'] == 'move':
+                    src, dst = self.abs(op['src']), self.abs(op['dst'])
+                    if dst.exists() and not src.exists():
+                        src.parent.mkdir(parents=True, exist_ok=True)
+                        os.rename(dst, src)
+                    elif not src.exists():
+                        problems.append(f"Cannot restore {op['src']}: {op['dst']} is missing")
+                elif op['op'] == 'write':
+                    target = self.abs(op['path'])
+                    if op['backup']:
+                        shutil.copy2(self.blobs / op['backup'], target)
+                    elif target.exists():
+                        target.unlink()
+                for directory in reversed(op.get('created_dirs') or []):
+                    try:
+                        self.abs(directory).rmdir()
+                    except OSError:
+                        pass  # Not empty: something else lives there now
+            except OSError as e:
+                problems.append(f"{op['key']}: {e}")
+        self._append({'event': 'rollback', 'time': time.time(), 'problems': problems}, sync=True)
+        self.close()
+        return problems
+
+    def summary(self) -> str:
+        moves = sum(1 for op in self.operations() if op['op'] == 'move')
+        writes = sum(1 for op in self.operations() if op['op'] == 'write')
+        return f"{self.id} [{self.status}] {moves} moves, {writes} writes"
@@ -3,6 +3,18 @@
 Git to BookStack Sync Tool
 Epic E.058 - Feature F.058.06: Automated documentation synchronization
 Syncs markdown documentation from Git to BookStack using the defined structure
+
+Pages edited in BookStack since they were last synced are detected from the
+sync manifest (docs/.bookstack-sync.json) or, without it, from the commit in
+the page's git-commit tag. --on-conflict chooses what happens to them; the
+default, overwrite, is the behaviour from before detection existed.
+
+--export lists only pages BookStack reports as updated since the newest
+page seen by the last complete export; --full-export lists every page.
+
+The manifest and .bookstack-conflicts/ (merge artifacts for conflicting
+pages) are local state of one checkout and one BookStack instance, and are
+git-ignored rather than committed.
 """
 
 import os
@@ -12,13 +24,19 @@ import json
 import re
 import requests
 import hashlib
+import stat
+import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
 import logging
 
+from mosaic_docs.corpus import Document, split_frontmatter
+from mosaic_docs.structure import Shelf, Book, Chapter, Page, load_structure
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -40,7 +58,10 @@ class BookStackEntity:
 class BookStackAPI:
     """BookStack API client for managing documentation"""
     
-    def __init__(self, base_url: str, token_id: str, token_secret: str):
+    # BookStack caps list endpoints at 500 items per request
+    LIST_PAGE_SIZE = 500
+    
+    def __init__(self, base_url: str, token_id: str, token_secret: str, pool_size: int = 10):
         self.base_url = base_url.rstrip('/')
         self.headers = {
             'Authorization': f"Token {token_id}:{token_secret}",
@@ -48,13 +69,18 @@ class BookStackAPI:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Size the connection pool for concurrent exports
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
-    def _request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict:
+    def _request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                 params: Optional[Dict] = None) -> Dict:
         """Make API request with error handling"""
         url = f"{self.base_url}/api/{endpoint}"
         
         try:
-            response = self.session.request(method, url, json=data)
+            response = self.session.request(method, url, json=data, params=params)
             response.raise_for_status()
             return response.json() if response.text else {}
         except requests.exceptions.HTTPError as e:
@@ -65,10 +91,33 @@ class BookStackAPI:
             logger.error(f"Request failed: {e}")
             raise
     
+    def list_all(self, endpoint: str, filters: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """List every entity of a type, following BookStack pagination"""
+        items = []
+        offset = 0
+        while True:
+            params = {
+                'count': self.LIST_PAGE_SIZE,
+                'offset': offset,
+                'sort': '+id'
+            }
+            for field, value in (filters or {}).items():
+                params[f'filter[{field}]'] = value
+            result = self._request('GET', endpoint, params=params)
+            batch = result.get('data', [])
+            items.extend(batch)
+            offset += len(batch)
+            if not batch or offset >= result.get('total', 0):
+                return items
+    
     def get_shelves(self) -> List[Dict]:
         """Get all shelves"""
         return self._request('GET', 'shelves')['data']
     
+    def get_shelf(self, shelf_id: int) -> Dict:
+        """Get a shelf including its books"""
+        return self._request('GET', f'shelves/{shelf_id}')
+    
     def create_shelf(self, name: str, description: str = "") -> Dict:
         """Create a new shelf"""
         data = {
@@ -171,6 +220,21 @@ class BookStackAPI:
         }
         return self._request('PUT', f'pages/{page_id}', data)
     
+    def get_book_pages(self, book_id: int) -> List[Dict]:
+        """List page metadata (updated_at, revision_count) for a whole book in bulk"""
+        return self.list_all('pages', filters={'book_id': book_id})
+    
+    def get_page(self, page_id: int) -> Dict:
+        """Get a page including its markdown and tags"""
+        return self._request('GET', f'pages/{page_id}')
+    
+    def export_page_markdown(self, page_id: int) -> str:
+        """Export a page as markdown (used for pages edited in the WYSIWYG editor)"""
+        url = f"{self.base_url}/api/pages/{page_id}/export/markdown"
+        response = self.session.get(url)
+        response.raise_for_status()
+        return response.text
+    
     def get_page_by_slug(self, chapter_id: int, slug: str) -> Optional[Dict]:
         """Get page by slug within a chapter"""
         pages = self.get_pages(chapter_id)
@@ -179,28 +243,121 @@ class BookStackAPI:
                 return page
         return None
 
+# Read once at import (os.umask can only be read by setting it) for the mode of new files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def atomic_write_text(path: Path, content: str) -> None:
+    """Write a file via a temp file and rename so readers never see partial content
+    
+    The file keeps the mode of the file it replaces; a new file gets the
+    usual 0666 less umask rather than mkstemp's owner-only 0600.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+class SyncManifest:
+    """Tracks which BookStack page backs each docs file and the remote state last seen"""
+    
+    FILENAME = '.bookstack-sync.json'
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        # Newest updated_at seen by the last complete export, as BookStack reported it
+        self.export_watermark: Optional[str] = None
+        self._by_id: Dict[int, str] = {}
+    
+    def load(self) -> None:
+        """Load the manifest if one exists"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.pages = data.get('pages', {})
+        self.export_watermark = data.get('export_watermark')
+        self._by_id = {entry['page_id']: rel_path for rel_path, entry in self.pages.items()}
+    
+    def save(self) -> None:
+        """Persist the manifest atomically"""
+        data = {
+            'export_watermark': self.export_watermark,
+            'pages': self.pages
+        }
+        atomic_write_text(self.path, json.dumps(data, indent=2, sort_keys=True) + '\n')
+    
+    def get(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest entry for a docs file"""
+        return self.pages.get(rel_path)
+    
+    def path_for_page(self, page_id: int) -> Optional[str]:
+        """Get the docs file previously associated with a BookStack page"""
+        return self._by_id.get(page_id)
+    
+    def record(self, rel_path: str, page: Dict, markdown: str, git_commit: Optional[str] = None) -> None:
+        """Record the remote state of a page after it was pushed or pulled"""
+        self.pages[rel_path] = {
+            'page_id': page['id'],
+            'updated_at': page.get('updated_at'),
+            'revision_count': page.get('revision_count'),
+            'content_hash': hashlib.sha256(markdown.strip().encode('utf-8')).hexdigest(),
+            'git_commit': git_commit
+        }
+        self._by_id[page['id']] = rel_path
+    
+    def is_remote_modified(self, rel_path: str, remote_page: Dict) -> bool:
+        """Check whether a page changed in BookStack since it was last synced"""
+        entry = self.pages.get(rel_path)
+        if not entry or entry['page_id'] != remote_page.get('id'):
+            return False
+        if entry.get('updated_at') != remote_page.get('updated_at'):
+            return True
+        revisions = remote_page.get('revision_count')
+        return revisions is not None and entry.get('revision_count') not in (None, revisions)
+
 class GitToBookStackSync:
     """Main sync orchestrator"""
     
-    def __init__(self, structure_file: str, docs_root: str, api_client: BookStackAPI):
+    # How to handle pages edited in BookStack since the last sync
+    CONFLICT_MODES = ('skip', 'fail', 'merge', 'overwrite')
+    CONFLICTS_DIR = '.bookstack-conflicts'
+    
+    def __init__(self, structure_file: str, docs_root: str, api_client: BookStackAPI,
+                 on_conflict: str = 'overwrite'):
         self.structure_file = structure_file
         self.docs_root = Path(docs_root)
         self.api = api_client
+        self.on_conflict = on_conflict
         self.structure = None
+        self.manifest = SyncManifest(self.docs_root / SyncManifest.FILENAME)
+        self.remote_pages: Dict[int, Dict] = {}
+        self.git_commit = 'unknown'
         self.stats = {
             'shelves_created': 0,
             'books_created': 0,
             'chapters_created': 0,
             'pages_created': 0,
             'pages_updated': 0,
+            'conflicts': 0,
             'errors': 0
         }
         
     def load_structure(self) -> bool:
         """Load the BookStack structure definition"""
         try:
-            with open(self.structure_file, 'r') as f:
-                self.structure = yaml.safe_load(f)
+            self.structure = load_structure(self.structure_file)
             logger.info(f"Loaded structure definition from {self.structure_file}")
             return True
         except Exception as e:
@@ -215,10 +372,15 @@ class GitToBookStackSync:
         logger.info("Starting Git to BookStack sync...")
         logger.info(f"Dry run: {dry_run}")
         
+        loaded = False
         try:
+            self.manifest.load()
+            loaded = True
+            self.git_commit = self._get_git_commit_hash()
+            
             # Sync each shelf
-            for shelf_config in self.structure['structure']:
-                self._sync_shelf(shelf_config['shelf'], dry_run)
+            for shelf in self.structure.shelves:
+                self._sync_shelf(shelf, dry_run)
             
             # Report results
             self._report_stats()
@@ -227,11 +389,17 @@ class GitToBookStackSync:
         except Exception as e:
             logger.error(f"Sync failed: {e}")
             return False
+        
+        finally:
+            # Record the pages pushed so far even when the run is interrupted, or the next
+            # run would take its own pushes for edits made in the BookStack UI
+            if loaded and not dry_run:
+                self.manifest.save()
     
-    def _sync_shelf(self, shelf_config: Dict, dry_run: bool) -> Optional[int]:
+    def _sync_shelf(self, shelf_node: Shelf, dry_run: bool) -> Optional[int]:
         """Sync a shelf and its contents"""
-        shelf_name = shelf_config['name']
-        shelf_slug = shelf_config['slug']
+        shelf_name = shelf_node.name
+        shelf_slug = shelf_node.slug
         
         logger.info(f"Syncing shelf: {shelf_name}")
         
@@ -247,22 +415,22 @@ class GitToBookStackSync:
             else:
                 shelf = self.api.create_shelf(
                     shelf_name,
-                    shelf_config.get('description', '')
+                    shelf_node.description
                 )
                 shelf_id = shelf['id']
                 self.stats['shelves_created'] += 1
                 logger.info(f"Created shelf: {shelf_name} (ID: {shelf_id})")
         
         # Sync books in this shelf
-        for book_config in shelf_config.get('books', []):
-            self._sync_book(book_config['book'], shelf_id, shelf_slug, dry_run)
+        for book_node in shelf_node.books:
+            self._sync_book(book_node, shelf_id, dry_run)
         
         return shelf_id
     
-    def _sync_book(self, book_config: Dict, shelf_id: Optional[int], shelf_slug: str, dry_run: bool) -> Optional[int]:
+    def _sync_book(self, book_node: Book, shelf_id: Optional[int], dry_run: bool) -> Optional[int]:
         """Sync a book and its contents"""
-        book_name = book_config['name']
-        book_slug = book_config['slug']
+        book_name = book_node.name
+        book_slug = book_node.slug
         
         logger.info(f"  Syncing book: {book_name}")
         
@@ -278,7 +446,7 @@ class GitToBookStackSync:
             else:
                 book = self.api.create_book(
                     book_name,
-                    book_config.get('description', ''),
+                    book_node.description,
                     shelf_id
                 )
                 book_id = book['id']
@@ -288,17 +456,22 @@ class GitToBookStackSync:
                 # Attach to shelf
                 if shelf_id:
                     self.api.attach_book_to_shelf(book_id, shelf_id)
+            
+            # One listing per book gives the remote state of every page for conflict detection
+            if self.on_conflict != 'overwrite':
+                for remote_page in self.api.get_book_pages(book_id):
+                    self.remote_pages[remote_page['id']] = remote_page
         
         # Sync chapters in this book
-        for chapter_config in book_config.get('chapters', []):
-            self._sync_chapter(chapter_config['chapter'], book_id, shelf_slug, book_slug, dry_run)
+        for chapter_node in book_node.chapters:
+            self._sync_chapter(chapter_node, book_id, dry_run)
         
         return book_id
     
-    def _sync_chapter(self, chapter_config: Dict, book_id: Optional[int], shelf_slug: str, book_slug: str, dry_run: bool) -> Optional[int]:
+    def _sync_chapter(self, chapter_node: Chapter, book_id: Optional[int], dry_run: bool) -> Optional[int]:
         """Sync a chapter and its pages"""
-        chapter_name = chapter_config['name']
-        chapter_slug = chapter_config['slug']
+        chapter_name = chapter_node.name
+        chapter_slug = chapter_node.slug
         
         logger.info(f"    Syncing chapter: {chapter_name}")
         
@@ -326,15 +499,15 @@ class GitToBookStackSync:
                 logger.info(f"    Created chapter: {chapter_name} (ID: {chapter_id})")
         
         # Sync pages in this chapter
-        for page_slug in chapter_config.get('pages', []):
-            self._sync_page(page_slug, chapter_id, shelf_slug, book_slug, chapter_slug, dry_run)
+        for page_node in chapter_node.pages:
+            self._sync_page(page_node, chapter_id, dry_run)
         
         return chapter_id
     
-    def _sync_page(self, page_slug: str, chapter_id: Optional[int], shelf_slug: str, book_slug: str, chapter_slug: str, dry_run: bool):
+    def _sync_page(self, page_node: Page, chapter_id: Optional[int], dry_run: bool):
         """Sync a single page"""
-        # Construct file path
-        page_path = self.docs_root / shelf_slug / book_slug / chapter_slug / f"{page_slug}.md"
+        page_slug = page_node.slug
+        page_path = self.docs_root / page_node.file_path
         
         if not page_path.exists():
             logger.warning(f"      Page file not found: {page_path}")
@@ -364,7 +537,7 @@ class GitToBookStackSync:
             })
             tags.append({
                 'name': 'git-commit',
-                'value': self._get_git_commit_hash()
+                'value': self.git_commit
             })
             
             logger.info(f"      Syncing page: {page_name}")
@@ -377,35 +550,123 @@ class GitToBookStackSync:
                     return
                     
                 # Get or create page
+                rel_path = page_node.file_path
                 page = self.api.get_page_by_slug(chapter_id, page_slug)
                 if page:
+                    if self.on_conflict != 'overwrite' and self._is_remote_modified(rel_path, page):
+                        self._handle_conflict(rel_path, page['id'], markdown)
+                        return
+                    
                     # Update existing page
-                    self.api.update_page(page['id'], page_name, markdown, tags)
+                    result = self.api.update_page(page['id'], page_name, markdown, tags)
                     self.stats['pages_updated'] += 1
                     logger.info(f"      Updated page: {page_name}")
                 else:
                     # Create new page
-                    self.api.create_page(chapter_id, page_name, markdown, tags)
+                    result = self.api.create_page(chapter_id, page_name, markdown, tags)
                     self.stats['pages_created'] += 1
                     logger.info(f"      Created page: {page_name}")
+                
+                # Remember the remote state so exports and later syncs can diff against it
+                self.manifest.record(rel_path, result, markdown, self.git_commit)
                     
         except Exception as e:
             logger.error(f"      Failed to sync page {page_path}: {e}")
             self.stats['errors'] += 1
     
+    def _is_remote_modified(self, rel_path: str, page: Dict) -> bool:
+        """Check whether a page was edited in BookStack since Git last synced it
+        
+        The manifest answers from the remote state recorded at the last sync.
+        Without an entry (a fresh checkout, as in CI, where the manifest is not
+        kept) the page's git-commit tag names the commit last synced: the page
+        was edited if its markdown no longer matches the file at that commit.
+        """
+        entry = self.manifest.get(rel_path)
+        if entry and entry['page_id'] == page['id']:
+            return self.manifest.is_remote_modified(rel_path, self.remote_pages.get(page['id'], page))
+        
+        detail = self.api.get_page(page['id'])
+        commit = self._tag_value(detail, 'git-commit')
+        base = self._synced_markdown(rel_path, commit)
+        if base is None:
+            logger.warning(f"      Cannot check {rel_path} for BookStack edits: "
+                           f"no manifest entry and commit {commit or '(none)'} is not available")
+            return False
+        remote = (detail.get('markdown') or '').replace('\r\n', '\n')
+        return remote.strip() != base.strip()
+    
+    @staticmethod
+    def _tag_value(page: Dict, name: str) -> Optional[str]:
+        """Value of a page tag, from a page detail response"""
+        return next((tag.get('value') for tag in page.get('tags') or [] if tag.get('name') == name), None)
+    
+    def _synced_markdown(self, rel_path: str, commit: Optional[str]) -> Optional[str]:
+        """The page body of a docs file as of a commit, or None when the commit is unknown here"""
+        import subprocess
+        
+        if not commit or commit == 'unknown':
+            return None
+        result = subprocess.run(
+            ['git', 'show', f"{commit}:./{rel_path}"],
+            capture_output=True,
+            text=True,
+            cwd=self.docs_root
+        )
+        if result.returncode != 0:
+            return None
+        return self._parse_markdown(result.stdout)[1]
+    
+    def _handle_conflict(self, rel_path: str, page_id: int, markdown: str):
+        """Deal with a page that was edited in BookStack after the last sync"""
+        self.stats['conflicts'] += 1
+        
+        if self.on_conflict == 'fail':
+            logger.error(f"      Conflict: {rel_path} was edited in BookStack since the last sync")
+            self.stats['errors'] += 1
+        elif self.on_conflict == 'merge':
+            artifact = self._write_merge_artifact(rel_path, page_id, markdown)
+            logger.warning(f"      Conflict: {rel_path} edited in BookStack, merge written to {artifact}")
+        else:
+            logger.warning(f"      Conflict: {rel_path} edited in BookStack since the last sync, skipping")
+    
+    def _write_merge_artifact(self, rel_path: str, page_id: int, markdown: str) -> Path:
+        """Write a three-way merge of the last synced, local and BookStack versions"""
+        import subprocess
+        
+        detail = self.api.get_page(page_id)
+        remote = detail.get('markdown') or self.api.export_page_markdown(page_id)
+        
+        # The base is the page body as of the commit that was last synced
+        entry = self.manifest.get(rel_path) or {}
+        commit = entry.get('git_commit') or self._tag_value(detail, 'git-commit')
+        base = self._synced_markdown(rel_path, commit) or ''
+        
+        artifact = self.docs_root / self.CONFLICTS_DIR / rel_path
+        artifact.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            versions = []
+            for name, text in (('git', markdown), ('last-sync', base), ('bookstack', remote)):
+                version_path = Path(tmp) / name
+                version_path.write_text(text.strip() + '\n', encoding='utf-8')
+                versions.append(str(version_path))
+            result = subprocess.run(
+                ['git', 'merge-file', '-p', '--diff3',
+                 '-L', 'git', '-L', 'last-sync', '-L', 'bookstack'] + versions,
+                capture_output=True,
+                text=True
+            )
+        atomic_write_text(artifact, result.stdout)
+        return artifact
+    
     def _parse_markdown(self, content: str) -> Tuple[Optional[Dict], str]:
         """Parse frontmatter and content from markdown"""
-        if not content.startswith('---'):
-            return None, content
-        
-        parts = content.split('---', 2)
-        if len(parts) < 3:
+        raw, markdown = split_frontmatter(content)
+        if raw is None:
             return None, content
         
         try:
-            frontmatter = yaml.safe_load(parts[1])
-            markdown = parts[2].strip()
-            return frontmatter, markdown
+            return yaml.safe_load(raw), markdown
         except yaml.YAMLError:
             return None, content
     
@@ -435,9 +696,276 @@ class GitToBookStackSync:
         logger.info(f"Chapters created: {self.stats['chapters_created']}")
         logger.info(f"Pages created:    {self.stats['pages_created']}")
         logger.info(f"Pages updated:    {self.stats['pages_updated']}")
+        logger.info(f"Conflicts:        {self.stats['conflicts']}")
         logger.info(f"Errors:           {self.stats['errors']}")
         logger.info("======================")
 
+class BookStackToGitExport:
+    """Exports pages edited in BookStack back into the Git documentation tree"""
+    
+    # Tags added by the Git -> BookStack sync that must not round-trip into frontmatter
+    SYNC_TAGS = {'git-sync', 'git-commit'}
+    
+    def __init__(self, structure_file: str, docs_root: str, api_client: BookStackAPI, max_workers: int = 8):
+        self.structure_file = structure_file
+        self.docs_root = Path(docs_root)
+        self.api = api_client
+        self.max_workers = max_workers
+        self.structure = None
+        self.manifest = SyncManifest(self.docs_root / SyncManifest.FILENAME)
+        self.stats = {
+            'pages_listed': 0,
+            'pages_downloaded': 0,
+            'pages_written': 0,
+            'pages_unchanged': 0,
+            'pages_skipped': 0,
+            'errors': 0
+        }
+    
+    def load_structure(self) -> bool:
+        """Load the BookStack structure definition"""
+        try:
+            self.structure = load_structure(self.structure_file)
+            logger.info(f"Loaded structure definition from {self.structure_file}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load structure: {e}")
+            return False
+    
+    def export(self, dry_run: bool = False, full: bool = False) -> bool:
+        """Main export entry point
+
+        Only pages updated since the manifest's watermark are listed, unless
+        full is set or a file the manifest knows has gone missing locally.
+        """
+        if not self.load_structure():
+            return False
+        
+        logger.info("Starting BookStack to Git export...")
+        logger.info(f"Dry run: {dry_run}")
+        
+        loaded = completed = False
+        try:
+            self.manifest.load()
+            loaded = True
+            
+            since = None if full else self.manifest.export_watermark
+            if since and self._missing_files():
+                logger.info("Files from the last export are missing locally; listing every page")
+                since = None
+            changed, watermark = self._find_changed_pages(since)
+            logger.info(f"{len(changed)} of {self.stats['pages_listed']} pages changed since last export")
+            
+            # Page bodies are only available per page, so fetch them concurrently
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    pool.submit(self._fetch_page, page['id']): rel_path
+                    for page, rel_path in changed
+                }
+                for future in as_completed(futures):
+                    rel_path = futures[future]
+                    try:
+                        detail, markdown = future.result()
+                        self.stats['pages_downloaded'] += 1
+                        self._export_page(detail, markdown, rel_path, dry_run)
+                    except Exception as e:
+                        logger.error(f"Failed to export page {rel_path}: {e}")
+                        self.stats['errors'] += 1
+            
+            completed = True
+            
+            self._report_stats()
+            return self.stats['errors'] == 0
+            
+        except Exception as e:
+            logger.error(f"Export failed: {e}")
+            return False
+        
+        finally:
+            # Pages already written are recorded either way; only a clean run moves the watermark,
+            # so pages that failed are listed again next time
+            if loaded and not dry_run:
+                if completed and self.stats['errors'] == 0 and watermark:
+                    self.manifest.export_watermark = watermark
+                self.manifest.save()
+    
+    def _missing_files(self) -> bool:
+        """Whether a file recorded in the manifest no longer exists (an incremental listing would skip it)"""
+        return any(not (self.docs_root / rel_path).exists() for rel_path in self.manifest.pages)
+    
+    @staticmethod
+    def _updated_at(value: str) -> datetime:
+        """Parse a BookStack timestamp such as 2024-05-01T12:30:00.000000Z"""
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return moment.astimezone(timezone.utc) if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    
+    def _find_changed_pages(self, since: Optional[str] = None) -> Tuple[List[Tuple[Dict, str]], Optional[str]]:
+        """List remote entities and select pages whose updated_at differs from the manifest
+        
+        With since, only pages updated at or after it are listed. Returns the
+        changed pages and the newest updated_at among those listed.
+        """
+        shelf_slugs, book_slugs, chapter_slugs, chapter_pages = self._structure_slugs()
+        
+        # Map each remote book to the local shelf directory it belongs to
+        book_shelf: Dict[int, str] = {}
+        for shelf in self.api.list_all('shelves'):
+            local_shelf = shelf_slugs.get(shelf['slug']) or shelf_slugs.get(shelf['name'].lower(), shelf['slug'])
+            for book in self.api.get_shelf(shelf['id']).get('books', []):
+                book_shelf[book['id']] = local_shelf
+        
+        books: Dict[int, Tuple[str, str]] = {}
+        for book in self.api.list_all('books'):
+            if book['id'] not in book_shelf:
+                continue
+            shelf = book_shelf[book['id']]
+            local_book = book_slugs.get((shelf, book['slug'])) or book_slugs.get((shelf, book['name'].lower()), book['slug'])
+            books[book['id']] = (shelf, local_book)
+        
+        chapters: Dict[int, Tuple[str, str, str]] = {}
+        for chapter in self.api.list_all('chapters'):
+            if chapter['book_id'] not in books:
+                continue
+            shelf, book = books[chapter['book_id']]
+            local_chapter = chapter_slugs.get((shelf, book, chapter['slug'])) or \
+                chapter_slugs.get((shelf, book, chapter['name'].lower()), chapter['slug'])
+            chapters[chapter['id']] = (shelf, book, local_chapter)
+        
+        filters = None
+        if since:
+            # List filters compare with the database column, which holds UTC to the second
+            filters = {'updated_at:gte': self._updated_at(since).strftime('%Y-%m-%d %H:%M:%S')}
+        
+        changed = []
+        watermark = since
+        next_number: Dict[Tuple[str, str, str], int] = {}
+        for page in self.api.list_all('pages', filters=filters):
+            self.stats['pages_listed'] += 1
+            if page.get('updated_at') and (watermark is None or
+                                           self._updated_at(page['updated_at']) > self._updated_at(watermark)):
+                watermark = page['updated_at']
+            if page.get('draft') or page.get('template') or page.get('chapter_id') not in chapters:
+                # Only chapter pages map onto the shelf/book/chapter/page hierarchy
+                self.stats['pages_skipped'] += 1
+                continue
+            
+            rel_path = self.manifest.path_for_page(page['id'])
+            if rel_path is None:
+                chapter_key = chapters[page['chapter_id']]
+                known_pages = chapter_pages.get(chapter_key, [])
+                page_slug = next((slug for slug in known_pages
+                                  if re.sub(r'^\d{2}-', '', slug) == page['slug']), None)
+                if page_slug is None:
+                    number = next_number.get(chapter_key, len(known_pages)) + 1
+                    next_number[chapter_key] = number
+                    page_slug = f"{number:02d}-{page['slug']}"
+                rel_path = '/'.join(chapter_key + (f"{page_slug}.md",))
+            
+            entry = self.manifest.get(rel_path)
+            if entry and entry.get('updated_at') == page.get('updated_at') and \
+                    (self.docs_root / rel_path).exists():
+                self.stats['pages_unchanged'] += 1
+                continue
+            
+            changed.append((page, rel_path))
+        
+        return changed, watermark
+    
+    def _structure_slugs(self) -> Tuple[Dict, Dict, Dict, Dict]:
+        """Index local slugs by remote slug or lower-cased name"""
+        shelf_slugs: Dict[str, str] = {}
+        book_slugs: Dict[Tuple[str, str], str] = {}
+        chapter_slugs: Dict[Tuple[str, str, str], str] = {}
+        chapter_pages: Dict[Tuple[str, str, str], List[str]] = {}
+        
+        for shelf in self.structure.shelves:
+            shelf_slugs[shelf.slug] = shelf.slug
+            shelf_slugs[shelf.name.lower()] = shelf.slug
+            
+            for book in shelf.books:
+                book_slugs[(shelf.slug, book.slug)] = book.slug
+                book_slugs[(shelf.slug, book.name.lower())] = book.slug
+                
+                for chapter in book.chapters:
+                    key = (shelf.slug, book.slug)
+                    chapter_slugs[key + (chapter.slug,)] = chapter.slug
+                    chapter_slugs[key + (chapter.name.lower(),)] = chapter.slug
+                    chapter_pages[key + (chapter.slug,)] = [page.slug for page in chapter.pages]
+        
+        return shelf_slugs, book_slugs, chapter_slugs, chapter_pages
+    
+    def _fetch_page(self, page_id: int) -> Tuple[Dict, str]:
+        """Download a page; WYSIWYG-edited pages have no markdown source and are exported instead"""
+        detail = self.api.get_page(page_id)
+        markdown = detail.get('markdown') or self.api.export_page_markdown(page_id)
+        return detail, markdown
+    
+    def _export_page(self, detail: Dict, markdown: str, rel_path: str, dry_run: bool):
+        """Write a page to disk, leaving the file untouched when nothing changed"""
+        page_path = self.docs_root / rel_path
+        content = self._render_page(detail, markdown, page_path)
+        
+        if content is None:
+            self.stats['pages_unchanged'] += 1
+        elif dry_run:
+            logger.info(f"[DRY RUN] Would write page: {rel_path}")
+            self.stats['pages_written'] += 1
+        else:
+            atomic_write_text(page_path, content)
+            self.stats['pages_written'] += 1
+            logger.info(f"Exported page: {rel_path}")
+        
+        if not dry_run:
+            self.manifest.record(rel_path, detail, markdown)
+    
+    def _render_page(self, detail: Dict, markdown: str, page_path: Path) -> Optional[str]:
+        """Render a page with frontmatter, or None if the local file is already current"""
+        existing = None
+        frontmatter: Dict[str, Any] = {}
+        body = ''
+        if page_path.exists():
+            doc = Document(page_path, page_path.name)
+            existing = doc.text
+            if doc.has_frontmatter_block:
+                frontmatter = doc.frontmatter if isinstance(doc.frontmatter, dict) else {}
+                body = doc.body
+        
+        tags = [tag['name'] for tag in detail.get('tags', []) if tag['name'] not in self.SYNC_TAGS]
+        
+        if frontmatter and body.strip() == markdown.strip() and \
+                frontmatter.get('title') == detail['name'] and list(frontmatter.get('tags') or []) == tags:
+            return None
+        
+        if not frontmatter:
+            page_slug = page_path.stem
+            frontmatter = {
+                'title': detail['name'],
+                'order': int(page_slug[:2]) if page_slug[:2].isdigit() else 1,
+                'category': page_path.parent.name,
+                'tags': tags,
+                'last_updated': '',
+                'author': 'bookstack'
+            }
+        
+        frontmatter['title'] = detail['name']
+        frontmatter['tags'] = tags
+        frontmatter['last_updated'] = str(detail.get('updated_at', ''))[:10]
+        
+        content = "---\n" + yaml.safe_dump(frontmatter, sort_keys=False, allow_unicode=True) + \
+                  "---\n\n" + markdown.strip() + "\n"
+        return None if content == existing else content
+    
+    def _report_stats(self):
+        """Report export statistics"""
+        logger.info("\n=== Export Statistics ===")
+        logger.info(f"Pages listed:     {self.stats['pages_listed']}")
+        logger.info(f"Pages downloaded: {self.stats['pages_downloaded']}")
+        logger.info(f"Pages written:    {self.stats['pages_written']}")
+        logger.info(f"Pages unchanged:  {self.stats['pages_unchanged']}")
+        logger.info(f"Pages skipped:    {self.stats['pages_skipped']}")
+        logger.info(f"Errors:           {self.stats['errors']}")
+        logger.info("========================")
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -472,6 +1000,30 @@ def main():
         action='store_true',
         help='Perform dry run without making changes'
     )
+    parser.add_argument(
+        '--on-conflict',
+        choices=GitToBookStackSync.CONFLICT_MODES,
+        default='overwrite',
+        help='What to do with pages edited in BookStack since the last sync '
+             '(default: overwrite, as before conflict detection existed)'
+    )
+    parser.add_argument(
+        '--export',
+        action='store_true',
+        help='Export pages changed in BookStack back into docs_root'
+    )
+    parser.add_argument(
+        '--full-export',
+        action='store_true',
+        help='With --export, list every page rather than those updated since the last export '
+             '(e.g. after shelving a book or changing the structure)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Concurrent page downloads for --export'
+    )
     parser.add_argument(
         '--validate-only',
         action='store_true',
@@ -496,10 +1048,15 @@ def main():
         sys.exit(0 if success else 1)
     
     # Create API client
-    api_client = BookStackAPI(args.url, args.token_id, args.token_secret)
+    api_client = BookStackAPI(args.url, args.token_id, args.token_secret, pool_size=args.workers)
+    
+    if args.export:
+        export = BookStackToGitExport(args.structure, args.docs_root, api_client, max_workers=args.workers)
+        success = export.export(dry_run=args.dry_run, full=args.full_export)
+        sys.exit(0 if success else 1)
     
     # Create and run sync
-    sync = GitToBookStackSync(args.structure, args.docs_root, api_client)
+    sync = GitToBookStackSync(args.structure, args.docs_root, api_client, on_conflict=args.on_conflict)
     success = sync.sync(dry_run=args.dry_run)
     
     sys.exit(0 if success else 1)
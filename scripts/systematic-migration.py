@@ -4,332 +4,460 @@ Systematic documentation migration with progress tracking
 Processes files from _old to new structure with zero data loss
 """
 
+import hashlib
+import json
 import os
-import re
 import shutil
+import sys
 import yaml
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Tuple, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Optional
+
+from mosaic_docs.classifier import load_classifier
+from mosaic_docs.corpus import DocCorpus, split_frontmatter
+from mosaic_docs.fingerprints import ParagraphIndex
+from mosaic_docs.migration_state import MigrationState
+from mosaic_docs.overlay import DryRunOverlay
+from mosaic_docs.transaction import MigrationTransaction, TransactionError
+
+def _digest(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+@dataclass
+class DestinationResult:
+    """What processing one destination produced, merged into the migrator on the main thread"""
+    group: Dict[str, Any]
+    # Files processed (moved, or skipped for want of a destination)
+    count: int = 0
+    processed: List[str] = field(default_factory=list)
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+    states: List[Tuple[str, Optional[str], str, Optional[str]]] = field(default_factory=list)
+    # Output, printed in one piece so concurrent destinations do not interleave
+    lines: List[str] = field(default_factory=list)
+    
+    def error(self, rel_path: str, error: Exception):
+        self.lines.append(f"  ❌ Error: {rel_path}: {error}")
+        self.errors.append((rel_path, str(error)))
+        self.states.append((rel_path, None, "ERROR", str(error)))
 
 class DocumentMigrator:
-    def __init__(self):
+    def __init__(self, dry_run: bool = False, dedupe: bool = True):
         self.old_docs = Path("docs/_old")
         self.new_docs = Path("docs")
         self.moved_docs = Path("docs/_old/_moved")
         self.scratchpad = Path("docs/MIGRATION-SCRATCHPAD.md")
         self.processed = set()
         self.errors = []
+        self.transaction: Optional[MigrationTransaction] = None
+        # Path and content rules live in mosaic_docs/classifiers.yaml
+        self.classifier = load_classifier('systematic-migration')
+        # Destination groups in the order processed, with content digests (see save_plan)
+        self.plan_groups: List[Dict[str, Any]] = []
+        # Leave out paragraphs and sections a page already has when appending to it
+        self.dedupe = dedupe
         
-        # Create _moved directory
-        self.moved_docs.mkdir(parents=True, exist_ok=True)
+        # A dry run works on an in-memory overlay of the tree and records state in memory
+        self.dry_run = dry_run
+        self.planned_states: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        if dry_run:
+            self.transaction = DryRunOverlay(self.new_docs)
+        else:
+            # Create _moved directory
+            self.moved_docs.mkdir(parents=True, exist_ok=True)
         
         # Load processing state
         self.load_state()
         
     def load_state(self):
-        """Load processing state from scratchpad"""
-        if self.scratchpad.exists():
-            content = self.scratchpad.read_text()
-            # Extract processed files from log
-            log_section = content.split("## Processing Log")[-1]
-            for line in log_section.strip().split('\n'):
-                if ' → ' in line and '[SUCCESS]' in line:
-                    file_match = re.search(r'\[([^\]]+)\]', line)
-                    if file_match:
-                        self.processed.add(file_match.group(1))
+        """Load processing state from the state store"""
+        if self.dry_run:
+            # Work on an in-memory copy: a dry run creates nothing under docs/
+            self.state = MigrationState.snapshot(self.new_docs)
+        else:
+            self.state = MigrationState(self.new_docs)
+        if self.state.is_empty() and self.scratchpad.exists():
+            # Scratchpad from before the store existed: its log is the state
+            count = self.state.import_scratchpad(self.scratchpad)
+            print(f"Imported {count} entries from {self.scratchpad}")
+        self.processed = self.state.processed()
     
-    def save_state(self, file_path: str, destination: str, status: str):
-        """Update scratchpad with processing status"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] [{file_path}] → [{destination}] [{status}]\n"
-        
-        # Append to scratchpad
-        with open(self.scratchpad, 'a') as f:
-            f.write(log_entry)
+    def save_state(self, file_path: str, destination: Optional[str], status: str, message: Optional[str] = None):
+        """Record processing status (the scratchpad is regenerated at the end of a run)"""
+        self.record_states([(file_path, destination, status, message)])
+    
+    def record_states(self, entries: List[Tuple[str, Optional[str], str, Optional[str]]]):
+        if self.dry_run:
+            self.planned_states.extend(entries)
+        else:
+            self.state.record_many(entries)
+    
+    def write_scratchpad(self):
+        self.scratchpad.parent.mkdir(parents=True, exist_ok=True)
+        self.state.render_scratchpad(self.scratchpad)
     
     def determine_destination(self, file_path: Path, content: str) -> Optional[str]:
         """Determine best destination for a file based on path and content"""
         rel_path = file_path.relative_to(self.old_docs)
-        path_str = str(rel_path).lower()
-        content_lower = content.lower()
-        
-        # Engineering Documentation
-        if any(x in path_str for x in ['ci-cd', 'cicd', 'pipeline']):
-            if 'template' in path_str:
-                return "engineering/cicd-handbook/pipeline-setup/03-pipeline-templates.md"
-            elif 'troubleshoot' in path_str:
-                return "engineering/cicd-handbook/best-practices/03-troubleshooting.md"
-            elif 'best' in path_str or 'practice' in path_str:
-                return "engineering/cicd-handbook/best-practices/01-cicd-patterns.md"
-            elif 'workflow' in path_str:
-                return "engineering/cicd-handbook/advanced-pipelines/02-conditional-workflows.md"
-            else:
-                return "engineering/cicd-handbook/pipeline-setup/02-pipeline-basics.md"
-        
-        elif any(x in path_str for x in ['development', 'dev-guide']):
-            if 'git' in path_str or 'workflow' in path_str:
-                return "engineering/getting-started/development-workflow/01-git-workflow.md"
-            elif 'branch' in path_str:
-                return "engineering/getting-started/development-workflow/02-branch-protection.md"
-            elif 'quick' in path_str or 'start' in path_str:
-                return "engineering/getting-started/quick-start/01-first-project.md"
-            elif 'isolated' in path_str or 'environment' in path_str:
-                return "engineering/getting-started/quick-start/03-isolated-environment.md"
-            elif 'worktree' in path_str:
-                return "engineering/getting-started/development-workflow/01-git-workflow.md"
-            else:
-                return "engineering/getting-started/prerequisites/01-system-requirements.md"
-        
-        elif 'api' in path_str:
-            return "engineering/api-documentation/rest-apis/01-api-overview.md"
-        
-        elif 'mcp' in path_str:
-            if 'integration' in path_str or 'strategy' in path_str:
-                return "engineering/api-documentation/mcp-protocol/02-mcp-integration.md"
-            elif 'migration' in path_str or '2.7' in path_str or '2.8' in path_str:
-                return "projects/migrations/version-migrations/01-tony-2.7-to-2.8.md"
-            else:
-                return "engineering/api-documentation/mcp-protocol/01-mcp-overview.md"
-        
-        # Platform Documentation
-        elif 'deployment' in path_str:
-            if 'nginx' in path_str:
-                return "platform/installation/deployment/04-nginx-setup.md"
-            elif 'portainer' in path_str:
-                return "platform/installation/deployment/03-portainer-setup.md"
-            elif 'docker' in path_str:
-                return "platform/installation/deployment/02-docker-deployment.md"
-            else:
-                return "platform/installation/deployment/01-complete-guide.md"
-        
-        elif 'services' in path_str or 'gitea' in path_str:
-            if 'gitea' in path_str:
-                return "platform/services/core-services/01-gitea.md"
-            else:
-                return "platform/services/core-services/01-gitea.md"
+        return self.classifier.classify(str(rel_path), content)
+    
+    def group_by_destination(self, files: List[Path]) -> Dict[Optional[str], List[Path]]:
+        """Pending files per destination, each group in the order given"""
+        groups: Dict[Optional[str], List[Path]] = {}
+        for file_path in files:
+            rel_path = str(file_path.relative_to(self.old_docs))
+            # Content is only read when no path rule decides
+            dest_path = self.classifier.classify(rel_path, file_path.read_text)
+            groups.setdefault(dest_path, []).append(file_path)
+        return groups
+    
+    def is_stub(self, content: str) -> bool:
+        return 'status: "draft"' in content and '[Content to be added]' in content
+    
+    def merge_content(self, dest_content: Optional[str], sources: List[str]) -> str:
+        """Merge source contents into a destination page, in order
         
-        elif 'operations' in path_str:
-            if 'backup' in path_str:
-                if 'overview' in path_str:
-                    return "platform/operations/backup-recovery/01-backup-strategy.md"
+        A missing page becomes the first source. A stub (until something has
+        been appended to it) is replaced by the next source's body under the
+        stub's frontmatter, now published. Every other source is appended as a
+        migrated section, less any paragraphs and sections the page already
+        has (a source with nothing new is not appended at all). The parts are
+        joined once, so N sources cost O(N).
+        """
+        parts = [] if dest_content is None else [dest_content]
+        index = None
+        for source_content in sources:
+            if not parts:
+                parts.append(source_content)
+            elif len(parts) == 1 and self.is_stub(parts[0]):
+                # Replace stub with real content
+                # Extract frontmatter from destination to preserve structure
+                dest_frontmatter = self.extract_frontmatter(parts[0])
+                
+                # Update frontmatter
+                if dest_frontmatter:
+                    dest_frontmatter = dest_frontmatter.replace('status: "draft"', 'status: "published"')
+                    dest_frontmatter = dest_frontmatter.replace('author: "stub"', 'author: "migration"')
+                    parts[0] = dest_frontmatter + "\n" + self.extract_body(source_content)
                 else:
-                    return "platform/operations/backup-recovery/02-backup-procedures.md"
-            elif 'disaster' in path_str or 'recovery' in path_str:
-                return "platform/operations/backup-recovery/04-disaster-recovery.md"
-            elif 'incident' in path_str:
-                return "platform/operations/incident-response/01-incident-handling.md"
-            elif 'startup' in path_str:
-                return "platform/operations/routine-operations/01-startup-procedures.md"
-            elif 'shutdown' in path_str:
-                return "platform/operations/routine-operations/02-shutdown-procedures.md"
-            else:
-                return "platform/operations/routine-operations/02-service-management.md"
-        
-        elif 'stack' in path_str:
-            if 'config' in path_str or 'environment' in path_str:
-                return "platform/installation/configuration/01-environment-variables.md"
-            elif 'troubleshoot' in path_str:
-                return "learning/troubleshooting/common-issues/01-service-startup.md"
-            else:
-                return "platform/services/core-services/01-gitea.md"
-        
-        # Project Documentation
-        elif 'agent-management' in path_str or 'task-management' in path_str:
-            if 'e055' in path_str.lower():
-                return "projects/project-management/active-epics/01-epic-e055-mosaic-stack.md"
-            elif 'e057' in path_str.lower() or 'e.057' in path_str.lower():
-                return "projects/project-management/active-epics/02-epic-e057-mcp-integration.md"
-            else:
-                return "projects/project-management/active-epics/01-epic-e055-mosaic-stack.md"
-        
-        elif 'architecture' in path_str:
-            if 'security' in path_str:
-                return "projects/architecture/security-architecture/01-security-model.md"
-            elif 'data' in path_str or 'flow' in path_str:
-                return "projects/architecture/system-architecture/03-data-flow.md"
-            elif 'network' in path_str:
-                return "projects/architecture/system-architecture/04-network-topology.md"
-            elif 'service' in path_str or 'depend' in path_str:
-                return "projects/architecture/system-architecture/02-component-design.md"
+                    parts[0] = source_content
             else:
-                return "projects/architecture/system-architecture/01-overview.md"
-        
-        elif 'migration' in path_str:
-            if 'tony-sdk' in path_str or 'mosaic-sdk' in path_str:
-                return "projects/migrations/tony-to-mosaic/01-migration-overview.md"
-            elif 'namespace' in path_str or 'package' in path_str:
-                return "projects/migrations/tony-to-mosaic/02-namespace-changes.md"
-            else:
-                return "projects/migrations/version-migrations/03-breaking-changes.md"
-        
-        elif 'orchestration' in path_str:
-            if 'architecture' in path_str:
-                return "projects/architecture/integration-patterns/04-orchestration.md"
-            elif 'routing' in path_str:
-                return "projects/architecture/integration-patterns/02-api-gateway.md"
-            elif 'plugin' in path_str:
-                return "projects/architecture/integration-patterns/01-service-mesh.md"
-            else:
-                return "projects/architecture/integration-patterns/03-event-driven.md"
+                # Merge with existing content
+                # This is more complex - for now, append as a new section
+                source_body = self.extract_body(source_content)
+                if self.dedupe:
+                    if index is None:
+                        index = ParagraphIndex(parts[0])
+                    source_body = index.novel(source_body)
+                    if not source_body:
+                        continue
+                parts.append("\n\n---\n\n## Additional Content (Migrated)\n\n" + source_body)
+        return ''.join(parts)
+    
+    def extract_frontmatter(self, content: str) -> Optional[str]:
+        """Extract frontmatter from markdown content"""
+        raw, _ = split_frontmatter(content)
+        return f"---{raw}---" if raw is not None else None
+    
+    def extract_body(self, content: str) -> str:
+        """Extract body content (without frontmatter)"""
+        return split_frontmatter(content)[1]
+    
+    def record_error(self, rel_path: str, error: Exception):
+        print(f"  ❌ Error: {rel_path}: {error}")
+        self.errors.append((rel_path, str(error)))
+        self.save_state(rel_path, None, "ERROR", str(error))
+    
+    def process_destination(self, dest_path: Optional[str], files: List[Path]) -> DestinationResult:
+        """Merge every file bound for one destination, write it once, then move the files to _moved
         
-        elif 'mosaic-stack' in path_str:
-            if 'overview' in path_str:
-                return "projects/architecture/system-architecture/01-overview.md"
-            elif 'version' in path_str or 'roadmap' in path_str:
-                return "projects/project-management/roadmap-milestones/01-version-roadmap.md"
-            elif 'component' in path_str or 'milestone' in path_str:
-                return "projects/project-management/roadmap-milestones/02-component-milestones.md"
-            else:
-                return "projects/architecture/system-architecture/01-overview.md"
+        Runs on worker threads: it only touches the (thread-safe) transaction
+        and returns everything else for merge_result to apply.
+        """
+        rel_paths = [str(file_path.relative_to(self.old_docs)) for file_path in files]
+        group = {'destination': dest_path, 'sources': [{'path': rel_path} for rel_path in rel_paths]}
+        result = DestinationResult(group)
+        if dest_path is None:
+            for rel_path in rel_paths:
+                result.lines.append(f"\nProcessing: {rel_path}")
+                result.lines.append(f"  ⚠️  Could not determine destination, skipping")
+                result.states.append((rel_path, None, "SKIPPED", "NO_DESTINATION"))
+            result.count = len(files)
+            return result
         
-        # Learning Documentation
-        elif 'troubleshooting' in path_str:
-            return "learning/troubleshooting/common-issues/01-service-startup.md"
+        result.lines.append(f"\nProcessing: {dest_path} ← {len(files)} files")
+        tx = self.transaction
         
-        elif 'bookstack' in path_str:
-            if 'template' in path_str:
-                return None  # Skip templates
-            elif 'sync' in path_str or 'implementation' in path_str:
-                return "platform/services/application-services/01-bookstack.md"
-            else:
-                return None  # Skip bookstack meta files
+        # Read content
+        merged, contents = [], []
+        for file_path, rel_path, source in zip(files, rel_paths, group['sources']):
+            try:
+                contents.append(tx.read_text(file_path))
+                merged.append((file_path, rel_path))
+            except Exception as e:
+                result.error(rel_path, e)
+                continue
+            source['sha256'] = _digest(contents[-1])
+        if not merged:
+            return result
         
-        # Generic files
-        elif 'readme' in path_str.lower():
-            return None  # Skip READMEs
-        elif 'epic-e.055' in path_str.lower():
-            return "projects/project-management/active-epics/01-epic-e055-mosaic-stack.md"
-        elif 'documentation-index' in path_str:
-            return "learning/reference/configuration/01-environment-variables.md"
-        
-        # Default based on content
-        if 'project' in content_lower and 'planning' in content_lower:
-            return "projects/project-management/planning-methodology/01-project-planning.md"
+        # Merge content and write it once (journaled, creating the directory). The journal
+        # lists the sources, so a resumed run moves them rather than merging them again;
+        # a write interrupted by a crash is redone from the content it replaced.
+        dest_file = self.new_docs / dest_path
+        base_key = f"merge:{dest_path}"
+        written = self._merged_sources(tx, base_key)
+        todo = [(file_path, rel_path, content) for (file_path, rel_path), content in zip(merged, contents)
+                if rel_path not in written]
+        key = base_key
+        try:
+            while todo:
+                if tx.is_done(key):
+                    # A resumed run with another limit or plan can bring more sources for a
+                    # destination already merged: merge those under a key of their own
+                    sources = '\n'.join(rel_path for _, rel_path, _ in todo)
+                    key = f"{base_key}:{_digest(sources)[:12]}"
+                dest_content = tx.read_text(dest_file, key) if tx.exists(dest_file, key) else None
+                if 'destination_sha256' not in group:
+                    group['destination_sha256'] = _digest(dest_content) if dest_content is not None else None
+                tx.write(dest_file, self.merge_content(dest_content, [content for _, _, content in todo]), key=key,
+                         meta={'sources': [rel_path for _, rel_path, _ in todo]})
+                # The journal says what was merged (a write found done on resume may list fewer sources)
+                written = self._merged_sources(tx, base_key)
+                todo = [item for item in todo if item[1] not in written]
+        except Exception as e:
+            for _, rel_path, _ in todo:
+                result.error(rel_path, e)
+            merged = [(file_path, rel_path) for file_path, rel_path in merged if rel_path in written]
+            if not merged:
+                return result
+        else:
+            result.lines.append("  ✓ Would write content" if self.dry_run else "  ✓ Content written")
         
-        return None  # Could not determine destination
+        # Move to _moved: only sources a completed write lists
+        for file_path, rel_path in merged:
+            if rel_path not in written:
+                continue
+            try:
+                tx.move(file_path, self.moved_docs / rel_path, key=f"move:{rel_path}")
+            except Exception as e:
+                result.error(rel_path, e)
+                continue
+            result.processed.append(rel_path)
+            result.states.append((rel_path, dest_path, "SUCCESS", None))
+        result.count = len(result.processed)
+        result.lines.append(f"  ✓ {'Would move' if self.dry_run else 'Moved'} {result.count} files to _moved")
+        return result
     
-    def merge_content(self, source_file: Path, dest_file: Path) -> str:
-        """Merge source content into destination, handling stubs vs existing content"""
-        source_content = source_file.read_text()
-        
-        if not dest_file.exists():
-            return source_content
-        
-        dest_content = dest_file.read_text()
-        
-        # Check if destination is a stub
-        if 'status: "draft"' in dest_content and '[Content to be added]' in dest_content:
-            # Replace stub with real content
-            # Extract frontmatter from destination to preserve structure
-            dest_frontmatter = self.extract_frontmatter(dest_content)
-            source_body = self.extract_body(source_content)
-            
-            # Update frontmatter
-            if dest_frontmatter:
-                dest_frontmatter = dest_frontmatter.replace('status: "draft"', 'status: "published"')
-                dest_frontmatter = dest_frontmatter.replace('author: "stub"', 'author: "migration"')
-                return dest_frontmatter + "\n" + source_body
-            else:
-                return source_content
+    def merge_result(self, result: DestinationResult) -> int:
+        """Apply one destination's result to the run's state; returns how many files it processed"""
+        for line in result.lines:
+            print(line)
+        self.plan_groups.append(result.group)
+        self.errors.extend(result.errors)
+        self.processed.update(result.processed)
+        self.record_states(result.states)
+        return result.count
+    
+    def _merged_sources(self, tx: MigrationTransaction, base_key: str) -> set:
+        """Sources listed by the completed merge writes of one destination (all its keys)"""
+        return {rel_path
+                for key, op in list(tx.ops.items())
+                if (key == base_key or key.startswith(base_key + ':')) and tx.is_done(key)
+                for rel_path in (op.get('meta') or {}).get('sources', ())}
+    
+    def _destinations(self, tx: MigrationTransaction) -> Dict[str, str]:
+        """Destination of every source file a transaction merged"""
+        return {rel_path: op['path']
+                for op in tx.operations() if op['op'] == 'write'
+                for rel_path in (op.get('meta') or {}).get('sources', ())}
+    
+    def begin_or_resume(self) -> MigrationTransaction:
+        """Continue the transaction an interrupted run left open, or start a new one"""
+        tx = MigrationTransaction.latest(self.new_docs, 'systematic-migration', status='open')
+        if tx is not None:
+            print(f"Resuming {tx.summary()}")
+            # Sources of destinations written before the crash: finish moving them, don't merge them again
+            finished = []
+            for op in list(tx.operations()):
+                if op['op'] != 'write' or not tx.is_done(op['key']):
+                    continue
+                for rel_path in (op.get('meta') or {}).get('sources', ()):
+                    if rel_path in self.processed:
+                        continue
+                    try:
+                        tx.move(self.old_docs / rel_path, self.moved_docs / rel_path, key=f"move:{rel_path}")
+                    except (OSError, TransactionError) as e:
+                        self.record_error(rel_path, e)
+                        continue
+                    self.processed.add(rel_path)
+                    finished.append((rel_path, op['path'], "SUCCESS", None))
+            self.state.record_many(finished)
         else:
-            # Merge with existing content
-            # This is more complex - for now, append as a new section
-            return dest_content + "\n\n---\n\n## Additional Content (Migrated)\n\n" + self.extract_body(source_content)
+            tx = MigrationTransaction.begin(self.new_docs, 'systematic-migration')
+        self.transaction = tx
+        return tx
     
-    def extract_frontmatter(self, content: str) -> Optional[str]:
-        """Extract frontmatter from markdown content"""
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                return f"---{parts[1]}---"
-        return None
+    def rollback(self, tx_id: Optional[str] = None) -> bool:
+        """Undo a run and mark its files as not processed in the scratchpad"""
+        tx = MigrationTransaction.for_rollback(self.new_docs, 'systematic-migration', tx_id)
+        print(f"Rolling back {tx.summary()}")
+        problems = tx.rollback()
+        destinations = self._destinations(tx)
+        rolled_back = []
+        for op in tx.operations():
+            if op['op'] == 'move':
+                rel_path = op['key'].partition(':')[2]
+                self.processed.discard(rel_path)
+                rolled_back.append((rel_path, destinations.get(rel_path), "ROLLED_BACK", tx.id))
+        self.state.record_many(rolled_back)
+        self.write_scratchpad()
+        for problem in problems:
+            print(f"  ❌ {problem}")
+        print("✅ Rolled back" if not problems else f"⚠️  Rolled back with {len(problems)} problems")
+        return not problems
     
-    def extract_body(self, content: str) -> str:
-        """Extract body content (without frontmatter)"""
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                return parts[2].strip()
-        return content
+    def print_status(self, status: Optional[str] = None):
+        """Counts per status, or the files with one status"""
+        if status:
+            for source, destination, _, message in self.state.files(status):
+                print(f"{source} → {destination or message or ''}")
+            return
+        counts = self.state.counts()
+        for name, count in counts.items():
+            print(f"{name:<12} {count}")
+        print(f"{'TOTAL':<12} {sum(counts.values())}")
+    
+    def print_dry_run(self, processed_count: int, pending: int):
+        """What the run would have changed, per destination"""
+        tx = self.transaction
+        changed = tx.changed()
+        print(f"\n{'='*60}")
+        print(f"Would process: {processed_count} of {pending} files")
+        print(f"Would move: {sum(1 for op in tx.operations() if op['op'] == 'move')} files to _moved")
+        print(f"Would skip: {sum(1 for entry in self.planned_states if entry[2] == 'SKIPPED')} files")
+        print(f"Errors: {len(self.errors)}")
+        print(f"\nDestinations ({sum(1 for op in tx.operations() if op['op'] == 'write')}):")
+        for op in tx.operations():
+            if op['op'] != 'write':
+                continue
+            change = changed.get(op['path'], {'before': None, 'after': ''})
+            before, after = change['before'], change['after'] or ''
+            if before is None:
+                action = "new page"
+            elif self.is_stub(before):
+                action = "replaces stub"
+            else:
+                action = "appended"
+            size = f"{len(before or ''):,} → {len(after):,} bytes"
+            print(f"  {op['path']}  ← {len(op['meta']['sources'])} files, {action}, {size}")
+        
+        if self.errors:
+            print("\nErrors:")
+            for file, error in self.errors:
+                print(f"  - {file}: {error}")
+    
+    def save_plan(self, plan_file: str):
+        """Write the destination groups of this run, with content digests, for a later --plan run"""
+        plan = {
+            'version': 1,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'root': str(self.new_docs.resolve()),
+            'groups': self.plan_groups,
+        }
+        with open(plan_file, 'w') as f:
+            json.dump(plan, f, indent=2)
+        print(f"Plan saved to: {plan_file} (apply with --plan {plan_file})")
     
-    def process_file(self, file_path: Path) -> bool:
-        """Process a single file"""
-        # Skip if already processed
-        rel_path = str(file_path.relative_to(self.old_docs))
-        if rel_path in self.processed:
-            return True
+    def load_plan(self, plan_file: str) -> Dict[Optional[str], List[Path]]:
+        """Destination groups of a saved plan; raises ValueError if the tree changed since it was made"""
+        with open(plan_file) as f:
+            plan = json.load(f)
+        if plan.get('root') != str(self.new_docs.resolve()):
+            raise ValueError(f"Plan was made for {plan.get('root')}, not {self.new_docs.resolve()}")
+        groups: Dict[Optional[str], List[Path]] = {}
+        stale = []
+        for group in plan['groups']:
+            files = groups.setdefault(group['destination'], [])
+            for source in group['sources']:
+                file_path = self.old_docs / source['path']
+                files.append(file_path)
+                if source['path'] in self.processed or not file_path.exists():
+                    stale.append(f"{source['path']} was already migrated")
+                elif 'sha256' in source and _digest(file_path.read_text()) != source['sha256']:
+                    stale.append(f"{source['path']} has changed")
+            if group['destination'] is not None and 'destination_sha256' in group:
+                dest_file = self.new_docs / group['destination']
+                current = _digest(dest_file.read_text()) if dest_file.exists() else None
+                if current != group['destination_sha256']:
+                    stale.append(f"{group['destination']} has changed")
+        if stale:
+            raise ValueError(f"Plan {plan_file} is out of date:\n" + "\n".join(f"  - {reason}" for reason in stale))
+        return groups
+    
+    def run(self, limit: Optional[int] = None, jobs: int = 1, plan_file: Optional[str] = None):
+        """Run the migration process
         
-        print(f"\nProcessing: {rel_path}")
+        Files are grouped by destination and each destination is written once.
+        With jobs > 1 the groups are processed concurrently on a thread pool,
+        so no two workers ever merge into the same page. A plan saved by a dry
+        run replaces the scan and classification (and the limit).
+        """
+        if plan_file:
+            groups = self.load_plan(plan_file)
+            pending = sum(len(files) for files in groups.values())
+            print(f"Following {plan_file}: {pending} files")
         
-        try:
-            # Read content
-            content = file_path.read_text()
-            
-            # Determine destination
-            dest_path = self.determine_destination(file_path, content)
-            
-            if dest_path is None:
-                print(f"  ⚠️  Could not determine destination, skipping")
-                self.save_state(rel_path, "SKIPPED", "NO_DESTINATION")
-                return True
-            
-            print(f"  → Destination: {dest_path}")
-            
-            # Merge content
-            dest_file = self.new_docs / dest_path
-            merged_content = self.merge_content(file_path, dest_file)
-            
-            # Write merged content
-            dest_file.parent.mkdir(parents=True, exist_ok=True)
-            dest_file.write_text(merged_content)
-            print(f"  ✓ Content written")
-            
-            # Move to _moved
-            moved_path = self.moved_docs / rel_path
-            moved_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.move(str(file_path), str(moved_path))
-            print(f"  ✓ Moved to _moved")
-            
-            # Update state
-            self.processed.add(rel_path)
-            self.save_state(rel_path, dest_path, "SUCCESS")
-            
-            return True
+        tx = self.transaction or self.begin_or_resume()
+        if self.dry_run:
+            print("DRY RUN - nothing will be written")
+            interrupted = MigrationTransaction.latest(self.new_docs, 'systematic-migration', status='open')
+            if interrupted is not None:
+                print(f"⚠️  {interrupted.summary()} was interrupted: the real run resumes it first")
+        
+        if not plan_file:
+            # Get all markdown files, skipping files already in _moved directory
+            corpus = DocCorpus(self.old_docs, ignore_dirs={'_moved'})
+            remaining = [doc.path for doc in corpus if doc.rel_path not in self.processed]
             
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            self.errors.append((rel_path, str(e)))
-            self.save_state(rel_path, "ERROR", str(e))
-            return False
-    
-    def run(self, limit: Optional[int] = None):
-        """Run the migration process"""
-        # Get all markdown files
-        all_files = list(self.old_docs.rglob("*.md"))
-        # Skip files already in _moved directory
-        remaining = [f for f in all_files 
-                    if str(f.relative_to(self.old_docs)) not in self.processed 
-                    and '_moved' not in str(f)]
+            pending = len(remaining)
+            print(f"Found {pending} files to process")
+            if limit and pending > limit:
+                print(f"Limited to {limit} files")
+                remaining = remaining[:limit]
+            groups = self.group_by_destination(remaining)
         
-        print(f"Found {len(remaining)} files to process")
+        # Process files, one destination at a time
+        if jobs > 1:
+            print(f"{len(groups)} destinations, {jobs} workers")
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                # Largest groups first so the longest merges start early
+                ordered = sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)
+                futures = [pool.submit(self.process_destination, dest_path, files) for dest_path, files in ordered]
+                # Results are merged here, on the main thread, as destinations finish
+                processed_count = sum(self.merge_result(future.result()) for future in as_completed(futures))
+        else:
+            print(f"{len(groups)} destinations")
+            processed_count = sum(self.merge_result(self.process_destination(dest_path, files))
+                                  for dest_path, files in groups.items())
+        order = {dest_path: i for i, dest_path in enumerate(groups)}
+        self.plan_groups.sort(key=lambda group: order[group['destination']])
         
-        # Process files
-        processed_count = 0
-        for file_path in remaining:
-            if limit and processed_count >= limit:
-                print(f"\nReached limit of {limit} files")
-                break
-                
-            if self.process_file(file_path):
-                processed_count += 1
+        tx.commit()
+        if self.dry_run:
+            self.print_dry_run(processed_count, pending)
+            return
+        self.write_scratchpad()
         
         # Summary
         print(f"\n{'='*60}")
         print(f"Processed: {processed_count} files")
         print(f"Errors: {len(self.errors)}")
         print(f"Total processed so far: {len(self.processed)}")
-        print(f"Remaining: {len(remaining) - processed_count}")
+        print(f"Remaining: {pending - processed_count}")
+        print(f"Transaction: {tx.id} (undo with --rollback {tx.id})")
         
         if self.errors:
             print("\nErrors:")
@@ -341,14 +469,51 @@ def main():
     parser = argparse.ArgumentParser(description='Systematic documentation migration')
     parser.add_argument('--limit', type=int, help='Limit number of files to process')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without doing it')
+    parser.add_argument('--diff', action='store_true', help='With --dry-run, print a unified diff of every change')
+    parser.add_argument('--save-plan', metavar='FILE', help='With --dry-run, save the plan for --plan')
+    parser.add_argument('--keep-duplicates', action='store_true',
+                       help='Append sources verbatim, even paragraphs the destination already has')
+    parser.add_argument('--plan', metavar='FILE',
+                       help='Follow a plan saved by --dry-run --save-plan (fails if the files changed since)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Worker threads, each merging one destination at a time (0 = one per CPU, default: 1)')
+    parser.add_argument('--rollback', nargs='?', const='', metavar='TX_ID',
+                       help='Undo a run by replaying its journal backwards (default: the latest)')
+    parser.add_argument('--transactions', action='store_true', help='List journaled runs')
+    parser.add_argument('--status', nargs='?', const='', metavar='STATUS',
+                       help='Show file counts by status, or list the files with STATUS (e.g. ERROR)')
     args = parser.parse_args()
     
-    if args.dry_run:
-        print("DRY RUN MODE - not implemented yet")
+    if args.transactions:
+        for tx in MigrationTransaction.history(Path("docs"), 'systematic-migration'):
+            print(tx.summary())
         return
     
-    migrator = DocumentMigrator()
-    migrator.run(limit=args.limit)
+    migrator = DocumentMigrator(dry_run=args.dry_run, dedupe=not args.keep_duplicates)
+    if args.status is not None:
+        migrator.print_status(args.status.upper() or None)
+        return
+    if args.rollback is not None:
+        if args.dry_run:
+            print("❌ --rollback cannot be combined with --dry-run")
+            sys.exit(2)
+        try:
+            sys.exit(0 if migrator.rollback(args.rollback or None) else 1)
+        except TransactionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    try:
+        migrator.run(limit=args.limit, jobs=jobs, plan_file=args.plan)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    if args.dry_run:
+        if args.diff:
+            sys.stdout.writelines(migrator.transaction.diff())
+        if args.save_plan:
+            migrator.save_plan(args.save_plan)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
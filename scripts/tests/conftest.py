@@ -0,0 +1,48 @@
+"""Shared fixtures for the mosaic_docs tests."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+# The scripts import mosaic_docs from scripts/; do the same here
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Keep cache files (signatures, legacy journals) out of the user's cache directory."""
+    monkeypatch.setenv('MOSAIC_DOCS_CACHE', str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def docs(tmp_path):
+    """An empty docs root; write_pages fills it."""
+    root = tmp_path / 'docs'
+    root.mkdir()
+    return root
+
+
+def write_pages(root: Path, pages: dict) -> None:
+    """Create docs-relative files with the given contents."""
+    for rel_path, content in pages.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def tree(root: Path) -> dict:
+    """Docs-relative path -> content of every file, skipping the journal directory."""
+    return {path.relative_to(root).as_posix(): path.read_text(encoding='utf-8')
+            for path in sorted(root.rglob('*'))
+            if path.is_file() and '.migrations' not in path.relative_to(root).parts}
+
+
+def load_script(name: str):
+    """Import a hyphenated script from scripts/ (e.g. 'systematic-migration') as a module."""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
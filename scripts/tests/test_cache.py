@@ -0,0 +1,137 @@
+"""Tests for the cache directory and the plain-data cache format."""
+
+import json
+import os
+import pickle
+import stat
+from datetime import date, datetime
+
+import pytest
+
+from mosaic_docs import cache
+from mosaic_docs.cache import cache_dir, dump_data, load_data
+from mosaic_docs.structure import load_structure
+
+
+class TestDataFormat:
+    """Round trips through the tagged JSON encoding."""
+
+    def test_round_trip_keeps_types(self):
+        value = {
+            'title': 'Deploy',
+            'date': date(2024, 5, 1),
+            'updated': datetime(2024, 5, 1, 12, 30),
+            'headings': [(1, 'Deploy'), (2, 'Steps')],
+            'tags': {'ops'},
+            'frozen': frozenset({1}),
+            1: None,
+            (1, 2): b'\x00\xff',
+            'nested': [{'ok': True, 'ratio': 0.5}],
+        }
+        assert load_data(dump_data(value)) == value
+        assert type(load_data(dump_data(value))['headings'][0]) is tuple
+
+    def test_output_is_json(self):
+        assert json.loads(dump_data({'a': [1, 2]})) == {'dict': [['a', [1, 2]]]}
+
+    def test_unsupported_type_refused(self):
+        with pytest.raises(TypeError):
+            dump_data({'model': object()})
+
+    @pytest.mark.parametrize('blob', [
+        pickle.dumps({'a': 1}),
+        b'{"exec": "print(1)"}',
+        b'{"dict": [["a", 1]], "tuple": []}',
+        b'{"dict": 5}',
+    ])
+    def test_foreign_data_rejected(self, blob):
+        with pytest.raises(ValueError):
+            load_data(blob)
+
+
+class TestCacheDir:
+    """A directory only the current user can write."""
+
+    def test_created_private(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('MOSAIC_DOCS_CACHE', str(tmp_path / 'new' / 'cache'))
+        path = cache_dir()
+        assert path == tmp_path / 'new' / 'cache'
+        assert stat.S_IMODE(os.stat(path).st_mode) & 0o077 == 0
+
+    def test_xdg_cache_home(self, tmp_path, monkeypatch):
+        monkeypatch.delenv('MOSAIC_DOCS_CACHE')
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+        assert cache_dir() == tmp_path / 'xdg' / 'mosaic-docs'
+
+    def test_group_writable_dir_tightened(self, tmp_path, monkeypatch):
+        path = tmp_path / 'shared'
+        path.mkdir()
+        path.chmod(0o777)
+        monkeypatch.setenv('MOSAIC_DOCS_CACHE', str(path))
+        assert cache_dir() == path
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+
+    @pytest.mark.parametrize('make', ['symlink', 'file'])
+    def test_unsafe_path_falls_back(self, tmp_path, monkeypatch, make):
+        path = tmp_path / 'cache-link'
+        if make == 'symlink':
+            (tmp_path / 'target').mkdir()
+            path.symlink_to(tmp_path / 'target')
+        else:
+            path.write_text('')
+        monkeypatch.setenv('MOSAIC_DOCS_CACHE', str(path))
+        monkeypatch.setattr(cache, '_fallback_dir', None)
+        fallback = cache_dir()
+        try:
+            assert fallback != path
+            assert stat.S_IMODE(os.stat(fallback).st_mode) == 0o700
+            assert cache_dir() == fallback
+        finally:
+            fallback.rmdir()
+
+    @pytest.mark.skipif(not hasattr(os, 'getuid') or os.getuid() != 0, reason='needs root to chown')
+    def test_other_owner_falls_back(self, tmp_path, monkeypatch):
+        path = tmp_path / 'theirs'
+        path.mkdir(mode=0o700)
+        os.chown(path, 12345, 12345)
+        monkeypatch.setenv('MOSAIC_DOCS_CACHE', str(path))
+        monkeypatch.setattr(cache, '_fallback_dir', None)
+        fallback = cache_dir()
+        try:
+            assert fallback != path
+        finally:
+            fallback.rmdir()
+
+
+class TestStructureCache:
+    """The structure model cached as plain data."""
+
+    def test_cached_as_json(self, tmp_path):
+        structure = tmp_path / 'bookstack-structure.yaml'
+        structure.write_text(
+            'version: 2024-05-01\n'
+            'structure:\n'
+            '  - shelf:\n'
+            '      name: Ops\n'
+            '      slug: ops\n'
+            '      books:\n'
+            '        - book: {name: Runbooks, slug: runbooks, chapters: [{chapter: {slug: deploy, pages: [setup]}}]}\n'
+        )
+        cold = load_structure(str(structure))
+        (cached,) = (tmp_path / 'cache').glob('structure-*')
+        assert cached.suffix == '.json'
+        json.loads(cached.read_bytes())
+
+        warm = load_structure(str(structure))
+        assert [shelf.slug for shelf in warm.shelves] == [shelf.slug for shelf in cold.shelves] == ['ops']
+        assert warm.version == cold.version == date(2024, 5, 1)
+        assert list(warm.by_slug_path) == list(cold.by_slug_path)
+
+    def test_corrupt_entry_rebuilt(self, tmp_path):
+        structure = tmp_path / 'bookstack-structure.yaml'
+        structure.write_text('structure: []\n')
+        load_structure(str(structure))
+        (cached,) = (tmp_path / 'cache').glob('structure-*')
+        cached.write_bytes(pickle.dumps({'structure': []}))
+        assert load_structure(str(structure)).shelves == []
+        json.loads(cached.read_bytes())
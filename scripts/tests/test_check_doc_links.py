@@ -0,0 +1,80 @@
+"""Tests for check-doc-links.py, run as a command."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SCRIPTS_DIR, write_pages
+
+STRUCTURE = """\
+structure:
+  - shelf:
+      name: Engineering
+      slug: engineering
+      books:
+        - book:
+            name: Guide
+            slug: guide
+            chapters:
+              - chapter: {name: Setup, slug: setup, pages: [01-install, 02-configure]}
+"""
+
+PAGES = {
+    'engineering/guide/setup/01-install.md':
+        '# Install\n\n## Requirements\n\n'
+        'Then [configure](02-configure.md#settings) it, see [requirements](#requirements).\n',
+    'engineering/guide/setup/02-configure.md':
+        '# Configure\n\n## Settings\n\nBack to [install](01-install.md).\n'
+        'Also [the notes](../../notes.md) and [a section](01-install.md#missing).\n',
+    'engineering/notes.md': '# Notes\n\nSee [gone](guide/setup/03-gone.md) and [install](guide/setup/01-install.md).\n',
+}
+
+
+@pytest.fixture
+def checkout(tmp_path, docs):
+    write_pages(docs, PAGES)
+    (tmp_path / 'structure.yaml').write_text(STRUCTURE)
+    return tmp_path
+
+
+def check_links(checkout, *args):
+    return subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / 'check-doc-links.py'), 'docs', '--structure', 'structure.yaml', *args],
+        cwd=checkout, capture_output=True, text=True, timeout=60)
+
+
+def test_report(checkout):
+    result = check_links(checkout, '--json', 'links.json')
+    assert result.returncode == 1, result.stderr
+    assert 'Checked 7 links in 3 pages' in result.stdout
+
+    report = json.loads((checkout / 'links.json').read_text())
+    assert report['summary'] == {'pages': 3, 'links': 7, 'broken': 2, 'orphan_links': 1}
+    assert sorted((item['source'], item['target'], item['reason']) for item in report['broken']) == [
+        ('engineering/guide/setup/02-configure.md', '01-install.md#missing',
+         'Heading #missing not found in engineering/guide/setup/01-install.md'),
+        ('engineering/notes.md', 'guide/setup/03-gone.md', 'File not found'),
+    ]
+    # notes.md is a page, but not one the structure lists
+    assert report['orphan_links'] == [
+        {'source': 'engineering/guide/setup/02-configure.md', 'target': 'engineering/notes.md'}]
+    assert report['reverse']['engineering/guide/setup/01-install.md'] == \
+        ['engineering/guide/setup/02-configure.md', 'engineering/notes.md']
+
+
+def test_clean_tree_passes(checkout, docs):
+    (docs / 'engineering' / 'notes.md').unlink()
+    configure = docs / 'engineering' / 'guide' / 'setup' / '02-configure.md'
+    configure.write_text('# Configure\n\n## Settings\n\nBack to [install](01-install.md#requirements).\n')
+    result = check_links(checkout)
+    assert result.returncode == 0, result.stdout
+    assert 'All links resolve' in result.stdout
+
+
+def test_reverse(checkout):
+    result = check_links(checkout, '--reverse', 'engineering/guide/setup/02-configure.md')
+    assert result.returncode == 0
+    assert 'is linked from 1 pages' in result.stdout
+    assert '  - engineering/guide/setup/01-install.md' in result.stdout
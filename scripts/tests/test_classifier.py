@@ -0,0 +1,455 @@
+"""Tests for the YAML-declared migration classifiers against the chains they replaced."""
+
+import random
+
+import pytest
+
+from mosaic_docs.classifier import Classifier, KeywordMatcher, load_classifier
+
+
+# The substring chains the migration scripts used before classifiers.yaml, kept as the reference
+
+def legacy_systematic_destination(rel_path, content):
+    """DocumentMigrator.determine_destination before the classifier."""
+    path_str = rel_path.lower()
+    content_lower = content.lower()
+
+    # Engineering Documentation
+    if any(x in path_str for x in ['ci-cd', 'cicd', 'pipeline']):
+        if 'template' in path_str:
+            return "engineering/cicd-handbook/pipeline-setup/03-pipeline-templates.md"
+        elif 'troubleshoot' in path_str:
+            return "engineering/cicd-handbook/best-practices/03-troubleshooting.md"
+        elif 'best' in path_str or 'practice' in path_str:
+            return "engineering/cicd-handbook/best-practices/01-cicd-patterns.md"
+        elif 'workflow' in path_str:
+            return "engineering/cicd-handbook/advanced-pipelines/02-conditional-workflows.md"
+        else:
+            return "engineering/cicd-handbook/pipeline-setup/02-pipeline-basics.md"
+
+    elif any(x in path_str for x in ['development', 'dev-guide']):
+        if 'git' in path_str or 'workflow' in path_str:
+            return "engineering/getting-started/development-workflow/01-git-workflow.md"
+        elif 'branch' in path_str:
+            return "engineering/getting-started/development-workflow/02-branch-protection.md"
+        elif 'quick' in path_str or 'start' in path_str:
+            return "engineering/getting-started/quick-start/01-first-project.md"
+        elif 'isolated' in path_str or 'environment' in path_str:
+            return "engineering/getting-started/quick-start/03-isolated-environment.md"
+        elif 'worktree' in path_str:
+            return "engineering/getting-started/development-workflow/01-git-workflow.md"
+        else:
+            return "engineering/getting-started/prerequisites/01-system-requirements.md"
+
+    elif 'api' in path_str:
+        return "engineering/api-documentation/rest-apis/01-api-overview.md"
+
+    elif 'mcp' in path_str:
+        if 'integration' in path_str or 'strategy' in path_str:
+            return "engineering/api-documentation/mcp-protocol/02-mcp-integration.md"
+        elif 'migration' in path_str or '2.7' in path_str or '2.8' in path_str:
+            return "projects/migrations/version-migrations/01-tony-2.7-to-2.8.md"
+        else:
+            return "engineering/api-documentation/mcp-protocol/01-mcp-overview.md"
+
+    # Platform Documentation
+    elif 'deployment' in path_str:
+        if 'nginx' in path_str:
+            return "platform/installation/deployment/04-nginx-setup.md"
+        elif 'portainer' in path_str:
+            return "platform/installation/deployment/03-portainer-setup.md"
+        elif 'docker' in path_str:
+            return "platform/installation/deployment/02-docker-deployment.md"
+        else:
+            return "platform/installation/deployment/01-complete-guide.md"
+
+    elif 'services' in path_str or 'gitea' in path_str:
+        return "platform/services/core-services/01-gitea.md"
+
+    elif 'operations' in path_str:
+        if 'backup' in path_str:
+            if 'overview' in path_str:
+                return "platform/operations/backup-recovery/01-backup-strategy.md"
+            else:
+                return "platform/operations/backup-recovery/02-backup-procedures.md"
+        elif 'disaster' in path_str or 'recovery' in path_str:
+            return "platform/operations/backup-recovery/04-disaster-recovery.md"
+        elif 'incident' in path_str:
+            return "platform/operations/incident-response/01-incident-handling.md"
+        elif 'startup' in path_str:
+            return "platform/operations/routine-operations/01-startup-procedures.md"
+        elif 'shutdown' in path_str:
+            return "platform/operations/routine-operations/02-shutdown-procedures.md"
+        else:
+            return "platform/operations/routine-operations/02-service-management.md"
+
+    elif 'stack' in path_str:
+        if 'config' in path_str or 'environment' in path_str:
+            return "platform/installation/configuration/01-environment-variables.md"
+        elif 'troubleshoot' in path_str:
+            return "learning/troubleshooting/common-issues/01-service-startup.md"
+        else:
+            return "platform/services/core-services/01-gitea.md"
+
+    # Project Documentation
+    elif 'agent-management' in path_str or 'task-management' in path_str:
+        if 'e055' in path_str:
+            return "projects/project-management/active-epics/01-epic-e055-mosaic-stack.md"
+        elif 'e057' in path_str or 'e.057' in path_str:
+            return "projects/project-management/active-epics/02-epic-e057-mcp-integration.md"
+        else:
+            return "projects/project-management/active-epics/01-epic-e055-mosaic-stack.md"
+
+    elif 'architecture' in path_str:
+        if 'security' in path_str:
+            return "projects/architecture/security-architecture/01-security-model.md"
+        elif 'data' in path_str or 'flow' in path_str:
+            return "projects/architecture/system-architecture/03-data-flow.md"
+        elif 'network' in path_str:
+            return "projects/architecture/system-architecture/04-network-topology.md"
+        elif 'service' in path_str or 'depend' in path_str:
+            return "projects/architecture/system-architecture/02-component-design.md"
+        else:
+            return "projects/architecture/system-architecture/01-overview.md"
+
+    elif 'migration' in path_str:
+        if 'tony-sdk' in path_str or 'mosaic-sdk' in path_str:
+            return "projects/migrations/tony-to-mosaic/01-migration-overview.md"
+        elif 'namespace' in path_str or 'package' in path_str:
+            return "projects/migrations/tony-to-mosaic/02-namespace-changes.md"
+        else:
+            return "projects/migrations/version-migrations/03-breaking-changes.md"
+
+    elif 'orchestration' in path_str:
+        if 'architecture' in path_str:
+            return "projects/architecture/integration-patterns/04-orchestration.md"
+        elif 'routing' in path_str:
+            return "projects/architecture/integration-patterns/02-api-gateway.md"
+        elif 'plugin' in path_str:
+            return "projects/architecture/integration-patterns/01-service-mesh.md"
+        else:
+            return "projects/architecture/integration-patterns/03-event-driven.md"
+
+    elif 'mosaic-stack' in path_str:
+        if 'overview' in path_str:
+            return "projects/architecture/system-architecture/01-overview.md"
+        elif 'version' in path_str or 'roadmap' in path_str:
+            return "projects/project-management/roadmap-milestones/01-version-roadmap.md"
+        elif 'component' in path_str or 'milestone' in path_str:
+            return "projects/project-management/roadmap-milestones/02-component-milestones.md"
+        else:
+            return "projects/architecture/system-architecture/01-overview.md"
+
+    # Learning Documentation
+    elif 'troubleshooting' in path_str:
+        return "learning/troubleshooting/common-issues/01-service-startup.md"
+
+    elif 'bookstack' in path_str:
+        if 'template' in path_str:
+            return None
+        elif 'sync' in path_str or 'implementation' in path_str:
+            return "platform/services/application-services/01-bookstack.md"
+        else:
+            return None
+
+    # Generic files
+    elif 'readme' in path_str:
+        return None
+    elif 'epic-e.055' in path_str:
+        return "projects/project-management/active-epics/01-epic-e055-mosaic-stack.md"
+    elif 'documentation-index' in path_str:
+        return "learning/reference/configuration/01-environment-variables.md"
+
+    # Default based on content
+    if 'project' in content_lower and 'planning' in content_lower:
+        return "projects/project-management/planning-methodology/01-project-planning.md"
+
+    return None
+
+
+DOC_MIGRATOR_MAPPINGS = {
+    'agent-management/tech-lead-tony': 'projects/epics/active',
+    'architecture': 'stack/architecture/overview',
+    'ci-cd': 'engineering/ci-cd-guide/setup',
+    'cicd': 'engineering/ci-cd-guide/setup',
+    'api': 'engineering/api-guide/overview',
+    'deployment': 'stack/setup/installation',
+    'operations': 'operations',
+    'monitoring': 'operations/monitoring/setup',
+    'git': 'engineering/git-guide/setup',
+    'integration': 'stack/integration/overview',
+    'security': 'stack/security/overview',
+    'testing': 'engineering/testing-guide/overview',
+}
+
+
+def legacy_doc_migrator_target(rel_path, content):
+    """DocMigrator.suggest_migrations before the classifier."""
+    for pattern, mapped in DOC_MIGRATOR_MAPPINGS.items():
+        if pattern in rel_path.lower():
+            return mapped
+    content = content.lower()
+    if 'backup' in content:
+        return 'operations/backup/strategies'
+    elif 'deploy' in content:
+        return 'stack/setup/installation'
+    elif 'troubleshoot' in content:
+        return 'stack/troubleshooting/common-issues'
+    return 'projects/misc/uncategorized'
+
+
+def legacy_consolidation_category(rel_path, content):
+    """analyze_docs before the classifier (its mixed case-sensitivity included)."""
+    if 'deployment' in rel_path or 'nginx' in rel_path or 'portainer' in rel_path:
+        return 'deployment'
+    elif 'ci-cd' in rel_path or 'cicd' in rel_path or 'pipeline' in rel_path.lower():
+        return 'cicd'
+    elif 'operations' in rel_path or 'backup' in rel_path or 'incident' in rel_path:
+        return 'operations'
+    elif 'architecture' in rel_path or 'design' in rel_path:
+        return 'architecture'
+    elif 'api' in rel_path:
+        return 'api'
+    elif 'development' in rel_path or 'git' in rel_path or 'workflow' in rel_path:
+        return 'development'
+    elif 'services' in rel_path or 'gitea' in rel_path or 'postgres' in rel_path:
+        return 'services'
+    elif 'E055' in rel_path or 'E057' in rel_path or 'epic' in rel_path.lower():
+        return 'epics'
+    elif 'migration' in rel_path or 'tony-sdk' in rel_path:
+        return 'migration'
+    elif 'mcp' in rel_path.lower():
+        return 'mcp'
+    elif 'troubleshoot' in rel_path or 'common-issues' in rel_path:
+        return 'troubleshooting'
+
+    content_lower = content.lower()
+    if 'deploy' in content_lower or 'install' in content_lower:
+        return 'deployment'
+    elif 'pipeline' in content_lower or 'ci/cd' in content_lower:
+        return 'cicd'
+    elif 'backup' in content_lower or 'restore' in content_lower:
+        return 'operations'
+    elif 'architecture' in content_lower or 'design' in content_lower:
+        return 'architecture'
+    elif 'api' in content_lower or 'endpoint' in content_lower:
+        return 'api'
+    return 'development'
+
+
+LEGACY = {
+    'systematic-migration': legacy_systematic_destination,
+    'doc-migrator': legacy_doc_migrator_target,
+    'consolidation': legacy_consolidation_category,
+}
+
+SAMPLE_PATHS = [
+    'ci-cd/pipeline-templates.md',
+    'ci-cd/troubleshooting-pipelines.md',
+    'cicd/best-practices.md',
+    'ci-cd/workflow-conditions.md',
+    'pipeline/overview.md',
+    'development/git-workflow.md',
+    'development/branch-protection.md',
+    'dev-guide/quick-start.md',
+    'development/isolated-environment.md',
+    'development/worktrees.md',
+    'development/prerequisites.md',
+    'api/rest-endpoints.md',
+    'mcp/integration-strategy.md',
+    'mcp/migration-2.7-to-2.8.md',
+    'mcp/overview.md',
+    'deployment/nginx-proxy.md',
+    'deployment/portainer.md',
+    'deployment/docker-compose.md',
+    'deployment/complete-guide.md',
+    'services/gitea.md',
+    'gitea/setup.md',
+    'operations/backup-overview.md',
+    'operations/backup-procedures.md',
+    'operations/disaster-recovery.md',
+    'operations/incident-response.md',
+    'operations/startup.md',
+    'operations/shutdown.md',
+    'operations/service-management.md',
+    'stack/config.md',
+    'stack/troubleshoot-startup.md',
+    'stack/overview.md',
+    'agent-management/e055-progress.md',
+    'task-management/E057-status.md',
+    'task-management/e.057.md',
+    'agent-management/tech-lead-tony/notes.md',
+    'architecture/security-model.md',
+    'architecture/data-flow.md',
+    'architecture/network-topology.md',
+    'architecture/service-dependencies.md',
+    'architecture/overview.md',
+    'migration/tony-sdk-to-mosaic-sdk.md',
+    'migration/namespace-changes.md',
+    'migration/breaking-changes.md',
+    'orchestration/architecture.md',
+    'orchestration/routing.md',
+    'orchestration/plugins.md',
+    'orchestration/events.md',
+    'mosaic-stack/overview.md',
+    'mosaic-stack/version-roadmap.md',
+    'mosaic-stack/component-milestones.md',
+    'mosaic-stack/notes.md',
+    'troubleshooting/common-issues.md',
+    'bookstack/page-template.md',
+    'bookstack/sync-implementation.md',
+    'bookstack/shelves.md',
+    'README.md',
+    'epic-e.055.md',
+    'documentation-index.md',
+    'monitoring/alerts.md',
+    'integration/webhooks.md',
+    'security/secrets.md',
+    'testing/unit-tests.md',
+    'design/principles.md',
+    'postgres/tuning.md',
+    'misc/notes.md',
+    'Deployment/Guide.md',
+]
+
+SAMPLE_CONTENTS = [
+    '',
+    '# Notes\n\nProject planning for the next quarter.\n',
+    'A project without a plan.\n',
+    'How to back up and restore: run the backup job.\n',
+    'Deploy with docker, then install the agent.\n',
+    'Troubleshoot failing CI/CD pipeline runs.\n',
+    'Architecture and design of the API endpoint layer.\n',
+]
+
+# Keywords of all three chains, plus words none of them look for
+VOCABULARY = sorted({
+    'ci-cd', 'cicd', 'pipeline', 'template', 'troubleshoot', 'troubleshooting', 'best', 'practice',
+    'workflow', 'development', 'dev-guide', 'git', 'branch', 'quick', 'start', 'isolated',
+    'environment', 'worktree', 'api', 'mcp', 'integration', 'strategy', 'migration', '2.7', '2.8',
+    'deployment', 'nginx', 'portainer', 'docker', 'services', 'service', 'gitea', 'operations',
+    'backup', 'overview', 'disaster', 'recovery', 'incident', 'startup', 'shutdown', 'stack',
+    'config', 'agent-management', 'task-management', 'e055', 'e057', 'e.057', 'architecture',
+    'security', 'data', 'flow', 'network', 'depend', 'tony-sdk', 'mosaic-sdk', 'namespace',
+    'package', 'orchestration', 'routing', 'plugin', 'mosaic-stack', 'version', 'roadmap',
+    'component', 'milestone', 'bookstack', 'sync', 'implementation', 'readme', 'epic-e.055',
+    'documentation-index', 'monitoring', 'testing', 'design', 'postgres', 'epic', 'common-issues',
+    'agent-management/tech-lead-tony', 'notes', 'guide', 'misc', 'legacy', 'draft',
+})
+
+
+def random_paths(count, seed=42):
+    rng = random.Random(seed)
+    for _ in range(count):
+        words = rng.sample(VOCABULARY, rng.randint(1, 4))
+        directories = '/'.join(words[:-1])
+        name = f"{words[-1]}.md"
+        yield f"{directories}/{name}" if directories else name
+
+
+def comparable(rule_set, path):
+    """Whether the old chain's result is the intended behaviour for path
+
+    analyze_docs matched some keywords case-sensitively ('E055', 'deployment');
+    the classifier matches every keyword case-insensitively, so paths where
+    only the case differs are covered by test_consolidation_ignores_case instead.
+    """
+    if rule_set != 'consolidation':
+        return True
+    return path == path.lower() and 'e055' not in path and 'e057' not in path
+
+
+class TestAgainstLegacyChains:
+    """The YAML rule sets classify exactly as the if/elif chains did."""
+
+    @pytest.mark.parametrize('rule_set', sorted(LEGACY))
+    @pytest.mark.parametrize('path', SAMPLE_PATHS)
+    def test_sample_paths(self, rule_set, path):
+        if not comparable(rule_set, path):
+            pytest.skip('case-sensitive in the old chain')
+        classifier = load_classifier(rule_set)
+        for content in SAMPLE_CONTENTS:
+            assert classifier.classify(path, content) == LEGACY[rule_set](path, content), (path, content)
+
+    @pytest.mark.parametrize('rule_set', sorted(LEGACY))
+    def test_random_paths(self, rule_set):
+        classifier = load_classifier(rule_set)
+        rng = random.Random(rule_set)
+        mismatches = []
+        for path in random_paths(3000):
+            if not comparable(rule_set, path):
+                continue
+            content = rng.choice(SAMPLE_CONTENTS)
+            expected = LEGACY[rule_set](path, content)
+            if classifier.classify(path, content) != expected:
+                mismatches.append((path, content, expected))
+        assert mismatches == []
+
+    def test_consolidation_ignores_case(self):
+        classifier = load_classifier('consolidation')
+        assert classifier.classify('Deployment/Guide.md', '') == 'deployment'
+        assert classifier.classify('notes/e055-status.md', '') == 'epics'
+        assert classifier.classify('notes/E055-status.md', '') == 'epics'
+
+
+class TestClassifier:
+    """Rule evaluation details."""
+
+    def test_content_only_read_when_needed(self):
+        classifier = load_classifier('systematic-migration')
+        calls = []
+
+        def content():
+            calls.append(1)
+            return 'project planning'
+
+        assert classifier.classify('api/overview.md', content) == \
+            'engineering/api-documentation/rest-apis/01-api-overview.md'
+        assert calls == []
+        assert classifier.classify('misc/notes.md', content) == \
+            'projects/project-management/planning-methodology/01-project-planning.md'
+        assert calls == [1]
+
+    def test_null_target_matches_but_skips(self):
+        classifier = load_classifier('systematic-migration')
+        rule = classifier.match('guides/README.md')
+        assert rule is not None and rule.target is None
+        assert classifier.classify('guides/README.md') is None
+
+    def test_priority_before_declaration_order(self):
+        classifier = Classifier.from_dict('test', {'rules': [
+            {'path': ['guide'], 'target': 'first'},
+            {'path': ['guide'], 'target': 'urgent', 'priority': 10},
+        ]})
+        assert classifier.classify('guide.md') == 'urgent'
+
+    def test_all_groups_must_match(self):
+        classifier = Classifier.from_dict('test', {'rules': [
+            {'path': [['deploy', 'install'], ['docker']], 'target': 'docker'},
+            {'target': 'default'},
+        ]})
+        assert classifier.classify('install-docker.md') == 'docker'
+        assert classifier.classify('install-podman.md') == 'default'
+
+    def test_rule_without_target_is_rejected(self):
+        with pytest.raises(ValueError, match='rule 1 has no target'):
+            Classifier.from_dict('test', {'rules': [{'path': ['api']}]})
+
+    def test_unknown_rule_set(self):
+        with pytest.raises(KeyError):
+            load_classifier('no-such-rule-set')
+
+
+class TestKeywordMatcher:
+    """One-pass keyword scanning."""
+
+    def test_overlapping_keywords(self):
+        matcher = KeywordMatcher(['deploy', 'deployment', 'ment'])
+        assert matcher.find('Deployment guide') == {'deploy', 'deployment', 'ment'}
+
+    def test_case_insensitive(self):
+        assert KeywordMatcher(['gitea']).find('GITEA.md') == {'gitea'}
+
+    def test_empty(self):
+        assert KeywordMatcher([]).find('anything') == frozenset()
+        assert KeywordMatcher(['api']).find('') == frozenset()
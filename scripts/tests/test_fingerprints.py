@@ -0,0 +1,98 @@
+"""Tests for paragraph and section fingerprints used when merging migrated content."""
+
+from mosaic_docs.fingerprints import (ParagraphIndex, fingerprint, is_content, split_blocks,
+                                      split_sections)
+
+INTRO = 'This page explains how the service is deployed to the cluster.'
+STEPS = '- Build the image\n- Push it to the registry\n- Roll out the new release'
+CODE = '```bash\ndocker compose up -d\n\nkubectl rollout status deploy/api\n```'
+TROUBLESHOOT = 'When the rollout stalls, check the readiness probe and the logs.'
+
+PAGE = f"# Deploy\n\n{INTRO}\n\n## Steps\n\n{STEPS}\n\n{CODE}\n"
+
+
+class TestBlocks:
+    """Splitting markdown into blocks and sections."""
+
+    def test_split_blocks(self):
+        assert split_blocks(PAGE) == ['# Deploy', INTRO, '## Steps', STEPS, CODE]
+
+    def test_fence_keeps_blank_lines_and_headings(self):
+        text = '```\n# not a heading\n\nstill code\n```\nafter'
+        assert split_blocks(text) == ['```\n# not a heading\n\nstill code\n```', 'after']
+
+    def test_heading_is_its_own_block(self):
+        assert split_blocks('text above\n## Heading\ntext below') == ['text above', '## Heading', 'text below']
+
+    def test_split_sections(self):
+        sections = list(split_sections(split_blocks(f"{INTRO}\n\n# One\n\n{STEPS}\n\n# Two")))
+        assert sections == [[INTRO], ['# One', STEPS], ['# Two']]
+
+    def test_short_blocks_are_not_content(self):
+        assert not is_content('TODO')
+        assert not is_content('---')
+        assert not is_content('# A heading long enough to pass the length check')
+        assert is_content(INTRO)
+
+
+class TestFingerprint:
+    """Normalised hashing."""
+
+    def test_ignores_whitespace_and_case(self):
+        assert fingerprint('Hello   World\nagain') == fingerprint('hello world again')
+
+    def test_differs_on_words(self):
+        assert fingerprint('hello world') != fingerprint('hello there')
+
+
+class TestParagraphIndex:
+    """Keeping only what a page does not already have."""
+
+    def test_new_text_unchanged(self):
+        index = ParagraphIndex(PAGE)
+        text = f"## Troubleshooting\n\n{TROUBLESHOOT}\n"
+        assert index.novel(text) == text
+
+    def test_same_page_twice_is_dropped(self):
+        index = ParagraphIndex(PAGE)
+        assert index.novel(PAGE) == ''
+        assert index.skipped_sections == 2
+
+    def test_reformatted_duplicate_is_dropped(self):
+        index = ParagraphIndex(PAGE)
+        reflowed = PAGE.replace('deployed to the cluster', 'deployed  to\nthe CLUSTER')
+        assert index.novel(reflowed) == ''
+
+    def test_known_paragraphs_removed_from_new_section(self):
+        index = ParagraphIndex(PAGE)
+        merged = index.novel(f"## Rollout\n\n{INTRO}\n\n{TROUBLESHOOT}\n")
+        assert merged == f"## Rollout\n\n{TROUBLESHOOT}"
+        assert index.skipped_paragraphs == 1
+
+    def test_section_with_nothing_new_loses_heading(self):
+        index = ParagraphIndex(PAGE)
+        merged = index.novel(f"## Again\n\n{INTRO}\n\n## Troubleshooting\n\n{TROUBLESHOOT}\n")
+        assert merged == f"## Troubleshooting\n\n{TROUBLESHOOT}"
+
+    def test_repeats_within_text(self):
+        index = ParagraphIndex()
+        merged = index.novel(f"{TROUBLESHOOT}\n\n{INTRO}\n\n{TROUBLESHOOT}\n")
+        assert merged == f"{TROUBLESHOOT}\n\n{INTRO}"
+
+    def test_novel_text_is_indexed(self):
+        index = ParagraphIndex()
+        text = f"## Troubleshooting\n\n{TROUBLESHOOT}\n"
+        assert index.novel(text) == text
+        assert index.novel(text) == ''
+
+    def test_short_blocks_never_deduplicated(self):
+        index = ParagraphIndex('TODO\n\n---\n')
+        assert index.novel('TODO\n\n---\n') == 'TODO\n\n---\n'
+
+    def test_sources_sharing_content(self):
+        # Two legacy files merged into one page: the second adds only its own paragraph
+        index = ParagraphIndex('# Deploy\n')
+        first = index.novel(f"{INTRO}\n\n{STEPS}\n")
+        second = index.novel(f"{INTRO}\n\n{TROUBLESHOOT}\n")
+        assert first == f"{INTRO}\n\n{STEPS}\n"
+        assert second == TROUBLESHOOT
@@ -0,0 +1,132 @@
+"""Tests for the validator's language server mode (validate-bookstack-structure.py --lsp)."""
+
+import json
+import queue
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from conftest import SCRIPTS_DIR, write_pages
+from mosaic_docs.lsp import LspStream, path_to_uri
+
+STRUCTURE = """\
+structure:
+  - shelf:
+      name: Engineering
+      slug: engineering
+      books:
+        - book:
+            name: Guide
+            slug: guide
+            chapters:
+              - chapter: {name: Setup, slug: setup, pages: [01-install]}
+"""
+
+
+class Client:
+    """Talks to a server subprocess over stdio with Content-Length framing."""
+
+    def __init__(self, process):
+        self.process = process
+        self.stream = LspStream(process.stdout, process.stdin)
+        self.messages = queue.Queue()
+        self.next_id = 1
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        while True:
+            message = self.stream.read()
+            self.messages.put(message)
+            if message is None:
+                return
+
+    def receive(self, timeout=20):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            pytest.fail('no message from the language server')
+
+    def request(self, method, params):
+        request_id = self.next_id
+        self.next_id += 1
+        self.stream.write({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+        while True:
+            message = self.receive()
+            assert message is not None, 'server closed the stream'
+            if message.get('id') == request_id:
+                return message
+
+    def notify(self, method, params):
+        self.stream.write({'jsonrpc': '2.0', 'method': method, 'params': params})
+
+    def diagnostics(self):
+        """The next publishDiagnostics notification's params"""
+        message = self.receive()
+        assert message is not None and message['method'] == 'textDocument/publishDiagnostics', message
+        return message['params']
+
+
+@pytest.fixture
+def server(docs, tmp_path):
+    structure = tmp_path / 'bookstack-structure.yaml'
+    structure.write_text(STRUCTURE)
+    write_pages(docs, {'engineering/guide/setup/01-install.md': '# Install\n'})
+    process = subprocess.Popen(
+        [sys.executable, str(SCRIPTS_DIR / 'validate-bookstack-structure.py'), str(docs), str(structure),
+         '--lsp', '--rules', 'naming_convention', '--poll-interval', '0'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    client = Client(process)
+    yield client
+    if process.poll() is None:
+        process.kill()
+    process.wait(timeout=20)
+    process.stdin.close()
+    process.stdout.close()
+    process.stderr.close()
+
+
+def test_round_trip(server, docs):
+    response = server.request('initialize', {'processId': None, 'rootUri': path_to_uri(docs), 'capabilities': {}})
+    assert response['result']['serverInfo'] == {'name': 'bookstack-structure'}
+    assert response['result']['capabilities']['textDocumentSync']['change'] == 1
+    server.notify('initialized', {})
+
+    # An unsaved buffer with a bad page name is checked as opened
+    uri = path_to_uri(docs / 'engineering' / 'guide' / 'setup' / 'Bad_Name.md')
+    server.notify('textDocument/didOpen', {'textDocument': {
+        'uri': uri, 'languageId': 'markdown', 'version': 1, 'text': '# Bad\n'}})
+    params = server.diagnostics()
+    assert params['uri'] == uri
+    assert [(d['code'], d['severity'], d['source']) for d in params['diagnostics']] == \
+        [('naming_convention', 1, 'bookstack-structure')]
+
+    # Closing a buffer that is not on disk clears its diagnostics
+    server.notify('textDocument/didClose', {'textDocument': {'uri': uri}})
+    assert server.diagnostics() == {'uri': uri, 'diagnostics': []}
+
+    assert server.request('shutdown', None)['result'] is None
+    server.notify('exit', None)
+    assert server.receive() is None
+    assert server.process.wait(timeout=20) == 0
+
+
+def test_unknown_request(server, docs):
+    server.request('initialize', {'processId': None, 'rootUri': path_to_uri(docs), 'capabilities': {}})
+    response = server.request('textDocument/hover', {})
+    assert response['error']['code'] == -32601
+
+
+def test_framing_survives_unicode(tmp_path):
+    # Content-Length counts bytes, not characters
+    path = tmp_path / 'stream'
+    with open(path, 'wb') as f:
+        LspStream(None, f).write({'text': 'Überblick – Ähnlich'})
+    with open(path, 'rb') as f:
+        raw = f.read()
+        f.seek(0)
+        assert LspStream(f, None).read() == {'text': 'Überblick – Ähnlich'}
+    header, _, body = raw.partition(b'\r\n\r\n')
+    assert header == f"Content-Length: {len(body)}".encode('ascii')
+    assert json.loads(body)['text'] == 'Überblick – Ähnlich'
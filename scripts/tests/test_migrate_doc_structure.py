@@ -0,0 +1,69 @@
+"""Tests for migrate-doc-structure.py: renumbering pages and rewriting the links to them."""
+
+import pytest
+
+from conftest import load_script, tree, write_pages
+from mosaic_docs.numbering import NumberAllocator
+
+migrate_doc_structure = load_script('migrate-doc-structure')
+
+STRUCTURE = """\
+structure:
+  - shelf:
+      name: Engineering
+      slug: eng
+      books:
+        - book:
+            name: Guide
+            slug: guide
+            chapters:
+              - chapter: {name: Setup, slug: setup, pages: [01-install, 03-configure]}
+"""
+
+PAGES = {
+    'eng/guide/setup/01-install.md': '# Install\n\nNext: [configure](03-configure.md).\n',
+    'eng/guide/setup/03-configure.md': '# Configure\n\n## Settings\n',
+    'eng/guide/extra/01-intro.md': '# Intro\n\nSee [tuning](04-tuning.md#cache).\n',
+    'eng/guide/extra/04-tuning.md': '# Tuning\n\n## Cache\n\nBack to [intro](01-intro.md).\n',
+    'eng/index.md': '# Index\n\n- [Tuning](guide/extra/04-tuning.md)\n- [Configure](guide/setup/03-configure.md)\n',
+}
+
+
+@pytest.fixture
+def migrator(docs, tmp_path):
+    write_pages(docs, PAGES)
+    structure = tmp_path / 'structure.yaml'
+    structure.write_text(STRUCTURE)
+    migrator = migrate_doc_structure.DocMigrator(str(docs), str(structure))
+    # Renumber the tree as it is, without the classifier's suggested moves
+    migrator.allocator = NumberAllocator(migrator.corpus)
+    return migrator
+
+
+class TestCompaction:
+    """--compact renumbering."""
+
+    def test_structure_chapters_skipped(self, migrator):
+        renames = migrator.compaction_plan()
+        assert [(rename['source'], rename['target']) for rename in renames] == [
+            ('eng/guide/extra/04-tuning.md', 'eng/guide/extra/02-tuning.md')]
+        assert migrator.compaction_skipped == ['eng/guide/setup']
+        assert '- `eng/guide/setup`' in migrator.generate_migration_report(renames)
+
+    def test_links_rewritten_across_corpus(self, migrator, docs):
+        renames = migrator.compaction_plan()
+        migrator.begin(renames)
+        assert migrator.perform_compaction(renames, dry_run=False)
+        migrator.finish()
+
+        pages = tree(docs)
+        assert 'eng/guide/extra/04-tuning.md' not in pages
+        assert pages['eng/guide/extra/02-tuning.md'] == PAGES['eng/guide/extra/04-tuning.md']
+        assert pages['eng/guide/extra/01-intro.md'] == '# Intro\n\nSee [tuning](02-tuning.md#cache).\n'
+        assert pages['eng/index.md'] == \
+            '# Index\n\n- [Tuning](guide/extra/02-tuning.md)\n- [Configure](guide/setup/03-configure.md)\n'
+        assert pages['eng/guide/setup/01-install.md'] == PAGES['eng/guide/setup/01-install.md']
+
+    def test_dry_run_changes_nothing(self, migrator, docs):
+        migrator.perform_compaction(migrator.compaction_plan(), dry_run=True)
+        assert tree(docs) == PAGES
@@ -0,0 +1,39 @@
+"""Tests for the SQLite migration state store."""
+
+from mosaic_docs.migration_state import STATE_FILE, MigrationState
+from mosaic_docs.transaction import MIGRATIONS_DIR
+
+
+class TestSnapshot:
+    """The read-only copy dry runs work on."""
+
+    def test_no_store_creates_nothing(self, docs):
+        state = MigrationState.snapshot(docs)
+        state.record('a.md', 'book/01-a.md', 'SUCCESS')
+        assert state.processed() == {'a.md'}
+        assert not (docs / MIGRATIONS_DIR).exists()
+
+    def test_copies_stored_state_without_touching_it(self, docs):
+        stored = MigrationState(docs)
+        stored.record('a.md', 'book/01-a.md', 'SUCCESS')
+        stored.close()
+        files = sorted(path.name for path in (docs / MIGRATIONS_DIR).iterdir())
+        content = (docs / MIGRATIONS_DIR / STATE_FILE).read_bytes()
+
+        state = MigrationState.snapshot(docs)
+        assert state.processed() == {'a.md'}
+        state.record('b.md', 'book/02-b.md', 'SUCCESS')
+        state.close()
+
+        assert sorted(path.name for path in (docs / MIGRATIONS_DIR).iterdir()) == files
+        assert (docs / MIGRATIONS_DIR / STATE_FILE).read_bytes() == content
+        assert MigrationState(docs).processed() == {'a.md'}
+
+    def test_reads_pending_write_ahead_log(self, docs):
+        # A writer that is still open has its changes in the -wal file only
+        writer = MigrationState(docs)
+        writer.record('a.md', 'book/01-a.md', 'SUCCESS')
+        try:
+            assert MigrationState.snapshot(docs).processed() == {'a.md'}
+        finally:
+            writer.close()
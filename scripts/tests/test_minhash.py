@@ -0,0 +1,181 @@
+"""Tests for MinHash signatures, LSH banding and near-duplicate clustering."""
+
+import os
+import random
+
+import pytest
+
+from conftest import write_pages
+from mosaic_docs.corpus import DocCorpus
+from mosaic_docs.minhash import (NearDuplicateFinder, SignatureStore, find_near_duplicates, lsh_bands,
+                                 shingles, signature, similarity)
+
+WORDS = [f"word{i}" for i in range(2000)]
+
+
+def document(seed, length=400):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def edited(text, fraction, seed=0):
+    """text with a fraction of its words replaced"""
+    rng = random.Random(seed)
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = f"edit{rng.randrange(10 ** 6)}"
+    return ' '.join(words)
+
+
+def jaccard(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+class TestShingles:
+    """Word n-grams of a body."""
+
+    def test_word_ngrams(self):
+        assert shingles('One two three four', size=2) == {'one two', 'two three', 'three four'}
+
+    def test_short_text_is_one_shingle(self):
+        assert shingles('Just three words', size=5) == {'just three words'}
+        assert shingles('', size=5) == set()
+
+    def test_frontmatter_excluded(self):
+        text = '---\ntitle: Something else entirely\n---\nOne two three four\n'
+        assert shingles(text, size=2) == {'one two', 'two three', 'three four'}
+
+
+class TestSignature:
+    """MinHash signatures and their similarity estimate."""
+
+    def test_empty_document(self):
+        assert signature('') is None
+        assert signature('---\ntitle: x\n---\n') is None
+
+    def test_deterministic_and_sized(self):
+        text = document(1)
+        assert signature(text, num_perm=64) == signature(text, num_perm=64)
+        assert len(signature(text, num_perm=64)) == 64
+
+    def test_identical_and_unrelated(self):
+        a, b = document(1), document(2)
+        assert similarity(signature(a), signature(a)) == 1.0
+        assert similarity(signature(a), signature(b)) < 0.1
+
+    @pytest.mark.parametrize('fraction', [0.02, 0.05, 0.1, 0.2])
+    def test_estimates_jaccard(self, fraction):
+        a = document(3)
+        b = edited(a, fraction)
+        estimate = similarity(signature(a, num_perm=256), signature(b, num_perm=256))
+        assert abs(estimate - jaccard(a, b)) < 0.1
+
+    def test_tiny_document_fills_every_position(self):
+        # Fewer shingles than positions: empty bins borrow from their neighbours
+        sig = signature('alpha beta gamma delta epsilon zeta', num_perm=128)
+        assert sig is not None and None not in sig
+
+
+class TestLshBands:
+    """Choosing bands and rows for a threshold."""
+
+    @pytest.mark.parametrize('threshold', [0.5, 0.7, 0.8, 0.9])
+    def test_threshold_not_exceeded(self, threshold):
+        bands, rows = lsh_bands(threshold, 128)
+        assert bands * rows <= 128
+        assert (1 / bands) ** (1 / rows) <= threshold
+
+    def test_higher_threshold_more_rows(self):
+        assert lsh_bands(0.9)[1] >= lsh_bands(0.5)[1]
+
+
+class TestNearDuplicateFinder:
+    """Pairs and clusters above the threshold."""
+
+    def test_clusters(self):
+        base, other = document(10), document(11)
+        texts = {
+            'a.md': base,
+            'b.md': edited(base, 0.01, seed=1),
+            'c.md': edited(base, 0.01, seed=2),
+            'd.md': other,
+            'e.md': edited(other, 0.01, seed=3),
+            'f.md': document(12),
+        }
+        finder = NearDuplicateFinder(threshold=0.8)
+        for key, text in texts.items():
+            finder.add(key, signature(text))
+        finder.add('empty.md', None)
+
+        clusters = finder.clusters()
+        assert [cluster.members for cluster in clusters] == [['a.md', 'b.md', 'c.md'], ['d.md', 'e.md']]
+        assert all(0.8 <= score <= 1.0 for cluster in clusters for _, _, score in cluster.pairs)
+        assert clusters[0].mean_similarity <= clusters[0].max_similarity
+
+    def test_pairs_ordered_most_similar_first(self):
+        base = document(20)
+        finder = NearDuplicateFinder(threshold=0.5)
+        finder.add('base.md', signature(base))
+        finder.add('close.md', signature(edited(base, 0.01)))
+        finder.add('far.md', signature(edited(base, 0.05)))
+        scores = [score for _, _, score in finder.pairs()]
+        assert scores == sorted(scores, reverse=True)
+        assert all(a < b for a, b, _ in finder.pairs())
+
+    def test_nothing_similar(self):
+        finder = NearDuplicateFinder()
+        for seed in range(5):
+            finder.add(f"{seed}.md", signature(document(100 + seed)))
+        assert finder.pairs() == []
+        assert finder.clusters() == []
+
+
+class TestSignatureStore:
+    """Cached signatures."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = SignatureStore(db_path=tmp_path / 'signatures.sqlite')
+        yield store
+        store.close()
+
+    def test_cache_hits_and_invalidation(self, store, docs):
+        write_pages(docs, {'a.md': document(30), 'b.md': document(31)})
+        paths = [str(docs / 'a.md'), str(docs / 'b.md')]
+
+        first = store.signatures(paths)
+        assert store.stats == {'hits': 0, 'rehashed': 0, 'computed': 2}
+        assert store.signatures(paths) == first
+        assert store.stats['hits'] == 2
+
+        # Touched but unchanged: hashed, not re-shingled
+        stat = os.stat(paths[0])
+        os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        store.signatures(paths)
+        assert store.stats['rehashed'] == 1
+
+        (docs / 'b.md').write_text(document(32))
+        result = store.signatures(paths)
+        assert store.stats['computed'] == 3
+        assert result[paths[1]] == signature(document(32))
+
+    def test_missing_and_empty_files(self, store, docs):
+        write_pages(docs, {'empty.md': ''})
+        result = store.signatures([str(docs / 'empty.md'), str(docs / 'missing.md')])
+        assert result == {str(docs / 'empty.md'): None}
+
+
+def test_find_near_duplicates(docs, tmp_path):
+    base = document(40)
+    write_pages(docs, {
+        'legacy/setup.md': base,
+        'legacy/old/setup-copy.md': edited(base, 0.01),
+        'legacy/other.md': document(41),
+    })
+    store = SignatureStore(db_path=tmp_path / 'signatures.sqlite')
+    try:
+        clusters = find_near_duplicates(DocCorpus(docs), threshold=0.8, store=store)
+    finally:
+        store.close()
+    assert [cluster.members for cluster in clusters] == [['legacy/old/setup-copy.md', 'legacy/setup.md']]
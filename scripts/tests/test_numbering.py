@@ -0,0 +1,123 @@
+"""Tests for per-directory page number allocation."""
+
+import pytest
+
+from conftest import write_pages
+from mosaic_docs.corpus import DocCorpus
+from mosaic_docs.numbering import NumberAllocator, page_number, strip_number
+
+
+@pytest.fixture
+def allocator(docs):
+    write_pages(docs, {
+        'book/chapter/01-intro.md': '# Intro\n',
+        'book/chapter/02-setup.md': '# Setup\n',
+        'book/chapter/05-deploy.md': '# Deploy\n',
+        'book/chapter/notes.md': '# Notes\n',
+        'book/other/01-start.md': '# Start\n',
+    })
+    return NumberAllocator(DocCorpus(docs))
+
+
+class TestPageNumber:
+    """Parsing the NN- prefix."""
+
+    @pytest.mark.parametrize('name, number', [
+        ('01-intro.md', 1),
+        ('12-deploy.md', 12),
+        ('100-appendix.md', 100),
+        ('1-short.md', None),
+        ('intro.md', None),
+        ('01intro.md', None),
+    ])
+    def test_page_number(self, name, number):
+        assert page_number(name) == number
+
+    def test_strip_number(self):
+        assert strip_number('05-deploy.md') == 'deploy.md'
+        assert strip_number('deploy.md') == 'deploy.md'
+        assert strip_number('01-02-twice.md') == '02-twice.md'
+
+
+class TestAllocator:
+    """Handing out unique numbers within a run."""
+
+    def test_indexes_corpus(self, allocator):
+        assert allocator.numbers('book/chapter') == {1, 2, 5}
+        assert allocator.next_number('book/chapter') == 6
+        assert allocator.next_number('book/other') == 2
+        assert allocator.next_number('book/empty') == 1
+
+    def test_free_number_is_kept(self, allocator):
+        assert allocator.assign('book/chapter', '03-config.md') == '03-config.md'
+        assert allocator.numbers('book/chapter') == {1, 2, 3, 5}
+
+    def test_taken_number_is_replaced(self, allocator):
+        assert allocator.assign('book/chapter', '02-install.md') == '06-install.md'
+        assert allocator.assign('book/chapter', '02-upgrade.md') == '07-upgrade.md'
+
+    def test_unnumbered_name_gets_next(self, allocator):
+        assert allocator.assign('book/chapter', 'faq.md') == '06-faq.md'
+        assert allocator.assign('book/new', 'faq.md') == '01-faq.md'
+
+    def test_same_run_never_collides(self, allocator):
+        names = [allocator.assign('book/other', '01-page.md') for _ in range(20)]
+        assert len(set(page_number(name) for name in names)) == 20
+        assert 1 not in {page_number(name) for name in names}
+
+    def test_released_numbers_stay_reserved(self, allocator):
+        allocator.release('book/chapter/05-deploy.md')
+        assert allocator.assign('book/chapter', '05-deploy.md') == '06-deploy.md'
+
+    def test_directory_outside_scan(self, docs):
+        write_pages(docs, {
+            'live/01-page.md': '# Page\n',
+            'archive/03-old.md': '# Old\n',
+        })
+        allocator = NumberAllocator(DocCorpus(docs, ignore_dirs=['archive']))
+        # Ignored by the corpus, but its files still take numbers
+        assert allocator.next_number('archive') == 4
+        assert allocator.next_number('live') == 2
+
+    def test_partial_corpus_scans_other_directories(self, docs):
+        write_pages(docs, {
+            'book/01-a.md': '# A\n',
+            'book/04-b.md': '# B\n',
+            'other/02-c.md': '# C\n',
+        })
+        allocator = NumberAllocator(DocCorpus(docs, paths=['other/02-c.md']))
+        assert allocator.assign('book', '01-a-copy.md') == '05-a-copy.md'
+
+
+class TestCompaction:
+    """Planning renames that close gaps and duplicates."""
+
+    def test_closes_gaps_in_order(self, allocator):
+        assert allocator.compaction_plan('book/chapter') == {
+            'book/chapter': [('05-deploy.md', '03-deploy.md')],
+        }
+
+    def test_resolves_duplicates(self, docs):
+        write_pages(docs, {
+            'book/01-b.md': '# B\n',
+            'book/01-a.md': '# A\n',
+            'book/03-c.md': '# C\n',
+        })
+        allocator = NumberAllocator(DocCorpus(docs))
+        assert allocator.compaction_plan() == {
+            'book': [('01-b.md', '02-b.md')],
+        }
+
+    def test_includes_assigned_and_drops_released(self, allocator):
+        allocator.release('book/chapter/01-intro.md')
+        allocator.assign('book/chapter', 'faq.md')
+        assert allocator.compaction_plan('book/chapter') == {
+            'book/chapter': [
+                ('02-setup.md', '01-setup.md'),
+                ('05-deploy.md', '02-deploy.md'),
+                ('06-faq.md', '03-faq.md'),
+            ],
+        }
+
+    def test_nothing_to_do(self, allocator):
+        assert allocator.compaction_plan('book/other') == {}
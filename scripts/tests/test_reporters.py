@@ -0,0 +1,113 @@
+"""Tests for the streaming validation reporters."""
+
+import json
+
+import pytest
+
+from mosaic_docs.reporters import JsonlReporter, SarifReporter
+from mosaic_docs.rules import ValidationError
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A repository with its docs under docs/."""
+    (tmp_path / '.git').mkdir()
+    (tmp_path / 'docs' / 'book').mkdir(parents=True)
+    return tmp_path
+
+
+def run(reporter, repo, findings):
+    docs_root = repo / 'docs'
+    reporter.start(str(docs_root / 'bookstack-structure.yaml'), docs_root)
+    for rule_name, finding in findings:
+        reporter.emit(finding, rule_name)
+    reporter.finish({'errors': len(findings)})
+
+
+def findings_in(repo):
+    """(rule name, finding) pairs: three file findings and one structure finding."""
+    page = str(repo / 'docs' / 'book' / '01 page.md')
+    return [
+        ('naming_convention', ValidationError('warning', 'naming_convention', page, 'Bad name')),
+        ('filesystem_structure', ValidationError('error', 'missing_page', page, 'Missing page')),
+        ('naming_convention', ValidationError('warning', 'naming_convention', page, 'Another bad name')),
+        ('structure_definition', ValidationError('error', 'duplicate_slug', 'shelf/book', 'Duplicate slug')),
+    ]
+
+
+class TestSarifReporter:
+    """SARIF output code scanning can resolve."""
+
+    @pytest.fixture
+    def log(self, repo):
+        output = repo / 'report.sarif'
+        run(SarifReporter(output), repo, findings_in(repo))
+        return json.loads(output.read_text())
+
+    def test_locations_relative_to_repository(self, log, repo):
+        run_ = log['runs'][0]
+        assert run_['originalUriBaseIds'] == {'%SRCROOT%': {'uri': repo.as_uri() + '/'}}
+        locations = [result['locations'][0]['physicalLocation']['artifactLocation']
+                     for result in run_['results']]
+        assert locations[0] == {'uri': 'docs/book/01%20page.md', 'uriBaseId': '%SRCROOT%'}
+        # Structure findings point at the structure definition, naming the entry in the message
+        assert locations[3] == {'uri': 'docs/bookstack-structure.yaml', 'uriBaseId': '%SRCROOT%'}
+        assert run_['results'][3]['message']['text'] == 'shelf/book: Duplicate slug'
+
+    def test_rules_resolve(self, log):
+        run_ = log['runs'][0]
+        rules = run_['tool']['driver']['rules']
+        assert [rule['id'] for rule in rules] == ['naming_convention', 'missing_page', 'duplicate_slug']
+        for result in run_['results']:
+            assert rules[result['ruleIndex']]['id'] == result['ruleId']
+        assert rules[1]['properties'] == {'rule': 'filesystem_structure'}
+        assert rules[1]['shortDescription']['text']
+
+    def test_levels(self, log):
+        assert [result['level'] for result in log['runs'][0]['results']] == \
+            ['warning', 'error', 'warning', 'error']
+
+    def test_empty_run_is_valid(self, repo):
+        output = repo / 'empty.sarif'
+        run(SarifReporter(output), repo, [])
+        log = json.loads(output.read_text())
+        assert log['runs'][0]['results'] == []
+        assert log['runs'][0]['tool']['driver']['rules'] == []
+
+    @pytest.mark.parametrize('docs_root', ['.', './', 'DOCS/'])
+    def test_docs_root_spellings(self, repo, monkeypatch, docs_root):
+        # Findings use paths relative to the current directory, as the validator reports them
+        monkeypatch.chdir(repo / 'docs')
+        (repo / 'docs' / 'shelf' / 'book').mkdir(parents=True)
+        docs_root = docs_root.replace('DOCS', str(repo / 'docs'))
+        output = repo / 'report.sarif'
+        reporter = SarifReporter(output)
+        reporter.start('bookstack-structure.yaml', docs_root)
+        reporter.emit(ValidationError('warning', 'naming_convention', 'book/01 page.md', 'Bad name'),
+                      'naming_convention')
+        reporter.emit(ValidationError('warning', 'missing_directory', 'shelf/book', 'Missing directory'),
+                      'filesystem_structure')
+        reporter.emit(ValidationError('error', 'duplicate_slug', 'shelf/book', 'Duplicate slug'),
+                      'unique_slugs')
+        reporter.finish({})
+
+        results = json.loads(output.read_text())['runs'][0]['results']
+        uris = [result['locations'][0]['physicalLocation']['artifactLocation']['uri'] for result in results]
+        assert uris == ['docs/book/01%20page.md', 'docs/shelf/book', 'docs/bookstack-structure.yaml']
+        assert [result['message']['text'] for result in results] == \
+            ['Bad name', 'Missing directory', 'shelf/book: Duplicate slug']
+
+    def test_outside_repository(self, tmp_path, repo):
+        outside = tmp_path.parent / 'elsewhere.md'
+        reporter = SarifReporter(repo / 'report.sarif')
+        reporter.start(str(repo / 'docs' / 'bookstack-structure.yaml'), repo / 'docs')
+        assert reporter.artifact_location(str(outside)) == {'uri': outside.as_uri()}
+        reporter.finish({})
+
+
+def test_jsonl_reporter(repo):
+    output = repo / 'report.jsonl'
+    run(JsonlReporter(output), repo, findings_in(repo))
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [line['rule'] for line in lines[:-1]] == [finding.rule for _, finding in findings_in(repo)]
+    assert lines[-1] == {'summary': {'errors': 4}}
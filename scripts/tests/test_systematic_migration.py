@@ -0,0 +1,159 @@
+"""Tests for systematic-migration.py: parallel workers and resuming an interrupted run."""
+
+import os
+
+import pytest
+
+from conftest import load_script, tree, write_pages
+from mosaic_docs.migration_state import MigrationState
+
+migration = load_script('systematic-migration')
+
+# Legacy files and the destinations the classifier sends them to (several sources each)
+LEGACY = {
+    'ci-cd/pipeline-templates.md': 'engineering/cicd-handbook/pipeline-setup/03-pipeline-templates.md',
+    'ci-cd/more-templates.md': 'engineering/cicd-handbook/pipeline-setup/03-pipeline-templates.md',
+    'ci-cd/template-library.md': 'engineering/cicd-handbook/pipeline-setup/03-pipeline-templates.md',
+    'ci-cd/troubleshoot-runners.md': 'engineering/cicd-handbook/best-practices/03-troubleshooting.md',
+    'ci-cd/troubleshoot-caches.md': 'engineering/cicd-handbook/best-practices/03-troubleshooting.md',
+    'api/rest.md': 'engineering/api-documentation/rest-apis/01-api-overview.md',
+    'api/auth.md': 'engineering/api-documentation/rest-apis/01-api-overview.md',
+    'api/errors.md': 'engineering/api-documentation/rest-apis/01-api-overview.md',
+    'mcp/overview.md': 'engineering/api-documentation/mcp-protocol/01-mcp-overview.md',
+    'mcp/servers.md': 'engineering/api-documentation/mcp-protocol/01-mcp-overview.md',
+    'deployment/docker-compose.md': 'platform/installation/deployment/02-docker-deployment.md',
+    'deployment/docker-swarm.md': 'platform/installation/deployment/02-docker-deployment.md',
+    'misc/notes.md': None,
+}
+
+
+def paragraph(rel_path):
+    """A paragraph unique to one legacy file, long enough to survive deduplication"""
+    return f"This paragraph was written for {rel_path} and appears nowhere else in the tree."
+
+
+def legacy_pages():
+    return {f"_old/{rel_path}": f"# {rel_path}\n\n{paragraph(rel_path)}\n" for rel_path in LEGACY}
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A checkout with legacy files under docs/_old; the migrator works relative to it."""
+    root = tmp_path / 'work'
+    write_pages(root / 'docs', legacy_pages())
+    monkeypatch.chdir(root)
+    return root
+
+
+def migrate(**kwargs):
+    migrator = migration.DocumentMigrator()
+    try:
+        migrator.run(**kwargs)
+    finally:
+        migrator.state.close()
+    return migrator
+
+
+def migrated_tree(root):
+    """The docs tree without the scratchpad, which records when it was written"""
+    return {path: content for path, content in tree(root / 'docs').items()
+            if path != 'MIGRATION-SCRATCHPAD.md'}
+
+
+def check_migrated(root):
+    """Every legacy file merged exactly once into its destination and moved to _moved"""
+    pages = migrated_tree(root)
+    for rel_path, destination in LEGACY.items():
+        if destination is None:
+            assert f"_old/{rel_path}" in pages
+            continue
+        assert f"_old/_moved/{rel_path}" in pages and f"_old/{rel_path}" not in pages
+        assert sum(content.count(paragraph(rel_path)) for path, content in pages.items()
+                   if not path.startswith('_old/')) == 1
+        assert paragraph(rel_path) in pages[destination]
+
+
+class TestParallel:
+    """Worker threads give the same result as a serial run."""
+
+    def test_same_tree_and_state_as_serial(self, tmp_path, monkeypatch):
+        results = {}
+        for jobs in (1, 4):
+            root = tmp_path / f"jobs-{jobs}"
+            write_pages(root / 'docs', legacy_pages())
+            monkeypatch.chdir(root)
+            migrator = migrate(jobs=jobs)
+            state = MigrationState(root / 'docs')
+            results[jobs] = {
+                'tree': migrated_tree(root),
+                'processed': migrator.processed,
+                'errors': migrator.errors,
+                'groups': [group['destination'] for group in migrator.plan_groups],
+                'state': sorted(state.files('SUCCESS')) + sorted(state.files('SKIPPED')),
+            }
+            state.close()
+            check_migrated(root)
+
+        assert results[4] == results[1]
+        assert results[1]['errors'] == []
+        assert len(results[1]['processed']) == len(LEGACY) - 1
+
+    def test_failed_source_recorded_once(self, workdir):
+        # Not UTF-8: reading it fails in the worker
+        (workdir / 'docs' / '_old' / 'api' / 'auth.md').write_bytes(b'\xff\xfe broken')
+        migrator = migrate(jobs=4)
+        assert [rel_path for rel_path, _ in migrator.errors] == ['api/auth.md']
+        state = MigrationState(workdir / 'docs')
+        assert [source for source, *_ in state.files('ERROR')] == ['api/auth.md']
+        state.close()
+
+
+@pytest.fixture
+def reference(tmp_path, monkeypatch):
+    """The tree an uninterrupted run leaves"""
+    root = tmp_path / 'reference'
+    write_pages(root / 'docs', legacy_pages())
+    with monkeypatch.context() as patch:
+        patch.chdir(root)
+        migrate()
+    return migrated_tree(root)
+
+
+class TestResume:
+    """A run interrupted part way is finished by the next run."""
+
+    def crash_after(self, monkeypatch, renames, **kwargs):
+        """Run the migrator, interrupting it at the given rename (os.rename or os.replace)"""
+        calls = [0]
+
+        def crashing(original):
+            def rename(*args, **kw):
+                calls[0] += 1
+                if calls[0] == renames:
+                    raise KeyboardInterrupt('simulated crash')
+                return original(*args, **kw)
+            return rename
+
+        with monkeypatch.context() as patch:
+            patch.setattr(os, 'rename', crashing(os.rename))
+            patch.setattr(os, 'replace', crashing(os.replace))
+            with pytest.raises(KeyboardInterrupt):
+                migrate(**kwargs)
+
+    @pytest.mark.parametrize('renames', [1, 4, 9, 15])
+    def test_resumed_run_matches_uninterrupted(self, workdir, monkeypatch, capsys, reference, renames):
+        self.crash_after(monkeypatch, renames)
+        capsys.readouterr()
+        migrate()
+        assert 'Resuming' in capsys.readouterr().out
+        assert migrated_tree(workdir) == reference
+
+    def test_resume_with_more_sources(self, workdir, monkeypatch):
+        # The interrupted run had a limit and had written the pipeline templates page from one
+        # source; the resumed run brings its other two, which must be merged rather than dropped
+        self.crash_after(monkeypatch, 6, limit=4)
+        migrate()
+        check_migrated(workdir)
+        state = MigrationState(workdir / 'docs')
+        assert state.counts().get('SUCCESS') == len(LEGACY) - 1
+        state.close()
@@ -0,0 +1,269 @@
+"""Tests for journaled migration transactions: crash, resume and rollback."""
+
+import pytest
+
+from conftest import tree, write_pages
+from mosaic_docs.transaction import (MIGRATIONS_DIR, MigrationTransaction, TransactionError,
+                                     journal_dir, legacy_journals)
+
+
+class Crash(BaseException):
+    """Stands in for the process dying between two journal records."""
+
+
+def crash_before_done(tx, monkeypatch):
+    """Make tx die after its next operation has changed the tree, before it is marked done."""
+    append = tx._append
+
+    def dying_append(record, sync=False):
+        if record['event'] == 'done':
+            tx.close()
+            raise Crash()
+        append(record, sync)
+
+    monkeypatch.setattr(tx, '_append', dying_append)
+
+
+def crash(*args):
+    raise Crash()
+
+
+@pytest.fixture
+def pages(docs):
+    write_pages(docs, {
+        'old/setup.md': '# Setup\n',
+        'old/deploy.md': '# Deploy\n',
+        'guide/index.md': '# Guide\n',
+    })
+    return docs
+
+
+class TestJournal:
+    """Where journals live and how they are found again."""
+
+    def test_journal_beside_docs_root(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test')
+        tx.commit()
+        assert tx.path.parent == pages.resolve() / MIGRATIONS_DIR
+        assert tx.path.exists()
+
+    def test_load_restores_state(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test', plan={'moves': 1})
+        tx.move(pages / 'old/setup.md', pages / 'guide/setup.md')
+        tx.commit()
+
+        loaded = MigrationTransaction.load(pages, tx.id)
+        assert loaded.kind == 'test'
+        assert loaded.plan == {'moves': 1}
+        assert loaded.status == 'committed'
+        assert loaded.is_done('move:old/setup.md')
+
+    def test_load_ignores_torn_last_line(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test')
+        tx.write(pages / 'guide/index.md', '# Guide v2\n')
+        tx.close()
+        with open(tx.path, 'a', encoding='utf-8') as f:
+            f.write('{"event": "do')
+
+        loaded = MigrationTransaction.load(pages, tx.id)
+        assert loaded.is_done('write:guide/index.md')
+        assert loaded.status == 'open'
+
+    def test_history_and_latest(self, pages):
+        first = MigrationTransaction.begin(pages, 'test')
+        first.commit()
+        other = MigrationTransaction.begin(pages, 'other')
+        other.commit()
+        second = MigrationTransaction.begin(pages, 'test')
+        second.close()
+
+        assert [tx.id for tx in MigrationTransaction.history(pages, 'test')] == [first.id, second.id]
+        assert MigrationTransaction.latest(pages, 'test').id == second.id
+        assert MigrationTransaction.latest(pages, 'test', status='committed').id == first.id
+        assert MigrationTransaction.latest(pages, 'missing') is None
+
+    def test_history_of_root_without_journals(self, docs):
+        assert MigrationTransaction.history(docs) == []
+        assert not (docs / MIGRATIONS_DIR).exists()
+
+    def test_load_unknown_id(self, pages):
+        with pytest.raises(TransactionError):
+            MigrationTransaction.load(pages, '20260101-000000-test-abcdef')
+
+
+class TestOperations:
+    """Moves and writes, and skipping what is already done."""
+
+    def test_move_creates_directories(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test')
+        assert tx.move(pages / 'old/setup.md', pages / 'new/book/setup.md')
+        assert not tx.move(pages / 'old/setup.md', pages / 'new/book/setup.md')
+        tx.commit()
+
+        assert (pages / 'new/book/setup.md').read_text() == '# Setup\n'
+        assert not (pages / 'old/setup.md').exists()
+        assert tx.ops['move:old/setup.md']['created_dirs'] == ['new', 'new/book']
+
+    def test_move_refuses_to_overwrite(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test')
+        with pytest.raises(TransactionError, match='Target exists'):
+            tx.move(pages / 'old/setup.md', pages / 'guide/index.md')
+        with pytest.raises(TransactionError, match='Source not found'):
+            tx.move(pages / 'old/missing.md', pages / 'guide/missing.md')
+        tx.close()
+
+    def test_write_backs_up_replaced_content(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test')
+        assert tx.write(pages / 'guide/index.md', '# Guide v2\n', meta={'sources': ['a.md']})
+        assert not tx.write(pages / 'guide/index.md', '# Guide v3\n')
+        tx.commit()
+
+        op = tx.ops['write:guide/index.md']
+        assert (pages / 'guide/index.md').read_text() == '# Guide v2\n'
+        assert (tx.blobs / op['backup']).read_text() == '# Guide\n'
+        assert op['meta'] == {'sources': ['a.md']}
+        assert not list(pages.rglob('*.migrating'))
+
+    def test_write_new_file_has_no_backup(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test')
+        tx.write(pages / 'fresh/page.md', '# Fresh\n')
+        tx.commit()
+        assert tx.ops['write:fresh/page.md']['backup'] is None
+
+
+class TestResume:
+    """Resuming a transaction interrupted part way."""
+
+    def test_move_landed_before_crash(self, pages, monkeypatch):
+        tx = MigrationTransaction.begin(pages, 'test')
+        crash_before_done(tx, monkeypatch)
+        with pytest.raises(Crash):
+            tx.move(pages / 'old/setup.md', pages / 'guide/setup.md')
+        assert (pages / 'guide/setup.md').exists()
+
+        resumed = MigrationTransaction.load(pages, tx.id)
+        assert not resumed.is_done('move:old/setup.md')
+        assert not resumed.move(pages / 'old/setup.md', pages / 'guide/setup.md')
+        assert resumed.is_done('move:old/setup.md')
+        assert resumed.move(pages / 'old/deploy.md', pages / 'guide/deploy.md')
+        resumed.commit()
+
+        assert set(tree(pages)) == {'guide/deploy.md', 'guide/index.md', 'guide/setup.md'}
+
+    def test_write_landed_before_crash(self, pages, monkeypatch):
+        tx = MigrationTransaction.begin(pages, 'test')
+        crash_before_done(tx, monkeypatch)
+        with pytest.raises(Crash):
+            tx.write(pages / 'guide/index.md', '# Guide v2\n')
+
+        resumed = MigrationTransaction.load(pages, tx.id)
+        key = 'write:guide/index.md'
+        # The retry sees what the interrupted write replaced, so it recomputes the same content
+        assert resumed.read_text(pages / 'guide/index.md', key=key) == '# Guide\n'
+        assert not resumed.write(pages / 'guide/index.md', '# Guide v2\n', key=key)
+        assert resumed.is_done(key)
+        resumed.commit()
+        assert (pages / 'guide/index.md').read_text() == '# Guide v2\n'
+
+    def test_write_retried_with_new_content_keeps_original_backup(self, pages, monkeypatch):
+        tx = MigrationTransaction.begin(pages, 'test')
+        with monkeypatch.context() as patch:
+            # Dies after journaling the write, before replacing the file
+            patch.setattr('os.replace', crash)
+            with pytest.raises(Crash):
+                tx.write(pages / 'guide/index.md', '# Guide v2\n')
+        tx.close()
+        assert (pages / 'guide/index.md').read_text() == '# Guide\n'
+        assert not list(pages.rglob('*.migrating'))
+
+        resumed = MigrationTransaction.load(pages, tx.id)
+        assert resumed.write(pages / 'guide/index.md', '# Guide v3\n')
+        resumed.rollback()
+        assert (pages / 'guide/index.md').read_text() == '# Guide\n'
+
+    def test_exists_for_interrupted_write(self, pages, monkeypatch):
+        tx = MigrationTransaction.begin(pages, 'test')
+        crash_before_done(tx, monkeypatch)
+        with pytest.raises(Crash):
+            tx.write(pages / 'fresh/page.md', '# Fresh\n')
+
+        resumed = MigrationTransaction.load(pages, tx.id)
+        assert (pages / 'fresh/page.md').exists()
+        assert not resumed.exists(pages / 'fresh/page.md', key='write:fresh/page.md')
+        with pytest.raises(FileNotFoundError):
+            resumed.read_text(pages / 'fresh/page.md', key='write:fresh/page.md')
+
+
+class TestRollback:
+    """Undoing a transaction from its journal."""
+
+    def test_rollback_restores_tree(self, pages):
+        before = tree(pages)
+        tx = MigrationTransaction.begin(pages, 'test')
+        tx.move(pages / 'old/setup.md', pages / 'new/book/setup.md')
+        tx.write(pages / 'guide/index.md', '# Guide v2\n')
+        tx.write(pages / 'fresh/page.md', '# Fresh\n')
+        tx.commit()
+
+        loaded = MigrationTransaction.for_rollback(pages, 'test')
+        assert loaded.id == tx.id
+        assert loaded.rollback() == []
+        assert tree(pages) == before
+        assert not (pages / 'new').exists()
+        assert not (pages / 'fresh').exists()
+        assert MigrationTransaction.load(pages, tx.id).status == 'rolled_back'
+
+    def test_rollback_after_crash(self, pages, monkeypatch):
+        before = tree(pages)
+        tx = MigrationTransaction.begin(pages, 'test')
+        tx.move(pages / 'old/setup.md', pages / 'guide/setup.md')
+        crash_before_done(tx, monkeypatch)
+        with pytest.raises(Crash):
+            tx.write(pages / 'guide/index.md', '# Guide v2\n')
+
+        assert MigrationTransaction.for_rollback(pages, 'test').rollback() == []
+        assert tree(pages) == before
+
+    def test_rollback_reports_missing_files(self, pages):
+        tx = MigrationTransaction.begin(pages, 'test')
+        tx.move(pages / 'old/setup.md', pages / 'guide/setup.md')
+        tx.commit()
+        (pages / 'guide/setup.md').unlink()
+
+        problems = MigrationTransaction.load(pages, tx.id).rollback()
+        assert len(problems) == 1
+        assert 'old/setup.md' in problems[0]
+
+    def test_rollback_only_latest(self, pages):
+        first = MigrationTransaction.begin(pages, 'test')
+        first.commit()
+        second = MigrationTransaction.begin(pages, 'test')
+        second.commit()
+        MigrationTransaction.for_rollback(pages, 'test').rollback()
+
+        # The latest run was undone; an older one is only undone when named
+        with pytest.raises(TransactionError, match='already rolled back'):
+            MigrationTransaction.for_rollback(pages, 'test')
+        assert MigrationTransaction.for_rollback(pages, 'test', first.id).id == first.id
+
+    def test_nothing_to_roll_back(self, pages):
+        with pytest.raises(TransactionError, match='No test journal'):
+            MigrationTransaction.for_rollback(pages, 'test')
+
+    def test_points_at_legacy_journals(self, pages, tmp_path):
+        legacy = tmp_path / 'cache' / 'migrations'
+        legacy.mkdir(parents=True)
+        (legacy / 'old-run.jsonl').write_text(
+            '{"event": "begin", "kind": "test", "root": "%s"}\n' % pages.resolve())
+        (legacy / 'other-root.jsonl').write_text(
+            '{"event": "begin", "kind": "test", "root": "/elsewhere"}\n')
+
+        assert legacy_journals(pages) == [legacy / 'old-run.jsonl']
+        with pytest.raises(TransactionError, match=str(legacy)):
+            MigrationTransaction.for_rollback(pages, 'test')
+
+    def test_journal_dir_is_not_created_by_lookups(self, docs):
+        assert journal_dir(docs, create=False) == docs.resolve() / MIGRATIONS_DIR
+        with pytest.raises(TransactionError):
+            MigrationTransaction.for_rollback(docs, 'test')
+        assert not (docs / MIGRATIONS_DIR).exists()
@@ -10,11 +10,24 @@ import sys
 import yaml
 import re
 import json
+import argparse
+import hashlib
+import subprocess
+import cProfile
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
-from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
 from datetime import datetime
 
+from mosaic_docs.corpus import DEFAULT_IGNORE_DIRS, DocCorpus
+from mosaic_docs.parse_cache import ParseCache, parse_corpus
+from mosaic_docs.profiling import Profiler
+from mosaic_docs.reporters import REPORTERS, Reporter
+from mosaic_docs.results_cache import ResultsCache
+from mosaic_docs.rules import (BODY, FILES, FRONTMATTER, RULES, TREE, Rule, RuleContext,
+                               ValidationError, select_rules)
+from mosaic_docs.structure import load_structure
+
 # ANSI color codes
 class Colors:
     RED = '\033[91m'
@@ -27,297 +40,256 @@ class Colors:
     RESET = '\033[0m'
     BOLD = '\033[1m'
 
-@dataclass
-class ValidationError:
-    """Represents a validation error"""
-    severity: str  # error, warning, info
-    rule: str
-    path: str
-    message: str
-    line: int = 0
+class ErrorLimitReached(Exception):
+    """Raised to stop validation once the configured number of errors is reached"""
 
 class BookStackStructureValidator:
     """Validates documentation structure against defined schema"""
     
-    def __init__(self, structure_file: str, docs_root: str):
+    # Bump when the engine's handling of per-file results changes so cached results are discarded
+    RULESET_VERSION = 2
+    
+    def __init__(self, structure_file: str, docs_root: str, use_cache: bool = True, jobs: int = 1,
+                 rules: Optional[List[str]] = None, skip_rules: Optional[List[str]] = None,
+                 files: Optional[Iterable[str]] = None, reporter: Optional[Reporter] = None,
+                 max_errors: int = 0, report_path: str = 'validation-report.json',
+                 profiler: Optional[Profiler] = None, profile_top: int = 10):
         self.structure_file = structure_file
         self.docs_root = Path(docs_root)
+        # Docs-relative paths to validate, or None for the whole tree
+        self.scope = set(files) if files is not None else None
+        self.use_cache = use_cache
+        self.jobs = jobs
+        self.rule_names = select_rules(rules, skip_rules)
+        self.rules: List[Rule] = []
         self.structure = None
+        self.corpus: Optional[DocCorpus] = None
+        self.digests: Dict[str, str] = {}
+        # With a streaming reporter findings are written as produced and not kept in memory
+        self.reporter = reporter
+        self.max_errors = max_errors
+        self.report_path = report_path
         self.errors: List[ValidationError] = []
         self.warnings: List[ValidationError] = []
-        self.slug_registry: Dict[str, str] = {}
+        self.error_count = 0
+        self.warning_count = 0
+        self.stopped = False
+        self.profiler = profiler
+        self.profile_top = profile_top
+        self._buckets: Dict[str, List[ValidationError]] = {}
         
+    def _span(self, name: str, total: bool = True):
+        """Profiler span, or a no-op when not profiling"""
+        return self.profiler.span(name, total) if self.profiler else nullcontext()
+    
     def load_structure(self) -> bool:
         """Load the structure definition from YAML"""
         try:
-            with open(self.structure_file, 'r') as f:
-                self.structure = yaml.safe_load(f)
+            with self._span('load structure'):
+                self.structure = load_structure(self.structure_file)
             print(f"{Colors.GREEN}✓ Loaded structure definition from {self.structure_file}{Colors.RESET}")
             return True
         except Exception as e:
             print(f"{Colors.RED}✗ Failed to load structure: {e}{Colors.RESET}")
             return False
     
+    def _load_inputs(self) -> RuleContext:
+        """Load only the inputs the selected rules declare; structure-only runs never touch the docs tree"""
+        inputs = set()
+        for rule in self.rules:
+            inputs |= rule.inputs
+        skip_dirs = self.structure.conventions.get('skip_dirs', DEFAULT_IGNORE_DIRS)
+        
+        if inputs & {FILES, FRONTMATTER, BODY}:
+            with self._span('scan docs tree'):
+                self.corpus = DocCorpus(self.docs_root, ignore_dirs=skip_dirs, paths=self.scope)
+            
+            if inputs & {FRONTMATTER, BODY}:
+                with self._span('read and parse files'):
+                    if self.use_cache:
+                        # Unchanged files are served from the parse cache without being read;
+                        # changed files are parsed across self.jobs worker processes
+                        cache = ParseCache()
+                        cache.prime(self.corpus, jobs=self.jobs, profiler=self.profiler)
+                        self.digests = cache.digests
+                        cache.close()
+                    elif self.jobs > 1 or self.profiler:
+                        # Parse up front so per-file read and parse times can be recorded
+                        parse_corpus(self.corpus, jobs=self.jobs, profiler=self.profiler)
+        
+        tree = None
+        if TREE in inputs and self.scope is not None:
+            # Files outside the scope can link into it; their parses come from the cache
+            with self._span('scan rest of docs tree'):
+                tree = DocCorpus(self.docs_root, ignore_dirs=skip_dirs)
+                if self.use_cache:
+                    cache = ParseCache()
+                    cache.prime(tree, jobs=self.jobs)
+                    cache.close()
+        
+        return RuleContext(self.structure, self.docs_root, self.corpus, scope=self.scope, tree=tree)
+    
+    def ruleset_key(self, rules: List[Rule]) -> str:
+        """Identifies a set of cacheable rules and their configuration for the results cache"""
+        ruleset = repr((self.RULESET_VERSION, [(rule.name, rule.version, rule.settings()) for rule in rules]))
+        return hashlib.sha256(ruleset.encode('utf-8')).hexdigest()
+    
     def validate(self) -> bool:
         """Main validation entry point"""
         if not self.load_structure():
             return False
         
+        # Rules are configured from the structure's conventions block
+        self.rules = [RULES[name](self.structure.conventions) for name in self.rule_names]
+        
         print(f"\n{Colors.CYAN}Starting BookStack structure validation...{Colors.RESET}")
         print(f"Documentation root: {self.docs_root}")
-        print(f"Structure version: {self.structure.get('version', 'unknown')}")
+        print(f"Structure version: {self.structure.version}")
+        if self.scope is not None:
+            print(f"Files: {len(self.scope)} selected")
         
-        # Run all validation checks
-        self._validate_structure_definition()
-        self._validate_filesystem_structure()
-        self._validate_naming_conventions()
-        self._validate_frontmatter()
-        self._validate_unique_slugs()
-        self._check_orphaned_files()
+        context = self._load_inputs()
+        self._buckets = {rule.name: [] for rule in self.rules}
+        if self.reporter:
+            self.reporter.start(self.structure_file, self.docs_root)
         
-        # Report results
-        return self._report_results()
-    
-    def _validate_structure_definition(self):
-        """Validate the structure definition itself"""
-        print(f"\n{Colors.BLUE}Validating structure definition...{Colors.RESET}")
+        try:
+            for rule in self.rules:
+                if type(rule).check_structure is not Rule.check_structure:
+                    print(f"\n{Colors.BLUE}Validating {rule.description}...{Colors.RESET}")
+                    with self._span(f"rule {rule.name}"):
+                        for finding in rule.check_structure(context):
+                            self._record(rule.name, finding)
+            
+            file_rules = [rule for rule in self.rules if rule.checks_files]
+            if file_rules:
+                descriptions = ', '.join(rule.description for rule in file_rules)
+                print(f"\n{Colors.BLUE}Validating {descriptions}...{Colors.RESET}")
+                with self._span('file pass'):
+                    self._validate_files(file_rules, context)
+        except ErrorLimitReached:
+            self.stopped = True
         
-        if 'structure' not in self.structure:
-            self._add_error('structure_definition', '', 'Missing structure definition')
-            return
+        # Buffered findings are reported rule by rule in registry order
+        for rule in self.rules:
+            for finding in self._buckets[rule.name]:
+                if finding.severity == 'error':
+                    self.errors.append(finding)
+                else:
+                    self.warnings.append(finding)
+        self._buckets = {}
         
-        for shelf in self.structure['structure']:
-            if 'shelf' not in shelf:
-                self._add_error('structure_definition', '', 'Invalid shelf definition')
-                continue
-                
-            shelf_data = shelf['shelf']
-            self._validate_shelf(shelf_data)
-    
-    def _validate_shelf(self, shelf: Dict[str, Any]):
-        """Validate a shelf definition"""
-        required = ['name', 'slug', 'books']
-        for field in required:
-            if field not in shelf:
-                self._add_error('missing_field', shelf.get('name', 'unknown'), 
-                              f"Shelf missing required field: {field}")
+        if self.reporter:
+            self.reporter.finish(self._summary())
         
-        if 'books' in shelf:
-            for book in shelf['books']:
-                if 'book' in book:
-                    self._validate_book(book['book'], shelf['slug'])
-    
-    def _validate_book(self, book: Dict[str, Any], shelf_slug: str):
-        """Validate a book definition"""
-        required = ['name', 'slug', 'chapters']
-        for field in required:
-            if field not in book:
-                self._add_error('missing_field', f"{shelf_slug}/{book.get('name', 'unknown')}", 
-                              f"Book missing required field: {field}")
+        # Report results
+        with self._span('report'):
+            passed = self._report_results()
         
-        if 'chapters' in book:
-            for chapter in book['chapters']:
-                if 'chapter' in chapter:
-                    self._validate_chapter(chapter['chapter'], shelf_slug, book['slug'])
+        if self.profiler:
+            self._print_profile()
+        return passed
+    
+    def _print_profile(self):
+        """Print per-span timings, slowest files and bytes read"""
+        print(f"\n{Colors.CYAN}Profile{Colors.RESET} (CPU time excludes --jobs worker processes)")
+        for line in self.profiler.report(self.profile_top):
+            print(f"  {line}")
     
-    def _validate_chapter(self, chapter: Dict[str, Any], shelf_slug: str, book_slug: str):
-        """Validate a chapter definition"""
-        required = ['name', 'slug', 'pages']
-        path = f"{shelf_slug}/{book_slug}/{chapter.get('name', 'unknown')}"
+    def _record(self, rule_name: str, finding: ValidationError):
+        """Stream a finding to the reporter, or buffer it for the console report"""
+        if finding.severity == 'error':
+            self.error_count += 1
+        else:
+            self.warning_count += 1
         
-        for field in required:
-            if field not in chapter:
-                self._add_error('missing_field', path, f"Chapter missing required field: {field}")
+        if self.reporter:
+            self.reporter.emit(finding, rule_name)
+        else:
+            self._buckets[rule_name].append(finding)
         
-        if 'pages' in chapter and len(chapter['pages']) == 0:
-            self._add_error('required_pages', path, "Chapter must have at least one page")
+        if self.max_errors and self.error_count >= self.max_errors:
+            raise ErrorLimitReached()
     
-    def _validate_filesystem_structure(self):
-        """Validate that filesystem matches the defined structure"""
-        print(f"\n{Colors.BLUE}Validating filesystem structure...{Colors.RESET}")
-        
-        for shelf in self.structure['structure']:
-            shelf_data = shelf['shelf']
-            shelf_path = self.docs_root / shelf_data['slug']
-            
-            if not shelf_path.exists():
-                self._add_warning('missing_directory', str(shelf_path), 
-                                 f"Shelf directory not found: {shelf_data['name']}")
-                continue
-            
-            for book in shelf_data.get('books', []):
-                book_data = book['book']
-                book_path = shelf_path / book_data['slug']
-                
-                if not book_path.exists():
-                    self._add_warning('missing_directory', str(book_path), 
-                                     f"Book directory not found: {book_data['name']}")
-                    continue
-                
-                for chapter in book_data.get('chapters', []):
-                    chapter_data = chapter['chapter']
-                    chapter_path = book_path / chapter_data['slug']
-                    
-                    if not chapter_path.exists():
-                        self._add_warning('missing_directory', str(chapter_path), 
-                                         f"Chapter directory not found: {chapter_data['name']}")
-                        continue
-                    
-                    # Check for required pages
-                    for page_slug in chapter_data.get('pages', []):
-                        page_file = chapter_path / f"{page_slug}.md"
-                        if not page_file.exists():
-                            self._add_warning('missing_page', str(page_file), 
-                                            f"Page file not found: {page_slug}")
+    def _summary(self) -> Dict[str, Any]:
+        return {
+            'errors': self.error_count,
+            'warnings': self.warning_count,
+            'passed': self.error_count == 0,
+            'stopped_early': self.stopped
+        }
     
-    def _validate_naming_conventions(self):
-        """Validate naming conventions"""
-        print(f"\n{Colors.BLUE}Validating naming conventions...{Colors.RESET}")
+    def _validate_files(self, file_rules: List[Rule], context: RuleContext):
+        """Run every per-file rule over one pass of the file set"""
+        # Rules that depend only on a file's path and content have their results cached
+        cached_rules = [rule for rule in file_rules if rule.cacheable]
+        live_rules = [rule for rule in file_rules if not rule.cacheable]
         
-        conventions = self.structure.get('conventions', {})
+        results_cache = ResultsCache() if self.use_cache and cached_rules else None
+        ruleset = self.ruleset_key(cached_rules)
+        # A scoped corpus only needs the results of its own files
+        rel_paths = None if context.corpus.complete else list(context.corpus.by_path)
+        with self._span('results cache'):
+            cached = results_cache.load(self.docs_root, ruleset, rel_paths) if results_cache else {}
+        fresh = []
         
-        # Check page naming convention (00-kebab-case)
-        page_pattern = re.compile(r'^\d{2}-[a-z]+(-[a-z]+)*$')
+        try:
+            hits = self._check_documents(context, cached_rules, live_rules, cached, fresh)
+        except ErrorLimitReached:
+            if results_cache:
+                # Files after the stop were not visited, so nothing is pruned
+                results_cache.store(self.docs_root, ruleset, fresh)
+                results_cache.close()
+            raise
         
-        for md_file in self.docs_root.rglob('*.md'):
-            rel_path = md_file.relative_to(self.docs_root)
-            parts = rel_path.parts
-            
-            # Skip files in root or special directories
-            if len(parts) < 4:  # shelf/book/chapter/page.md
-                continue
-            
-            page_name = md_file.stem
-            if not page_pattern.match(page_name):
-                self._add_error('naming_convention', str(md_file), 
-                              f"Page name '{page_name}' doesn't match pattern '00-kebab-case'")
+        if results_cache:
+            results_cache.stats.update(hits=hits, checked=len(fresh))
+            # Entries left in `cached` belong to files that are gone or now ignored
+            with self._span('results cache'):
+                results_cache.store(self.docs_root, ruleset, fresh, removed=cached)
+            results_cache.close()
     
-    def _validate_frontmatter(self):
-        """Validate that all markdown files have required frontmatter"""
-        print(f"\n{Colors.BLUE}Validating frontmatter...{Colors.RESET}")
-        
-        required_fields = ['title', 'order', 'category', 'tags', 'last_updated', 'author']
-        
-        for md_file in self.docs_root.rglob('*.md'):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Check for frontmatter
-                if not content.startswith('---'):
-                    self._add_error('frontmatter_required', str(md_file), 
-                                  "Missing frontmatter section")
-                    continue
-                
-                # Extract frontmatter
-                parts = content.split('---', 2)
-                if len(parts) < 3:
-                    self._add_error('frontmatter_required', str(md_file), 
-                                  "Invalid frontmatter format")
-                    continue
-                
-                try:
-                    frontmatter = yaml.safe_load(parts[1])
-                    if not frontmatter:
-                        self._add_error('frontmatter_required', str(md_file), 
-                                      "Empty frontmatter")
-                        continue
-                    
-                    # Check required fields
-                    for field in required_fields:
-                        if field not in frontmatter:
-                            self._add_error('frontmatter_field', str(md_file), 
-                                          f"Missing required frontmatter field: {field}")
-                    
-                    # Validate date format
-                    if 'last_updated' in frontmatter:
-                        try:
-                            datetime.strptime(str(frontmatter['last_updated']), '%Y-%m-%d')
-                        except:
-                            self._add_error('frontmatter_format', str(md_file), 
-                                          "Invalid date format for last_updated (use YYYY-MM-DD)")
-                    
-                except yaml.YAMLError as e:
-                    self._add_error('frontmatter_parse', str(md_file), 
-                                  f"Failed to parse frontmatter: {e}")
-                    
-            except Exception as e:
-                self._add_error('file_read', str(md_file), f"Failed to read file: {e}")
+    def _check_documents(self, context: RuleContext, cached_rules: List[Rule], live_rules: List[Rule],
+                         cached: Dict[str, Any], fresh: List[Any]) -> int:
+        """Run the per-file rules on every document, reusing cached results where the hash matches"""
+        hits = 0
+        # Per-document spans only go into a trace; the summary keeps per-rule totals
+        trace_documents = self.profiler is not None and self.profiler.trace
+        for doc in context.corpus:
+            with (self._span(doc.rel_path, total=False) if trace_documents else nullcontext()):
+                hits += self._check_document(doc, context, cached_rules, live_rules, cached, fresh)
+        return hits
     
-    def _validate_unique_slugs(self):
-        """Validate that all slugs are unique within their scope"""
-        print(f"\n{Colors.BLUE}Validating unique slugs...{Colors.RESET}")
-        
-        # Build slug registry
-        for shelf in self.structure['structure']:
-            shelf_data = shelf['shelf']
-            shelf_slug = shelf_data['slug']
-            
-            # Check shelf-level uniqueness
-            if shelf_slug in self.slug_registry:
-                self._add_error('unique_slugs', shelf_slug, 
-                              f"Duplicate shelf slug: {shelf_slug}")
-            self.slug_registry[shelf_slug] = 'shelf'
+    def _check_document(self, doc, context: RuleContext, cached_rules: List[Rule], live_rules: List[Rule],
+                        cached: Dict[str, Any], fresh: List[Any]) -> int:
+        """Check one document; returns 1 when its cached results were reused"""
+        hit = 0
+        sha = self.digests.get(doc.rel_path)
+        entry = cached.pop(doc.rel_path, None)
+        if sha and entry and entry[0] == sha:
+            doc_findings = entry[1]
+            hit = 1
+        else:
+            doc_findings = {}
+            for rule in cached_rules:
+                with self._span(f"rule {rule.name}"):
+                    doc_findings[rule.name] = [(f.severity, f.rule, f.message)
+                                               for f in rule.check_file(doc, context)]
+            if sha:
+                fresh.append((doc.rel_path, sha, doc_findings))
             
-            book_slugs = set()
-            for book in shelf_data.get('books', []):
-                book_data = book['book']
-                book_slug = book_data['slug']
-                
-                if book_slug in book_slugs:
-                    self._add_error('unique_slugs', f"{shelf_slug}/{book_slug}", 
-                                  f"Duplicate book slug within shelf: {book_slug}")
-                book_slugs.add(book_slug)
-                
-                chapter_slugs = set()
-                for chapter in book_data.get('chapters', []):
-                    chapter_data = chapter['chapter']
-                    chapter_slug = chapter_data['slug']
-                    
-                    if chapter_slug in chapter_slugs:
-                        self._add_error('unique_slugs', 
-                                      f"{shelf_slug}/{book_slug}/{chapter_slug}", 
-                                      f"Duplicate chapter slug within book: {chapter_slug}")
-                    chapter_slugs.add(chapter_slug)
-    
-    def _check_orphaned_files(self):
-        """Check for files that don't match the structure"""
-        print(f"\n{Colors.BLUE}Checking for orphaned files...{Colors.RESET}")
+        path = str(doc.path)
+        for rule in cached_rules:
+            for severity, name, message in doc_findings[rule.name]:
+                self._record(rule.name, ValidationError(severity, name, path, message))
         
-        # Build set of expected paths
-        expected_paths = set()
-        for shelf in self.structure['structure']:
-            shelf_data = shelf['shelf']
-            for book in shelf_data.get('books', []):
-                book_data = book['book']
-                for chapter in book_data.get('chapters', []):
-                    chapter_data = chapter['chapter']
-                    for page_slug in chapter_data.get('pages', []):
-                        path = Path(shelf_data['slug']) / book_data['slug'] / \
-                               chapter_data['slug'] / f"{page_slug}.md"
-                        expected_paths.add(path)
-        
-        # Check all markdown files
-        for md_file in self.docs_root.rglob('*.md'):
-            rel_path = md_file.relative_to(self.docs_root)
-            
-            # Skip special directories
-            if any(part.startswith('.') for part in rel_path.parts):
-                continue
-            if any(part in ['drafts', 'archive'] for part in rel_path.parts):
-                continue
-            
-            if rel_path not in expected_paths:
-                self._add_warning('orphaned_file', str(md_file), 
-                                "File not defined in structure")
-    
-    def _add_error(self, rule: str, path: str, message: str):
-        """Add a validation error"""
-        self.errors.append(ValidationError('error', rule, path, message))
-    
-    def _add_warning(self, rule: str, path: str, message: str):
-        """Add a validation warning"""
-        self.warnings.append(ValidationError('warning', rule, path, message))
+        # Rules that depend on the structure or other files are re-run every time
+        for rule in live_rules:
+            with self._span(f"rule {rule.name}"):
+                findings = list(rule.check_file(doc, context))
+            for finding in findings:
+                self._record(rule.name, finding)
+        return hit
     
     def _report_results(self) -> bool:
         """Report validation results"""
@@ -325,7 +297,7 @@ class BookStackStructureValidator:
         print(f"{Colors.BOLD}Validation Results{Colors.RESET}")
         print(f"{Colors.CYAN}{'='*60}{Colors.RESET}")
         
-        if not self.errors and not self.warnings:
+        if not self.error_count and not self.warning_count:
             print(f"\n{Colors.GREEN}✓ All validation checks passed!{Colors.RESET}")
             return True
         
@@ -343,29 +315,31 @@ class BookStackStructureValidator:
                 print(f"  {Colors.YELLOW}⚠ [{warning.rule}] {warning.path}{Colors.RESET}")
                 print(f"    {warning.message}")
         
+        if self.stopped:
+            print(f"\n{Colors.RED}Stopped after {self.max_errors} errors{Colors.RESET}")
+        
         # Summary
         print(f"\n{Colors.CYAN}Summary:{Colors.RESET}")
-        print(f"  Errors: {len(self.errors)}")
-        print(f"  Warnings: {len(self.warnings)}")
+        print(f"  Errors: {self.error_count}")
+        print(f"  Warnings: {self.warning_count}")
         
         # Generate report file
-        self._generate_report()
+        if self.reporter:
+            print(f"\nFindings written to: {self.reporter.output}")
+        else:
+            self._generate_report()
         
-        return len(self.errors) == 0
+        return self.error_count == 0
     
     def _generate_report(self):
         """Generate a detailed validation report"""
-        report_path = Path('validation-report.json')
+        report_path = Path(self.report_path)
         report = {
             'timestamp': datetime.now().isoformat(),
             'structure_file': self.structure_file,
             'docs_root': str(self.docs_root),
-            'version': self.structure.get('version', 'unknown'),
-            'summary': {
-                'errors': len(self.errors),
-                'warnings': len(self.warnings),
-                'passed': len(self.errors) == 0
-            },
+            'version': self.structure.version,
+            'summary': self._summary(),
             'errors': [
                 {
                     'severity': e.severity,
@@ -389,31 +363,135 @@ class BookStackStructureValidator:
         
         print(f"\nDetailed report saved to: {report_path}")
 
+def staged_files() -> List[str]:
+    """Paths staged for commit, relative to the current directory"""
+    # --no-renames lists a rename as a deletion plus an addition so both paths are checked
+    output = subprocess.run(['git', 'diff', '--cached', '--name-only', '--no-renames', '--relative'],
+                            capture_output=True, text=True, check=True).stdout
+    return [line for line in output.splitlines() if line]
+
+def docs_relative(paths: Iterable[str], docs_root: str) -> List[str]:
+    """Map paths relative to the current directory onto docs_root, dropping paths outside it"""
+    root = Path(docs_root).resolve()
+    relative = []
+    for path in paths:
+        try:
+            relative.append(Path(os.path.abspath(path)).relative_to(root).as_posix())
+        except ValueError:
+            continue
+    return relative
+
 def main():
     """Main entry point"""
-    if len(sys.argv) < 2:
-        print(f"{Colors.RED}Usage: {sys.argv[0]} <docs_root> [structure_file]{Colors.RESET}")
-        print(f"  docs_root: Path to documentation root directory")
-        print(f"  structure_file: Path to bookstack-structure.yaml (optional)")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description='Validate documentation structure against bookstack-structure.yaml')
+    parser.add_argument('docs_root', nargs='?', help='Path to documentation root directory')
+    parser.add_argument('structure_file', nargs='?', default='docs/bookstack/bookstack-structure-optimized.yaml',
+                       help='Path to bookstack-structure.yaml (optional)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Worker processes for reading and parsing files (0 = one per CPU)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Re-read and re-check every file instead of using cached results')
+    parser.add_argument('--rules', type=lambda value: value.split(','),
+                       help="Comma-separated rules to run; 'default' stands for the default rules, "
+                            "so 'default,links' adds the opt-in links rule (default: all default rules)")
+    parser.add_argument('--skip-rules', type=lambda value: value.split(','),
+                       help='Comma-separated rules to skip')
+    parser.add_argument('--list-rules', action='store_true', help='List available rules and exit')
+    parser.add_argument('--format', choices=['json'] + list(REPORTERS), default='json',
+                       help='Report format; jsonl and sarif stream findings as they are found (default: json)')
+    parser.add_argument('--output', '-o', help='Report path (default: validation-report.<format>)')
+    parser.add_argument('--max-errors', type=int, default=0, metavar='N',
+                       help='Stop after N errors (default: no limit)')
+    parser.add_argument('--lsp', action='store_true',
+                       help='Run as a language server on stdio, re-validating files as they change')
+    parser.add_argument('--profile', action='store_true',
+                       help='Report wall and CPU time per check, the slowest files and bytes read')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+                       help='Number of slowest files to list with --profile (default: 10)')
+    parser.add_argument('--profile-output', metavar='PATH',
+                       help='With --profile, also write a trace: *.json for speedscope, anything else for a pstats dump')
+    parser.add_argument('--poll-interval', type=float, default=2.0, metavar='SECONDS',
+                       help='How often the language server checks the docs tree for changes (0 = never)')
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument('--staged', action='store_true',
+                      help='Validate only files staged for commit, plus the structure checks')
+    scope.add_argument('--files', nargs='+', metavar='FILE',
+                      help='Validate only these files, plus the structure checks')
+    
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    if args.list_rules:
+        for name, rule_class in RULES.items():
+            inputs = ', '.join(sorted(rule_class.inputs))
+            opt_in = '' if rule_class.default else ' (opt-in)'
+            print(f"{Colors.BOLD}{name}{Colors.RESET}{opt_in}: {rule_class.__doc__.splitlines()[0]} [{inputs}]")
+        sys.exit(0)
     
-    docs_root = sys.argv[1]
-    structure_file = sys.argv[2] if len(sys.argv) > 2 else 'docs/bookstack/bookstack-structure-optimized.yaml'
+    if not args.docs_root:
+        parser.error('the following arguments are required: docs_root')
+    
+    try:
+        select_rules(args.rules, args.skip_rules)
+    except KeyError as e:
+        parser.error(f"unknown rule {e} (available: {', '.join(RULES)})")
     
     # Validate paths exist
-    if not os.path.exists(docs_root):
-        print(f"{Colors.RED}Error: Documentation root not found: {docs_root}{Colors.RESET}")
+    if not os.path.exists(args.docs_root):
+        print(f"{Colors.RED}Error: Documentation root not found: {args.docs_root}{Colors.RESET}")
         sys.exit(1)
     
-    if not os.path.exists(structure_file):
-        print(f"{Colors.RED}Error: Structure file not found: {structure_file}{Colors.RESET}")
+    if not os.path.exists(args.structure_file):
+        print(f"{Colors.RED}Error: Structure file not found: {args.structure_file}{Colors.RESET}")
         sys.exit(1)
     
+    if args.lsp:
+        # stdout carries the protocol, so nothing else may be printed
+        from mosaic_docs.lsp import serve_stdio
+        sys.exit(serve_stdio(args.structure_file, args.docs_root,
+                             select_rules(args.rules, args.skip_rules), args.poll_interval))
+    
+    files = None
+    if args.staged or args.files:
+        try:
+            selected = staged_files() if args.staged else args.files
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"{Colors.RED}Error: Could not list staged files: {e}{Colors.RESET}")
+            sys.exit(1)
+        # A changed structure definition can affect every file, so fall back to a full run
+        structure_path = os.path.abspath(args.structure_file)
+        if not any(os.path.abspath(path) == structure_path for path in selected):
+            files = docs_relative(selected, args.docs_root)
+    
+    output = args.output or f"validation-report.{args.format}"
+    reporter = REPORTERS[args.format](output) if args.format in REPORTERS else None
+    
+    profiler = None
+    pstats_profile = None
+    if args.profile:
+        speedscope = bool(args.profile_output and args.profile_output.endswith('.json'))
+        profiler = Profiler(trace=speedscope)
+        if args.profile_output and not speedscope:
+            pstats_profile = cProfile.Profile()
+    
     # Run validation
-    validator = BookStackStructureValidator(structure_file, docs_root)
+    validator = BookStackStructureValidator(args.structure_file, args.docs_root,
+                                            use_cache=not args.no_cache, jobs=jobs,
+                                            rules=args.rules, skip_rules=args.skip_rules, files=files,
+                                            reporter=reporter, max_errors=args.max_errors, report_path=output,
+                                            profiler=profiler, profile_top=args.profile_top)
+    if pstats_profile:
+        pstats_profile.enable()
     success = validator.validate()
+    if pstats_profile:
+        pstats_profile.disable()
+        pstats_profile.dump_stats(args.profile_output)
+        print(f"pstats dump saved to: {args.profile_output}")
+    elif profiler and args.profile_output:
+        profiler.write_speedscope(args.profile_output)
+        print(f"speedscope trace saved to: {args.profile_output}")
     
     sys.exit(0 if success else 1)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()